@@ -0,0 +1,111 @@
+"""Measures the latency of the CRF feature extraction per sentence length.
+
+Compares converting sentences of random words into the feature dicts of
+the crfsuite tagger word by word, as rasa_nlu used to, with the feature
+plan of the CRF entity extractor, which computes the features of each
+token once. Both implementations have to produce identical feature dicts.
+
+Usage:
+    python benchmarks/crf_feature_extraction.py -n 2000
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import random
+import string
+import timeit
+
+from builtins import range, str
+
+from rasa_nlu.extractors.crf_entity_extractor import CRFEntityExtractor
+
+
+def create_argument_parser():
+    parser = argparse.ArgumentParser(
+            description='benchmark the feature extraction of the crf '
+                        'entity extractor')
+    parser.add_argument('-n', '--num_sentences',
+                        default=1000,
+                        type=int,
+                        help="number of sentences per length")
+    parser.add_argument('-l', '--lengths',
+                        default=[5, 10, 20, 50, 100],
+                        type=int,
+                        nargs="+",
+                        help="sentence lengths in tokens")
+    return parser
+
+
+def legacy_sentence_to_features(configured_features, sentence):
+    function_dict = CRFEntityExtractor.function_dict
+    sentence_features = []
+    for word_idx in range(len(sentence)):
+        feature_span = len(configured_features)
+        half_span = feature_span // 2
+        feature_range = range(- half_span, half_span + 1)
+        prefixes = [str(i) for i in feature_range]
+        word_features = {}
+        for f_i in feature_range:
+            if word_idx + f_i >= len(sentence):
+                word_features['EOS'] = True
+            elif word_idx + f_i < 0:
+                word_features['BOS'] = True
+            else:
+                word = sentence[word_idx + f_i]
+                f_i_from_zero = f_i + half_span
+                prefix = prefixes[f_i_from_zero]
+                features = configured_features[f_i_from_zero]
+                for feature in features:
+                    value = function_dict[feature](word)
+                    word_features[prefix + ":" + feature] = value
+        sentence_features.append(word_features)
+    return sentence_features
+
+
+def random_sentence(rs, length):
+    def word():
+        chars = string.ascii_letters + string.digits
+        return "".join(rs.choice(chars) for _ in range(rs.randint(1, 10)))
+
+    return [(word(), rs.choice(["NN", "NNP", "VBZ", "JJ"]), "N/A",
+             rs.choice([None, 1, 2])) for _ in range(length)]
+
+
+def time_per_sentence(convert, sentences):
+    def run():
+        for sentence in sentences:
+            convert(sentence)
+
+    # best of several runs to reduce the noise
+    return min(timeit.repeat(run, number=1, repeat=3)) / len(sentences)
+
+
+if __name__ == '__main__':
+    cmdline_args = create_argument_parser().parse_args()
+
+    extractor = CRFEntityExtractor()
+    features = extractor.component_config["features"]
+
+    def legacy(sentence):
+        return legacy_sentence_to_features(features, sentence)
+
+    rs = random.Random(42)
+    print("Feature extraction per sentence (default features):")
+    for length in cmdline_args.lengths:
+        sentences = [random_sentence(rs, length)
+                     for _ in range(cmdline_args.num_sentences)]
+        for sentence in sentences[:10]:
+            if (legacy(sentence) !=
+                    extractor._sentence_to_features(sentence)):
+                raise ValueError("The feature dicts differ.")
+
+        legacy_latency = time_per_sentence(legacy, sentences)
+        plan_latency = time_per_sentence(extractor._sentence_to_features,
+                                         sentences)
+        print("  {:>4} tokens  word by word {:>9.1f} us, feature plan "
+              "{:>9.1f} us ({:.1f}x)"
+              "".format(length, legacy_latency * 1e6, plan_latency * 1e6,
+                        legacy_latency / plan_latency))
@@ -0,0 +1,86 @@
+"""Measures latency and recall of the approximate intent search.
+
+Creates random intent embeddings, builds the index over them and compares
+ranking the intents of random messages by comparing them to all intents
+with searching a varying number of clusters of the index. Recall is the
+fraction of the exact 10 most similar intents found by the index.
+
+Usage:
+    python benchmarks/embedding_intent_ann.py -i 20000 -d 20
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import time
+
+import numpy as np
+
+from rasa_nlu.classifiers import INTENT_RANKING_LENGTH
+from rasa_nlu.classifiers.embedding_scorer import EmbeddingIntentScorer
+
+
+def create_argument_parser():
+    parser = argparse.ArgumentParser(
+            description='benchmark the approximate intent search')
+    parser.add_argument('-i', '--num_intents',
+                        default=20000,
+                        type=int,
+                        help="number of intents")
+    parser.add_argument('-d', '--embed_dim',
+                        default=20,
+                        type=int,
+                        help="dimension of the embeddings")
+    parser.add_argument('-c', '--num_clusters',
+                        default=0,
+                        type=int,
+                        help="number of clusters of the index, 0 uses the "
+                             "square root of the number of intents")
+    parser.add_argument('-n', '--num_messages',
+                        default=1000,
+                        type=int,
+                        help="number of classified messages")
+    return parser
+
+
+def create_scorer(num_intents, embed_dim):
+    # an identity layer, the messages are embeddings already
+    layers = [(np.eye(embed_dim, dtype=np.float32),
+               np.zeros(embed_dim, dtype=np.float32))]
+    embeddings = np.random.RandomState(42).normal(
+            size=(num_intents, embed_dim)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    labels = np.array(["intent_{}".format(i) for i in range(num_intents)])
+    return EmbeddingIntentScorer(layers, embeddings, "cosine", labels)
+
+
+def evaluate(scorer, messages, exact):
+    start = time.time()
+    rankings = [scorer.ranking(x, INTENT_RANKING_LENGTH, exact)[0]
+                for x in messages]
+    return rankings, (time.time() - start) / len(messages)
+
+
+if __name__ == '__main__':
+    cmdline_args = create_argument_parser().parse_args()
+
+    scorer = create_scorer(cmdline_args.num_intents, cmdline_args.embed_dim)
+    scorer.build_index(cmdline_args.num_clusters)
+    messages = np.random.RandomState(0).normal(
+            size=(cmdline_args.num_messages, cmdline_args.embed_dim))
+
+    exact_rankings, exact_latency = evaluate(scorer, messages, True)
+    print("Ranking {} intents ({} clusters):"
+          "".format(cmdline_args.num_intents, len(scorer.index.centroids)))
+    print("  exact              {:>8.1f} us".format(exact_latency * 1e6))
+
+    for num_probes in [1, 2, 4, 8, 16, 32]:
+        scorer.index.num_probes = num_probes
+        rankings, latency = evaluate(scorer, messages, False)
+        found = sum(len(set(r) & set(e))
+                    for r, e in zip(rankings, exact_rankings))
+        recall = found / float(sum(len(e) for e in exact_rankings))
+        print("  {:>2} probes          {:>8.1f} us, recall {:.3f}"
+              "".format(num_probes, latency * 1e6, recall))
@@ -0,0 +1,128 @@
+"""Measures the training throughput of the embedding intent classifier.
+
+Compares creating the training batches (including the sampled negative
+intents) one example at a time, as rasa_nlu used to, with sampling the
+negatives for the whole batch at once. If tensorflow is installed, the
+classifier is trained with and without prefetching the batches in a
+background thread as well. Throughput is reported in examples per second.
+
+Usage:
+    python benchmarks/embedding_training_throughput.py -i 200
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import time
+
+import numpy as np
+
+from rasa_nlu.classifiers.embedding_intent_classifier import \
+    EmbeddingIntentClassifier
+from rasa_nlu.components import find_unavailable_packages
+from rasa_nlu.training_data import Message, TrainingData
+
+
+def create_argument_parser():
+    parser = argparse.ArgumentParser(
+            description='benchmark the training throughput of the '
+                        'embedding intent classifier')
+    parser.add_argument('-i', '--num_intents',
+                        default=100,
+                        type=int,
+                        help="number of intents")
+    parser.add_argument('-e', '--examples_per_intent',
+                        default=50,
+                        type=int,
+                        help="number of training examples per intent")
+    parser.add_argument('-f', '--num_features',
+                        default=500,
+                        type=int,
+                        help="dimension of the text features")
+    parser.add_argument('--epochs',
+                        default=5,
+                        type=int,
+                        help="number of training epochs")
+    return parser
+
+
+def legacy_batch_b(encoded_all_intents, batch_pos_b, intent_ids, num_neg):
+    batch_pos_b = batch_pos_b[:, np.newaxis, :]
+    batch_neg_b = np.zeros((batch_pos_b.shape[0], num_neg,
+                            batch_pos_b.shape[-1]))
+    for b in range(batch_pos_b.shape[0]):
+        negative_indexes = [i for i in range(encoded_all_intents.shape[0])
+                            if i != intent_ids[b]]
+        negs = np.random.choice(negative_indexes, size=num_neg)
+        batch_neg_b[b] = encoded_all_intents[negs]
+    return np.concatenate([batch_pos_b, batch_neg_b], 1)
+
+
+def vectorized_batch_b(encoded_all_intents, batch_pos_b, intent_ids, num_neg):
+    negs = EmbeddingIntentClassifier._sample_negatives(
+            intent_ids, encoded_all_intents.shape[0], num_neg)
+    return np.concatenate([batch_pos_b[:, np.newaxis, :],
+                           encoded_all_intents[negs]], 1)
+
+
+def batch_throughput(create_batch_b, intent_ids, batch_size=32, num_neg=10):
+    encoded_all_intents = np.eye(intent_ids.max() + 1)
+    Y = encoded_all_intents[intent_ids]
+
+    start = time.time()
+    indices = np.random.permutation(len(intent_ids))
+    for i in range(0, len(intent_ids), batch_size):
+        batch_idx = indices[i:i + batch_size]
+        create_batch_b(encoded_all_intents, Y[batch_idx],
+                       intent_ids[batch_idx], num_neg)
+    return len(intent_ids) / (time.time() - start)
+
+
+def training_data(num_intents, examples_per_intent, num_features):
+    rs = np.random.RandomState(42)
+    examples = []
+    for i in range(num_intents):
+        for _ in range(examples_per_intent):
+            m = Message("", {"intent": "intent_{}".format(i)})
+            m.set("text_features", rs.binomial(1, 0.01, num_features))
+            examples.append(m)
+    return TrainingData(examples)
+
+
+def training_throughput(td, epochs, prefetch_batches):
+    classifier = EmbeddingIntentClassifier({
+        "epochs": epochs,
+        "prefetch_batches": prefetch_batches,
+        "numpy_inference": False})
+    start = time.time()
+    classifier.train(td)
+    return epochs * len(td.intent_examples) / (time.time() - start)
+
+
+if __name__ == '__main__':
+    cmdline_args = create_argument_parser().parse_args()
+
+    intent_ids = np.repeat(np.arange(cmdline_args.num_intents),
+                           cmdline_args.examples_per_intent)
+
+    print("Batch creation ({} intents, {} examples):"
+          "".format(cmdline_args.num_intents, len(intent_ids)))
+    print("  per example sampling  {:>12.0f} examples/s"
+          "".format(batch_throughput(legacy_batch_b, intent_ids)))
+    print("  vectorized sampling   {:>12.0f} examples/s"
+          "".format(batch_throughput(vectorized_batch_b, intent_ids)))
+
+    if find_unavailable_packages(["tensorflow"]):
+        print("Tensorflow is not installed, skipping the training.")
+    else:
+        td = training_data(cmdline_args.num_intents,
+                           cmdline_args.examples_per_intent,
+                           cmdline_args.num_features)
+        print("Training ({} epochs):".format(cmdline_args.epochs))
+        for prefetch_batches in [0, 2]:
+            print("  prefetch_batches={}    {:>12.0f} examples/s"
+                  "".format(prefetch_batches,
+                            training_throughput(td, cmdline_args.epochs,
+                                                prefetch_batches)))
@@ -0,0 +1,103 @@
+"""Measures loading and looking up a large entity synonym table.
+
+Persists random synonyms as json, as `ner_synonyms` does by default, and
+as a compact synonym store. Reports the time to load each of them, the
+memory allocated by loading and the latency of a lookup.
+
+Usage:
+    python benchmarks/entity_synonym_store.py -n 1000000
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import gc
+import os
+import random
+import shutil
+import string
+import tempfile
+import timeit
+import tracemalloc
+
+from builtins import range
+
+from rasa_nlu import utils
+from rasa_nlu.extractors.synonym_store import CompactSynonymStore
+
+
+def create_argument_parser():
+    parser = argparse.ArgumentParser(
+            description='benchmark loading and looking up entity synonyms')
+    parser.add_argument('-n', '--num_synonyms',
+                        default=1000000,
+                        type=int,
+                        help="number of synonyms")
+    parser.add_argument('-v', '--num_values',
+                        default=10000,
+                        type=int,
+                        help="number of distinct entity values")
+    return parser
+
+
+def random_text(rs):
+    return "".join(rs.choice(string.ascii_lowercase + " ")
+                   for _ in range(rs.randint(5, 25)))
+
+
+def measure_load(load):
+    gc.collect()
+    tracemalloc.start()
+    start = timeit.default_timer()
+    synonyms = load()
+    seconds = timeit.default_timer() - start
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return synonyms, seconds, allocated
+
+
+def lookup_latency(synonyms, keys):
+    def run():
+        for key in keys:
+            synonyms.get(key)
+
+    return min(timeit.repeat(run, number=1, repeat=3)) / len(keys)
+
+
+if __name__ == '__main__':
+    cmdline_args = create_argument_parser().parse_args()
+
+    rs = random.Random(42)
+    values = [random_text(rs) for _ in range(cmdline_args.num_values)]
+    synonyms = {random_text(rs): rs.choice(values)
+                for _ in range(cmdline_args.num_synonyms)}
+    keys = rs.sample(list(synonyms), min(10000, len(synonyms)))
+
+    model_dir = tempfile.mkdtemp()
+    try:
+        json_file = os.path.join(model_dir, "entity_synonyms.json")
+        store_file = os.path.join(model_dir, "entity_synonyms.bin")
+        utils.write_json_to_file(json_file, synonyms, separators=(',', ': '))
+        CompactSynonymStore.write(store_file, synonyms)
+        del synonyms
+
+        print("{} synonyms of {} values:".format(cmdline_args.num_synonyms,
+                                                 cmdline_args.num_values))
+        for name, file_name, load in [
+                ("json", json_file,
+                 lambda: utils.read_json_file(json_file)),
+                ("compact store", store_file,
+                 lambda: CompactSynonymStore.load(store_file))]:
+            loaded, seconds, allocated = measure_load(load)
+            for key in keys[:100]:
+                assert loaded.get(key) is not None
+            print("  {:<14} file {:>7.1f} MB, load {:>8.1f} ms, allocated "
+                  "{:>7.1f} MB, lookup {:>5.2f} us"
+                  "".format(name, os.path.getsize(file_name) / 1e6,
+                            seconds * 1e3, allocated / 1e6,
+                            lookup_latency(loaded, keys) * 1e6))
+            del loaded
+    finally:
+        shutil.rmtree(model_dir)
@@ -0,0 +1,89 @@
+"""Measures the per message latency of the keyword intent classifier.
+
+Compares searching every keyword in the message one after another, as
+the classifier used to, with the Aho-Corasick automaton of the keyword
+intent classifier for growing numbers of random keywords.
+
+Usage:
+    python benchmarks/keyword_intent_classifier.py -k 100 1000 10000
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import random
+import string
+import timeit
+
+from builtins import range
+
+from rasa_nlu.classifiers.keyword_intent_classifier import \
+    KeywordIntentClassifier
+
+
+def create_argument_parser():
+    parser = argparse.ArgumentParser(
+            description='benchmark the latency of the keyword intent '
+                        'classifier')
+    parser.add_argument('-k', '--num_keywords',
+                        default=[10, 100, 1000, 10000, 50000],
+                        type=int,
+                        nargs="+",
+                        help="numbers of keywords")
+    parser.add_argument('-m', '--num_messages',
+                        default=200,
+                        type=int,
+                        help="number of messages")
+    return parser
+
+
+def random_word(rs):
+    return "".join(rs.choice(string.ascii_lowercase)
+                   for _ in range(rs.randint(3, 10)))
+
+
+def legacy_parse(keywords, text):
+    text = text.lower()
+    for keyword, intent in keywords:
+        if keyword in text:
+            return intent
+    return None
+
+
+def time_per_message(parse, messages):
+    def run():
+        for message in messages:
+            parse(message)
+
+    # best of several runs to reduce the noise
+    return min(timeit.repeat(run, number=1, repeat=3)) / len(messages)
+
+
+if __name__ == '__main__':
+    cmdline_args = create_argument_parser().parse_args()
+
+    rs = random.Random(42)
+    messages = [" ".join(random_word(rs) for _ in range(rs.randint(5, 15)))
+                for _ in range(cmdline_args.num_messages)]
+
+    print("Keyword intent classification per message:")
+    for num_keywords in cmdline_args.num_keywords:
+        keywords = [(" ".join(random_word(rs)
+                              for _ in range(rs.randint(1, 2))),
+                     "intent_{}".format(i % 50))
+                    for i in range(num_keywords)]
+        classifier = KeywordIntentClassifier({
+            "keywords": {intent: [k for k, i in keywords if i == intent]
+                         for _, intent in keywords},
+            "word_boundaries": "none"})
+
+        legacy_latency = time_per_message(
+                lambda m: legacy_parse(keywords, m), messages)
+        automaton_latency = time_per_message(classifier.parse, messages)
+        print("  {:>6} keywords  substring search {:>9.1f} us, automaton "
+              "{:>6.1f} us ({:.1f}x)"
+              "".format(num_keywords, legacy_latency * 1e6,
+                        automaton_latency * 1e6,
+                        legacy_latency / automaton_latency))
@@ -0,0 +1,115 @@
+"""Measures the memory used by messages and tokens of a large corpus.
+
+Loads the training data, replicates it to the requested size, tokenizes
+and featurizes it (regex featurizer, which sets token attributes) and
+reports the memory allocated by the resulting messages. For comparison,
+the same corpus is held in the dict based representation rasa_nlu used
+before messages and tokens got slots.
+
+Usage:
+    python benchmarks/message_memory.py -d data/examples/rasa/demo-rasa.json
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import gc
+import tracemalloc
+
+from rasa_nlu.featurizers.regex_featurizer import RegexFeaturizer
+from rasa_nlu.tokenizers import Tokens
+from rasa_nlu.tokenizers.whitespace_tokenizer import WhitespaceTokenizer
+from rasa_nlu.training_data import Message, load_data
+
+
+class LegacyToken(object):
+    def __init__(self, text, offset, data=None):
+        self.offset = offset
+        self.text = text
+        self.end = offset + len(text)
+        self.data = data if data else {}
+
+    def set(self, prop, info):
+        self.data[prop] = info
+
+
+class LegacyMessage(object):
+    def __init__(self, text, data=None):
+        self.text = text
+        self.time = None
+        self.data = data if data else {}
+        self.output_properties = set()
+
+    def get(self, prop, default=None):
+        return self.data.get(prop, default)
+
+    def set(self, prop, info):
+        self.data[prop] = info
+
+
+def create_argument_parser():
+    parser = argparse.ArgumentParser(
+            description='benchmark the memory used by messages and tokens')
+    parser.add_argument('-d', '--data',
+                        default="data/examples/rasa/demo-rasa.json",
+                        help="training data used to build the corpus")
+    parser.add_argument('-n', '--num_examples',
+                        default=200000,
+                        type=int,
+                        help="number of messages of the corpus")
+    return parser
+
+
+def build_corpus(texts, num_examples, message_class, token_class,
+                 sequence=list):
+    tokenizer = WhitespaceTokenizer()
+    featurizer = RegexFeaturizer(known_patterns=[
+        {"name": "number", "pattern": "[0-9]+"},
+        {"name": "greet", "pattern": "\\bhe[y|llo]"}])
+
+    corpus = []
+    for i in range(num_examples):
+        # make every text unique to avoid measuring shared strings only
+        text = "{} {}".format(texts[i % len(texts)], i)
+        message = message_class(text, {"intent": "greet"})
+        tokens = [token_class(t.text, t.offset)
+                  for t in tokenizer.tokenize(text)]
+        message.set("tokens", sequence(tokens))
+        featurizer.features_for_patterns(message)
+        corpus.append(message)
+    return corpus
+
+
+def measure(texts, num_examples, *args):
+    gc.collect()
+    tracemalloc.start()
+    corpus = build_corpus(texts, num_examples, *args)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del corpus
+    return current, peak
+
+
+if __name__ == '__main__':
+    cmdline_args = create_argument_parser().parse_args()
+
+    from rasa_nlu.tokenizers import Token
+
+    texts = [e.text for e in load_data(cmdline_args.data).training_examples]
+    n = cmdline_args.num_examples
+
+    results = [
+        ("dict based message & tokens",
+         measure(texts, n, LegacyMessage, LegacyToken)),
+        ("slotted message & token list",
+         measure(texts, n, Message, Token)),
+        ("slotted message & token arrays",
+         measure(texts, n, Message, Token, Tokens)),
+    ]
+
+    print("Memory for {} messages:".format(n))
+    for name, (current, peak) in results:
+        print("  {:<32} {:>8.1f} MB retained, {:>8.1f} MB peak"
+              "".format(name, current / 1e6, peak / 1e6))
@@ -0,0 +1,99 @@
+"""Measures the per message latency of the sklearn intent classifier.
+
+Trains the classifier on random features of the requested number of
+intents and compares classifying single messages using the trained
+sklearn estimator (`GridSearchCV.best_estimator_` or the calibrated
+classifier) with the exported numpy scorer.
+
+Usage:
+    python benchmarks/sklearn_intent_inference.py -c logistic_regression
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import timeit
+
+import numpy as np
+
+from rasa_nlu.classifiers.sklearn_intent_classifier import \
+    SklearnIntentClassifier
+from rasa_nlu.training_data import Message, TrainingData
+
+
+def create_argument_parser():
+    parser = argparse.ArgumentParser(
+            description='benchmark the latency of the sklearn intent '
+                        'classifier')
+    parser.add_argument('-c', '--classifier',
+                        default="logistic_regression",
+                        choices=["linear_svc", "sgd",
+                                 "logistic_regression"],
+                        help="classifier to train")
+    parser.add_argument('-i', '--num_intents',
+                        default=30,
+                        type=int,
+                        help="number of intents")
+    parser.add_argument('-f', '--num_features',
+                        default=100,
+                        type=int,
+                        help="dimension of the text features")
+    parser.add_argument('-n', '--num_messages',
+                        default=2000,
+                        type=int,
+                        help="number of classified messages")
+    return parser
+
+
+def training_data(num_intents, num_features, examples_per_intent=20):
+    rs = np.random.RandomState(42)
+    centers = rs.normal(size=(num_intents, num_features))
+    examples = []
+    for i, center in enumerate(centers):
+        for _ in range(examples_per_intent):
+            m = Message("", {"intent": "intent_{}".format(i)})
+            m.set("text_features", center + rs.normal(size=num_features))
+            examples.append(m)
+    return TrainingData(examples)
+
+
+def time_per_message(classifier, messages):
+    def classify():
+        for message in messages:
+            classifier.process(message)
+
+    # best of several runs to reduce the noise
+    return min(timeit.repeat(classify, number=1, repeat=5)) / len(messages)
+
+
+if __name__ == '__main__':
+    cmdline_args = create_argument_parser().parse_args()
+
+    classifier = SklearnIntentClassifier(
+            {"classifier": cmdline_args.classifier, "C": [1, 10]})
+    classifier.train(training_data(cmdline_args.num_intents,
+                                   cmdline_args.num_features), None)
+    if classifier.scorer is None:
+        raise ValueError("The trained classifier can not be exported.")
+
+    messages = []
+    for features in np.random.RandomState(0).normal(
+            size=(cmdline_args.num_messages, cmdline_args.num_features)):
+        message = Message("")
+        message.set("text_features", features)
+        messages.append(message)
+
+    scorer = classifier.scorer
+    numpy_latency = time_per_message(classifier, messages)
+    classifier.scorer = None
+    sklearn_latency = time_per_message(classifier, messages)
+
+    print("Latency per message ({}, {} intents, {} features):"
+          "".format(cmdline_args.classifier, cmdline_args.num_intents,
+                    cmdline_args.num_features))
+    print("  sklearn estimator {:>10.1f} us".format(sklearn_latency * 1e6))
+    print("  numpy scorer      {:>10.1f} us".format(numpy_latency * 1e6))
+    print("  speedup           {:>10.1f} x"
+          "".format(sklearn_latency / numpy_latency))
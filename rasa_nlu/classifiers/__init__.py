@@ -3,6 +3,21 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import numpy as np
+
 # How many intents are at max put into the output intent
 # ranking, everything else will be cut off
 INTENT_RANKING_LENGTH = 10
+
+
+def top_k(scores, k):
+    # type: (np.ndarray, int) -> np.ndarray
+    """Indices of the `k` highest scores, highest first.
+
+    Only the selected scores get sorted, which is a lot cheaper than
+    sorting all of them if there are many."""
+
+    if k >= scores.shape[0]:
+        return np.argsort(-scores, kind="mergesort")
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="mergesort")]
@@ -8,10 +8,13 @@ import logging
 import os
 
 import typing
-from typing import List, Text, Any, Optional, Dict
+from typing import List, Text, Any, Optional, Dict, Tuple
 
 from rasa_nlu.classifiers import INTENT_RANKING_LENGTH
+from rasa_nlu.classifiers.embedding_scorer import EmbeddingIntentScorer
+from rasa_nlu import utils
 from rasa_nlu.components import Component
+from rasa_nlu.utils import tensorflow_utils
 import numpy as np
 
 try:
@@ -27,11 +30,38 @@ if typing.TYPE_CHECKING:
     from rasa_nlu.training_data import TrainingData
     from rasa_nlu.model import Metadata
     from rasa_nlu.training_data import Message
+    from rasa_nlu.utils.tensorflow_utils import SharedSession
 
-try:
-    import tensorflow as tf
-except ImportError:
-    tf = None
+SCORER_FILE_NAME = "intent_classifier_tensorflow_embedding_scorer.npz"
+
+
+class EarlyStopping(object):
+    """Decides to stop training once the score stops improving."""
+
+    def __init__(self, patience, min_delta=0.0):
+        # type: (int, float) -> None
+
+        self.patience = patience
+        self.min_delta = min_delta
+        self.best_score = None
+        self.num_bad_evaluations = 0
+
+    @property
+    def enabled(self):
+        # type: () -> bool
+        return self.patience > 0
+
+    def should_stop(self, score):
+        # type: (float) -> bool
+        """Records the score of an evaluation, higher is better."""
+
+        if (self.best_score is None or
+                score > self.best_score + self.min_delta):
+            self.best_score = score
+            self.num_bad_evaluations = 0
+        else:
+            self.num_bad_evaluations += 1
+        return self.enabled and self.num_bad_evaluations >= self.patience
 
 
 class EmbeddingIntentClassifier(Component):
@@ -58,6 +88,8 @@ class EmbeddingIntentClassifier(Component):
 
     requires = ["text_features"]
 
+    concurrent = True
+
     defaults = {
         # nn architecture
         "num_hidden_layers_a": 2,
@@ -66,6 +98,24 @@ class EmbeddingIntentClassifier(Component):
         "hidden_layer_size_b": [],
         "batch_size": 32,
         "epochs": 300,
+        # number of batches created ahead in a background thread while
+        # the current batch is trained, 0 creates them in between
+        "prefetch_batches": 2,
+
+        # evaluation and early stopping
+        # how often (in epochs) the accuracy is computed during training
+        "evaluate_every_num_epochs": 10,
+        # number of randomly selected training examples used to compute
+        # the training accuracy, 0 uses all of them
+        "evaluate_on_num_examples": 1000,
+        # fraction of the examples of every intent held out from training
+        # to compute the validation accuracy, 0.0 holds out none
+        "validation_split": 0.0,
+        # stop training if the validation accuracy (or the training loss,
+        # if nothing is held out) did not improve by at least
+        # `early_stopping_min_delta` for this many evaluations, 0 disables
+        "early_stopping_patience": 0,
+        "early_stopping_min_delta": 0.001,
 
         # embedding parameters
         "embed_dim": 10,
@@ -82,7 +132,32 @@ class EmbeddingIntentClassifier(Component):
 
         # flag if tokenize intents
         "intent_tokenization_flag": False,
-        "intent_split_symbol": '_'
+        "intent_split_symbol": '_',
+
+        # classify messages using the precomputed intent embeddings and
+        # numpy only. Loading such a model does not import tensorflow
+        "numpy_inference": True,
+
+        # approximate search over the intent embeddings by `numpy_inference`
+        # if there are at least this many intents, 0 always compares
+        # messages to all intents. The index is built when persisting
+        "ann_min_intents": 0,
+        # number of clusters of the intent embeddings, 0 uses the square
+        # root of the number of intents
+        "ann_num_clusters": 0,
+        # number of clusters searched per message. More probes find the
+        # most similar intents more reliably, but take longer
+        "ann_num_probes": 8,
+
+        # size of the thread pools of the tensorflow sessions,
+        # 0 lets tensorflow decide (one thread per cpu core)
+        "intra_op_parallelism_threads": 0,
+        "inter_op_parallelism_threads": 0,
+
+        # load the graph into one of at most `shared_sessions` sessions
+        # shared by all models of the process, instead of creating a
+        # session per model. 0 creates a session per model
+        "shared_sessions": 0
     }
 
     def _load_nn_architecture_params(self):
@@ -92,6 +167,18 @@ class EmbeddingIntentClassifier(Component):
         self.hidden_layer_size_b = self.component_config['hidden_layer_size_b']
         self.batch_size = self.component_config['batch_size']
         self.epochs = self.component_config['epochs']
+        self.prefetch_batches = self.component_config['prefetch_batches']
+
+    def _load_evaluation_params(self):
+        self.evaluate_every_num_epochs = max(
+                1, self.component_config['evaluate_every_num_epochs'])
+        self.evaluate_on_num_examples = self.component_config[
+                                            'evaluate_on_num_examples']
+        self.validation_split = self.component_config['validation_split']
+        self.early_stopping_patience = self.component_config[
+                                            'early_stopping_patience']
+        self.early_stopping_min_delta = self.component_config[
+                                            'early_stopping_min_delta']
 
     def _load_embedding_params(self):
         self.embed_dim = self.component_config['embed_dim']
@@ -150,7 +237,9 @@ class EmbeddingIntentClassifier(Component):
 
     @staticmethod
     def _check_tensorflow():
-        if tf is None:
+        try:
+            import tensorflow
+        except ImportError:
             raise ImportError(
                 'Failed to import `tensorflow`. '
                 'Please install `tensorflow`. '
@@ -164,15 +253,21 @@ class EmbeddingIntentClassifier(Component):
                  graph=None,  # type: Optional[tf.Graph]
                  intent_placeholder=None,  # type: Optional[tf.Tensor]
                  embedding_placeholder=None,  # type: Optional[tf.Tensor]
-                 similarity_op=None   # type: Optional[tf.Tensor]
+                 similarity_op=None,  # type: Optional[tf.Tensor]
+                 scorer=None,  # type: Optional[EmbeddingIntentScorer]
+                 session_scope=None,  # type: Optional[Text]
+                 shared_session=None  # type: Optional[SharedSession]
                  ):
         # type: (...) -> None
         """Declare instant variables with default values"""
-        self._check_tensorflow()
+        if scorer is None:
+            self._check_tensorflow()
         super(EmbeddingIntentClassifier, self).__init__(component_config)
 
         # nn architecture parameters
         self._load_nn_architecture_params()
+        # evaluation and early stopping
+        self._load_evaluation_params()
         # embedding parameters
         self._load_embedding_params()
         # regularization
@@ -203,12 +298,28 @@ class EmbeddingIntentClassifier(Component):
         self.intent_placeholder = intent_placeholder
         self.embedding_placeholder = embedding_placeholder
         self.similarity_op = similarity_op
+        # name scope of the graph of this model in a shared session
+        self.session_scope = session_scope
+        self.shared_session = shared_session
+
+        # tensorflow free inference
+        self.scorer = scorer
 
     @classmethod
     def required_packages(cls):
         # type: () -> List[Text]
         return ["tensorflow"]
 
+    @classmethod
+    def required_packages_for_load(cls, component_meta):
+        # type: (Dict[Text, Any]) -> List[Text]
+        """Models with a persisted scorer are served using numpy only."""
+
+        if (component_meta.get("numpy_inference", True) and
+                component_meta.get("scorer_file")):
+            return []
+        return cls.required_packages()
+
     # training data helpers:
     @staticmethod
     def _create_intent_dict(training_data):
@@ -269,16 +380,32 @@ class EmbeddingIntentClassifier(Component):
         Y = np.stack([self.encoded_all_intents[intent_idx]
                       for intent_idx in intents_for_X])
 
-        all_Y = self._create_all_Y(X.shape[0])
-
-        helper_data = intents_for_X, all_Y
+        helper_data = intents_for_X
 
         return X, Y, helper_data
 
+    @staticmethod
+    def _split_validation(intents_for_X, validation_split):
+        # type: (np.ndarray, float) -> Tuple[np.ndarray, np.ndarray]
+        """Indices of the training and the validation examples.
+
+        Holds out the same fraction of the examples of every intent,
+        but at least one example of every intent is used for training."""
+
+        train_idx, val_idx = [], []
+        for intent_id in np.unique(intents_for_X):
+            idx = np.random.permutation(np.where(intents_for_X ==
+                                                 intent_id)[0])
+            num_val = min(int(len(idx) * validation_split), len(idx) - 1)
+            val_idx.append(idx[:num_val])
+            train_idx.append(idx[num_val:])
+        return np.concatenate(train_idx), np.concatenate(val_idx)
+
     # tf helpers:
     def _create_tf_embed_nn(self, x_in, is_training,
                             num_layers, layer_size, name):
         """Create embed nn for layer with name"""
+        import tensorflow as tf
 
         reg = tf.contrib.layers.l2_regularizer(self.C2)
         x = x_in
@@ -298,6 +425,7 @@ class EmbeddingIntentClassifier(Component):
 
     def _tf_sim(self, a, b):
         """Define similarity"""
+        import tensorflow as tf
 
         if self.similarity_type == 'cosine':
             a = tf.nn.l2_normalize(a, -1)
@@ -317,6 +445,7 @@ class EmbeddingIntentClassifier(Component):
 
     def _tf_loss(self, sim, sim_emb):
         """Define loss"""
+        import tensorflow as tf
 
         if self.use_max_sim_neg:
             max_sim_neg = tf.reduce_max(sim[:, 1:], -1)
@@ -358,78 +487,150 @@ class EmbeddingIntentClassifier(Component):
         return sim, loss
 
     # training helpers:
+    @staticmethod
+    def _sample_negatives(intent_ids, num_intents, num_neg):
+        # type: (np.ndarray, int, int) -> np.ndarray
+        """Sample `num_neg` wrong intents for every correct intent.
+
+        Samples from all intents except the correct one, for the whole
+        batch at once: indexes at or above the correct one are shifted by
+        one, which skips the correct index."""
+
+        negs = np.random.randint(0, num_intents - 1,
+                                 size=(len(intent_ids), num_neg))
+        return negs + (negs >= intent_ids[:, np.newaxis])
+
     def _create_batch_b(self, batch_pos_b, intent_ids):
         """Create batch of intents, where the first is correct intent
             and the rest are wrong intents sampled randomly"""
 
         batch_pos_b = batch_pos_b[:, np.newaxis, :]
 
-        # sample negatives
-        batch_neg_b = np.zeros((batch_pos_b.shape[0], self.num_neg,
-                                batch_pos_b.shape[-1]))
-        for b in range(batch_pos_b.shape[0]):
-            # create negative indexes out of possible ones
-            # except for correct index of b
-            negative_indexes = [i for i in range(
-                                    self.encoded_all_intents.shape[0])
-                                if i != intent_ids[b]]
-            negs = np.random.choice(negative_indexes, size=self.num_neg)
-
-            batch_neg_b[b] = self.encoded_all_intents[negs]
+        negs = self._sample_negatives(intent_ids,
+                                      self.encoded_all_intents.shape[0],
+                                      self.num_neg)
+        batch_neg_b = self.encoded_all_intents[negs]
 
         return np.concatenate([batch_pos_b, batch_neg_b], 1)
 
-    def _train_tf(self, X, Y, helper_data,
-                  sess, a_in, b_in, sim,
-                  loss, is_training, train_op):
-        """Train tf graph"""
-        sess.run(tf.global_variables_initializer())
+    def _create_batches(self, X, Y, intents_for_X):
+        """Yields the batches of all epochs.
 
-        intents_for_X, all_Y = helper_data
+        Every item is the epoch, whether it is the last batch of the
+        epoch, the batch of inputs and the batch of intents."""
 
         batches_per_epoch = (len(X) // self.batch_size +
                              int(len(X) % self.batch_size > 0))
         for ep in range(self.epochs):
             indices = np.random.permutation(len(X))
-            sess_out = {}
             for i in range(batches_per_epoch):
-                end_idx = (i + 1) * self.batch_size
-                start_idx = i * self.batch_size
-                batch_a = X[indices[start_idx:end_idx]]
-                batch_pos_b = Y[indices[start_idx:end_idx]]
-                intents_for_b = intents_for_X[indices[start_idx:end_idx]]
+                batch_idx = indices[i * self.batch_size:
+                                    (i + 1) * self.batch_size]
                 # add negatives
-                batch_b = self._create_batch_b(batch_pos_b, intents_for_b)
+                batch_b = self._create_batch_b(Y[batch_idx],
+                                               intents_for_X[batch_idx])
 
-                sess_out = sess.run({'loss': loss, 'train_op': train_op},
-                                    feed_dict={a_in: batch_a,
-                                               b_in: batch_b,
-                                               is_training: True})
+                yield (ep, i == batches_per_epoch - 1,
+                       X[batch_idx], batch_b)
 
-            if logger.isEnabledFor(logging.INFO) and (ep + 1) % 10 == 0:
-                self._output_training_stat(X, intents_for_X, all_Y,
-                                           sess, a_in, b_in,
-                                           sim, is_training,
-                                           ep, sess_out)
+    def _train_tf(self, X, Y, helper_data,
+                  sess, a_in, b_in, sim,
+                  loss, is_training, train_op):
+        """Train tf graph"""
+        import tensorflow as tf
 
-    def _output_training_stat(self,
-                              X, intents_for_X, all_Y,
-                              sess, a_in, b_in, sim, is_training,
-                              ep, sess_out):
-        """Output training statistics"""
+        sess.run(tf.global_variables_initializer())
 
-        train_sim = sess.run(sim, feed_dict={a_in: X,
-                                             b_in: all_Y,
-                                             is_training: False})
+        intents_for_X = helper_data
+
+        X_val, intents_for_val = None, None
+        if self.validation_split > 0:
+            train_idx, val_idx = self._split_validation(intents_for_X,
+                                                        self.validation_split)
+            if len(val_idx):
+                X_val, intents_for_val = X[val_idx], intents_for_X[val_idx]
+                X, Y = X[train_idx], Y[train_idx]
+                intents_for_X = intents_for_X[train_idx]
+            logger.info("Holding out {} examples for validation"
+                        "".format(len(val_idx)))
+
+        # the training accuracy is computed on a fixed subsample
+        if 0 < self.evaluate_on_num_examples < len(X):
+            eval_idx = np.random.choice(len(X), self.evaluate_on_num_examples,
+                                        replace=False)
+        else:
+            eval_idx = np.arange(len(X))
 
-        train_acc = np.mean(np.argmax(train_sim, -1) == intents_for_X)
-        logger.info("epoch {} / {}: loss {}, train accuracy : {:.3f}"
-                    "".format((ep + 1), self.epochs,
-                              sess_out.get('loss'), train_acc))
+        early_stopping = EarlyStopping(self.early_stopping_patience,
+                                       self.early_stopping_min_delta)
+
+        # the next batches are created while the graph runs
+        batches = utils.prefetch(self._create_batches(X, Y, intents_for_X),
+                                 self.prefetch_batches)
+        epoch_losses = []
+        try:
+            for ep, end_of_epoch, batch_a, batch_b in batches:
+                sess_out = sess.run({'loss': loss, 'train_op': train_op},
+                                    feed_dict={a_in: batch_a,
+                                               b_in: batch_b,
+                                               is_training: True})
+                epoch_losses.append(sess_out['loss'])
+                if not end_of_epoch:
+                    continue
+
+                epoch_loss = np.mean(epoch_losses)
+                epoch_losses = []
+                if ((ep + 1) % self.evaluate_every_num_epochs != 0 or
+                        not (early_stopping.enabled or
+                             logger.isEnabledFor(logging.INFO))):
+                    continue
+
+                train_acc = self._accuracy(X[eval_idx], intents_for_X[eval_idx],
+                                           sess, a_in, b_in, sim, is_training)
+                if X_val is not None:
+                    val_acc = self._accuracy(X_val, intents_for_val,
+                                             sess, a_in, b_in, sim, is_training)
+                    logger.info("epoch {} / {}: loss {:.3f}, train accuracy : "
+                                "{:.3f}, validation accuracy : {:.3f}"
+                                "".format(ep + 1, self.epochs, epoch_loss,
+                                          train_acc, val_acc))
+                    score = val_acc
+                else:
+                    logger.info("epoch {} / {}: loss {:.3f}, train accuracy : "
+                                "{:.3f}".format(ep + 1, self.epochs,
+                                                epoch_loss, train_acc))
+                    score = -epoch_loss
+
+                if early_stopping.should_stop(score):
+                    logger.info("Stopping early after epoch {} / {}, no "
+                                "improvement for the last {} evaluations."
+                                "".format(ep + 1, self.epochs,
+                                          self.early_stopping_patience))
+                    break
+        finally:
+            # stops the producer thread on errors as well
+            batches.close()
+
+    def _accuracy(self, X, intents_for_X,
+                  sess, a_in, b_in, sim, is_training,
+                  batch_size=1000):
+        """Fraction of examples whose most similar intent is correct."""
+
+        all_Y = self._create_all_Y(min(batch_size, len(X)))
+        correct = 0
+        for start in range(0, len(X), batch_size):
+            batch_a = X[start:start + batch_size]
+            batch_sim = sess.run(sim, feed_dict={a_in: batch_a,
+                                                 b_in: all_Y[:len(batch_a)],
+                                                 is_training: False})
+            correct += np.sum(np.argmax(batch_sim, -1) ==
+                              intents_for_X[start:start + batch_size])
+        return correct / len(X)
 
     def train(self, training_data, cfg=None, **kwargs):
         # type: (TrainingData, Optional[RasaNLUModelConfig], **Any) -> None
         """Train the embedding intent classifier on a data set."""
+        import tensorflow as tf
 
         intent_dict = self._create_intent_dict(training_data)
         if len(intent_dict) < 2:
@@ -471,13 +672,45 @@ class EmbeddingIntentClassifier(Component):
             train_op = tf.train.AdamOptimizer().minimize(loss)
 
             # train tensorflow graph
-            sess = tf.Session()
+            sess = tf.Session(config=self._session_config(
+                                            self.component_config))
             self.session = sess
 
             self._train_tf(X, Y, helper_data,
                            sess, a_in, b_in, sim,
                            loss, is_training, train_op)
 
+        if self.component_config["numpy_inference"]:
+            self.scorer = self._export_scorer()
+
+    @staticmethod
+    def _thread_config(component_config):
+        return (component_config.get("intra_op_parallelism_threads", 0),
+                component_config.get("inter_op_parallelism_threads", 0))
+
+    @classmethod
+    def _session_config(cls, component_config):
+        return tensorflow_utils.session_config(
+                *cls._thread_config(component_config))
+
+    def _export_scorer(self):
+        # type: () -> EmbeddingIntentScorer
+        """Precomputes the intent embeddings of the trained graph."""
+        import tensorflow as tf
+
+        with self.graph.as_default():
+            weights = self.session.run({v.name: v
+                                        for v in tf.trainable_variables()})
+
+        labels = [self.inv_intent_dict[i]
+                  for i in range(len(self.inv_intent_dict))]
+        return EmbeddingIntentScorer.from_weights(weights,
+                                                  self.num_hidden_layers_a,
+                                                  self.num_hidden_layers_b,
+                                                  self.encoded_all_intents,
+                                                  self.similarity_type,
+                                                  labels)
+
     # process helpers
     def _calculate_message_sim(self, X, all_Y):
         """Load tf graph and calculate message similarities"""
@@ -486,7 +719,8 @@ class EmbeddingIntentClassifier(Component):
         b_in = self.intent_placeholder
 
         sim = self.similarity_op
-        sess = self.session
+        # shared sessions lock their graph against concurrent imports
+        sess = self.shared_session or self.session
 
         message_sim = sess.run(sim, feed_dict={a_in: X,
                                                b_in: all_Y})
@@ -507,7 +741,15 @@ class EmbeddingIntentClassifier(Component):
         intent = {"name": None, "confidence": 0.0}
         intent_ranking = []
 
-        if self.session is None:
+        if self.scorer is not None:
+            intents, message_sim = self.scorer.ranking(
+                    message.get("text_features"), INTENT_RANKING_LENGTH)
+            intent = {"name": intents[0], "confidence": message_sim[0]}
+            intent_ranking = [{"name": intent_name, "confidence": score}
+                              for intent_name, score in zip(intents,
+                                                            message_sim)]
+
+        elif self.session is None:
             logger.error("There is no trained tf.session: "
                          "component is either not trained or "
                          "didn't receive enough training data")
@@ -547,33 +789,56 @@ class EmbeddingIntentClassifier(Component):
 
         meta = model_metadata.for_component(cls.name)
 
+        if (model_dir and meta.get("numpy_inference", True) and
+                meta.get("scorer_file")):
+            scorer_file = os.path.join(model_dir, meta["scorer_file"])
+            if os.path.exists(scorer_file):
+                scorer = EmbeddingIntentScorer.load(scorer_file)
+                if scorer.index is not None and meta.get("ann_num_probes"):
+                    # the probes can be changed without retraining
+                    scorer.index.num_probes = meta["ann_num_probes"]
+                # neither restores the checkpoint nor imports tensorflow
+                return EmbeddingIntentClassifier(
+                        component_config=meta,
+                        inv_intent_dict=cls._load_inv_intent_dict(model_dir),
+                        scorer=scorer)
+
         if model_dir and meta.get("classifier_file"):
+            import tensorflow as tf
+
             file_name = meta.get("classifier_file")
             checkpoint = os.path.join(model_dir, file_name)
-            graph = tf.Graph()
-            with graph.as_default():
-                sess = tf.Session()
-                saver = tf.train.import_meta_graph(checkpoint + '.meta')
 
-                saver.restore(sess, checkpoint)
+            if meta.get("shared_sessions"):
+                shared, scope = tensorflow_utils.session_manager.\
+                    load_checkpoint(checkpoint,
+                                    cls._thread_config(meta),
+                                    meta["shared_sessions"])
+                graph, sess = shared.graph, shared.session
+            else:
+                shared, scope = None, None
+                graph = tf.Graph()
+                with graph.as_default():
+                    sess = tf.Session(config=cls._session_config(meta))
+                    saver = tf.train.import_meta_graph(checkpoint + '.meta')
+
+                    saver.restore(sess, checkpoint)
 
+            with graph.as_default():
                 embedding_placeholder = tf.get_collection(
-                    'embedding_placeholder')[0]
+                    'embedding_placeholder', scope)[0]
                 intent_placeholder = tf.get_collection(
-                    'intent_placeholder')[0]
+                    'intent_placeholder', scope)[0]
                 similarity_op = tf.get_collection(
-                    'similarity_op')[0]
+                    'similarity_op', scope)[0]
 
-            with io.open(os.path.join(
-                    model_dir,
-                    cls.name + "_inv_intent_dict.pkl"), 'rb') as f:
-                inv_intent_dict = pickle.load(f)
+            inv_intent_dict = cls._load_inv_intent_dict(model_dir)
             with io.open(os.path.join(
                     model_dir,
                     cls.name + "_encoded_all_intents.pkl"), 'rb') as f:
                 encoded_all_intents = pickle.load(f)
 
-            return EmbeddingIntentClassifier(
+            classifier = EmbeddingIntentClassifier(
                     component_config=meta,
                     inv_intent_dict=inv_intent_dict,
                     encoded_all_intents=encoded_all_intents,
@@ -581,8 +846,14 @@ class EmbeddingIntentClassifier(Component):
                     graph=graph,
                     intent_placeholder=intent_placeholder,
                     embedding_placeholder=embedding_placeholder,
-                    similarity_op=similarity_op
+                    similarity_op=similarity_op,
+                    session_scope=scope,
+                    shared_session=shared
             )
+            if shared is not None:
+                tensorflow_utils.session_manager.release_with(classifier,
+                                                              shared, scope)
+            return classifier
 
         else:
             logger.warning("Failed to load nlu model. Maybe path {} "
@@ -590,10 +861,36 @@ class EmbeddingIntentClassifier(Component):
                            "".format(os.path.abspath(model_dir)))
             return EmbeddingIntentClassifier(component_config=meta)
 
+    def resource_usage(self):
+        # type: () -> Optional[Dict[Text, Any]]
+
+        if self.scorer is not None:
+            return {"memory": self.scorer.nbytes,
+                    "tensorflow_session": None}
+        elif self.session is not None:
+            intra_op, inter_op = self._thread_config(self.component_config)
+            return {"memory": tensorflow_utils.variables_memory(
+                                    self.graph, self.session_scope),
+                    "tensorflow_session": ("shared" if self.session_scope
+                                           else "own"),
+                    "intra_op_parallelism_threads": intra_op,
+                    "inter_op_parallelism_threads": inter_op}
+        else:
+            return None
+
+    @classmethod
+    def _load_inv_intent_dict(cls, model_dir):
+        with io.open(os.path.join(
+                model_dir,
+                cls.name + "_inv_intent_dict.pkl"), 'rb') as f:
+            return pickle.load(f)
+
     def persist(self, model_dir):
         # type: (Text) -> Dict[Text, Any]
         """Persist this model into the passed directory.
         Return the metadata necessary to load the model again."""
+        import tensorflow as tf
+
         if self.session is None:
             return {"classifier_file": None}
 
@@ -631,4 +928,14 @@ class EmbeddingIntentClassifier(Component):
                 self.name + "_encoded_all_intents.pkl"), 'wb') as f:
             pickle.dump(self.encoded_all_intents, f)
 
-        return {"classifier_file": self.name + ".ckpt"}
+        meta = {"classifier_file": self.name + ".ckpt"}
+        if self.scorer is not None:
+            min_intents = self.component_config["ann_min_intents"]
+            if (self.scorer.index is None and min_intents and
+                    len(self.scorer.labels) >= min_intents):
+                self.scorer.build_index(
+                        self.component_config["ann_num_clusters"],
+                        self.component_config["ann_num_probes"])
+            self.scorer.persist(os.path.join(model_dir, SCORER_FILE_NAME))
+            meta["scorer_file"] = SCORER_FILE_NAME
+        return meta
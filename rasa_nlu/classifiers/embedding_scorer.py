@@ -0,0 +1,271 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import logging
+
+import numpy as np
+from builtins import object, range, str
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Text
+from typing import Tuple
+
+from rasa_nlu.classifiers import top_k
+
+logger = logging.getLogger(__name__)
+
+# epsilon used by `tf.nn.l2_normalize`
+L2_NORMALIZE_EPSILON = 1e-12
+
+
+def _feed_forward(x, layers):
+    # type: (np.ndarray, List[Tuple[np.ndarray, np.ndarray]]) -> np.ndarray
+    """Dense layers with relu activations, the last layer is linear."""
+
+    for kernel, bias in layers[:-1]:
+        x = np.maximum(x.dot(kernel) + bias, 0.0)
+    kernel, bias = layers[-1]
+    return x.dot(kernel) + bias
+
+
+def _l2_normalize(x):
+    norm = np.sum(np.square(x), axis=-1, keepdims=True)
+    return x / np.sqrt(np.maximum(norm, L2_NORMALIZE_EPSILON))
+
+
+class IntentEmbeddingIndex(object):
+    """Inverted file index for approximate search over intent embeddings.
+
+    The intent embeddings are clustered by their direction (spherical
+    k-means). A search only computes the similarities to the intents of
+    the `num_probes` clusters closest to the message, instead of to all
+    intents. More probes find the most similar intents more reliably, but
+    take longer."""
+
+    def __init__(self,
+                 centroids,  # type: np.ndarray
+                 offsets,  # type: np.ndarray
+                 intents,  # type: np.ndarray
+                 embeddings,  # type: np.ndarray
+                 num_probes=8  # type: int
+                 ):
+        # type: (...) -> None
+
+        # normalized center of every cluster
+        self.centroids = centroids
+        # the members of cluster `c` are the rows `offsets[c]` up to
+        # `offsets[c + 1]` of `intents` and `embeddings`
+        self.offsets = offsets
+        # intent indices, sorted by cluster
+        self.intents = intents
+        # embeddings of the intents, sorted by cluster. Stored once more
+        # so the members of a cluster are contiguous, without padding
+        # clusters to the size of the largest one
+        self.embeddings = embeddings
+        self.num_probes = num_probes
+
+    @classmethod
+    def build(cls, embeddings, num_clusters=0, num_probes=8,
+              iterations=10, seed=42):
+        # type: (np.ndarray, int, int, int, int) -> IntentEmbeddingIndex
+        """Clusters the embeddings, `0` clusters uses sqrt(#embeddings)."""
+
+        directions = _l2_normalize(embeddings)
+        if num_clusters <= 0:
+            num_clusters = int(np.sqrt(len(embeddings)))
+        num_clusters = max(1, min(num_clusters, len(embeddings)))
+
+        rs = np.random.RandomState(seed)
+        centroids = directions[rs.choice(len(directions), num_clusters,
+                                         replace=False)]
+        for _ in range(iterations):
+            assignments = np.argmax(directions.dot(centroids.T), axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, directions)
+            # empty clusters keep their previous center
+            empty = ~np.any(sums, axis=1)
+            sums[empty] = centroids[empty]
+            centroids = _l2_normalize(sums)
+
+        assignments = np.argmax(directions.dot(centroids.T), axis=1)
+        sizes = np.bincount(assignments, minlength=num_clusters)
+        offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        intents = np.argsort(assignments, kind="mergesort").astype(np.int32)
+
+        return cls(centroids.astype(np.float32), offsets, intents,
+                   embeddings[intents], num_probes)
+
+    def search(self, embedding, k):
+        # type: (np.ndarray, int) -> Tuple[np.ndarray, np.ndarray]
+        """Approximately the `k` most similar intents and their exact
+        similarities."""
+
+        probes = top_k(self.centroids.dot(embedding),
+                       min(self.num_probes, len(self.centroids)))
+        rows = np.concatenate([np.arange(self.offsets[c],
+                                         self.offsets[c + 1])
+                               for c in probes])
+        intents = self.intents[rows]
+        sim = self.embeddings[rows].dot(embedding)
+
+        best = top_k(sim, min(k, len(rows)))
+        return intents[best], sim[best]
+
+    @property
+    def nbytes(self):
+        # type: () -> int
+        return (self.centroids.nbytes + self.offsets.nbytes +
+                self.intents.nbytes + self.embeddings.nbytes)
+
+
+class EmbeddingIntentScorer(object):
+    """Predicts intent similarities of a trained embedding classifier.
+
+    The embeddings of all intents are computed once, hence classifying
+    a message is a feed forward pass of the message network and a single
+    matrix product, using numpy only."""
+
+    def __init__(self,
+                 layers,  # type: List[Tuple[np.ndarray, np.ndarray]]
+                 intent_embeddings,  # type: np.ndarray
+                 similarity_type,  # type: Text
+                 labels,  # type: np.ndarray
+                 index=None  # type: Optional[IntentEmbeddingIndex]
+                 ):
+        # type: (...) -> None
+
+        # kernel and bias of each layer of the message network
+        self.layers = layers
+        # one (normalized if `cosine`) embedding per row
+        self.intent_embeddings = intent_embeddings
+        self.similarity_type = similarity_type
+        # maps the row of an intent embedding to its intent name
+        self.labels = labels
+        # approximate search, all intents are compared if `None`
+        self.index = index
+
+    @classmethod
+    def from_weights(cls,
+                     weights,  # type: Dict[Text, np.ndarray]
+                     num_layers_a,  # type: int
+                     num_layers_b,  # type: int
+                     encoded_all_intents,  # type: np.ndarray
+                     similarity_type,  # type: Text
+                     labels  # type: List[Text]
+                     ):
+        # type: (...) -> EmbeddingIntentScorer
+        """Creates the scorer from the trained variables of the tf graph.
+
+        `weights` maps variable names, e.g. `embed_layer_a/kernel:0`, to
+        their values."""
+
+        def layers(num_layers, name):
+            names = (["hidden_layer_{}_{}".format(name, i)
+                      for i in range(num_layers)] +
+                     ["embed_layer_{}".format(name)])
+            return [(weights[n + "/kernel:0"].astype(np.float32),
+                     weights[n + "/bias:0"].astype(np.float32))
+                    for n in names]
+
+        intent_embeddings = _feed_forward(
+                encoded_all_intents.astype(np.float32),
+                layers(num_layers_b, "b"))
+        if similarity_type == "cosine":
+            intent_embeddings = _l2_normalize(intent_embeddings)
+
+        return cls(layers(num_layers_a, "a"), intent_embeddings,
+                   similarity_type, np.array(labels))
+
+    @property
+    def nbytes(self):
+        # type: () -> int
+        """Memory used by the arrays of the scorer."""
+
+        return (sum(k.nbytes + b.nbytes for k, b in self.layers) +
+                self.intent_embeddings.nbytes +
+                (self.index.nbytes if self.index is not None else 0))
+
+    def build_index(self, num_clusters=0, num_probes=8):
+        # type: (int, int) -> None
+        """Creates the index for approximate search over the intents."""
+
+        self.index = IntentEmbeddingIndex.build(self.intent_embeddings,
+                                                num_clusters, num_probes)
+
+    def embed(self, X):
+        # type: (np.ndarray) -> np.ndarray
+        """Embeddings of the messages in `X`."""
+
+        embedded = _feed_forward(X.astype(np.float32), self.layers)
+        if self.similarity_type == "cosine":
+            embedded = _l2_normalize(embedded)
+        return embedded
+
+    def similarities(self, X):
+        # type: (np.ndarray) -> np.ndarray
+        """Similarities between the messages in `X` and all intents."""
+
+        return self.embed(X).dot(self.intent_embeddings.T)
+
+    def ranking(self, x, k, exact=False):
+        # type: (np.ndarray, int, bool) -> Tuple[List[Text], List[float]]
+        """The `k` most similar intents of a feature vector and their
+        similarities.
+
+        Uses the index, if there is one and `exact` is not set. The
+        intents found by the index are ranked by their exact similarity."""
+
+        embedded = self.embed(x.reshape(1, -1))[0]
+        if self.index is None or exact:
+            sim = self.intent_embeddings.dot(embedded)
+            indices = top_k(sim, k)
+            scores = sim[indices]
+        else:
+            indices, scores = self.index.search(embedded, k)
+        # python types for JSON serializing
+        return self.labels[indices].tolist(), scores.tolist()
+
+    def persist(self, file_name):
+        # type: (Text) -> None
+
+        arrays = {}
+        for i, (kernel, bias) in enumerate(self.layers):
+            arrays["kernel_{}".format(i)] = kernel
+            arrays["bias_{}".format(i)] = bias
+        if self.index is not None:
+            arrays["index_centroids"] = self.index.centroids
+            arrays["index_offsets"] = self.index.offsets
+            arrays["index_intents"] = self.index.intents
+            arrays["index_embeddings"] = self.index.embeddings
+            arrays["index_num_probes"] = np.array(self.index.num_probes)
+        with io.open(file_name, "wb") as f:
+            np.savez(f,
+                     intent_embeddings=self.intent_embeddings,
+                     similarity_type=np.array(self.similarity_type),
+                     labels=np.array([str(label) for label in self.labels]),
+                     **arrays)
+
+    @classmethod
+    def load(cls, file_name):
+        # type: (Text) -> EmbeddingIntentScorer
+
+        with np.load(file_name, allow_pickle=False) as data:
+            num_layers = len([k for k in data.files
+                              if k.startswith("kernel_")])
+            layers = [(data["kernel_{}".format(i)], data["bias_{}".format(i)])
+                      for i in range(num_layers)]
+            if "index_centroids" in data.files:
+                index = IntentEmbeddingIndex(
+                        data["index_centroids"],
+                        data["index_offsets"],
+                        data["index_intents"],
+                        data["index_embeddings"],
+                        int(data["index_num_probes"]))
+            else:
+                index = None
+            return cls(layers, data["intent_embeddings"],
+                       str(data["similarity_type"]), data["labels"], index)
@@ -0,0 +1,168 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import logging
+
+import numpy as np
+from builtins import object, str
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Text
+from typing import Tuple
+
+logger = logging.getLogger(__name__)
+
+# the transitions of all states are stored in a single dict, keyed by the
+# state shifted by this many bits and the code point of the character
+_CHAR_BITS = 21
+
+_NO_OUTPUTS = ()
+
+
+class KeywordAutomaton(object):
+    """Aho-Corasick automaton finding all keywords in a text in one pass.
+
+    Matching takes time linear in the length of the text and the number
+    of matches, independent of the number of keywords."""
+
+    def __init__(self,
+                 keywords,  # type: List[Text]
+                 intents,  # type: List[Text]
+                 transitions,  # type: Dict[int, int]
+                 fail,  # type: List[int]
+                 outputs  # type: List[Tuple[int, ...]]
+                 ):
+        # type: (...) -> None
+
+        self.keywords = keywords
+        # intent of every keyword
+        self.intents = intents
+        # (state << _CHAR_BITS | code point) -> next state
+        self.transitions = transitions
+        # longest proper suffix of every state which is a state as well
+        self.fail = fail
+        # indices of the keywords ending in every state
+        self.outputs = outputs
+        self._lengths = [len(k) for k in keywords]
+
+    @classmethod
+    def build(cls, keyword_intents):
+        # type: (Dict[Text, Text]) -> KeywordAutomaton
+        """Creates the automaton of a keyword to intent mapping."""
+
+        keywords = sorted(k for k in keyword_intents if k)
+        intents = [keyword_intents[k] for k in keywords]
+        transitions = {}
+        fail = [0]
+        outputs = [[]]
+        children = [[]]
+
+        for i, keyword in enumerate(keywords):
+            state = 0
+            for c in keyword:
+                key = state << _CHAR_BITS | ord(c)
+                next_state = transitions.get(key)
+                if next_state is None:
+                    next_state = len(fail)
+                    transitions[key] = next_state
+                    fail.append(0)
+                    outputs.append([])
+                    children.append([])
+                    children[state].append((ord(c), next_state))
+                state = next_state
+            outputs[state].append(i)
+
+        # breadth first, so the fail state of a state is complete before
+        # the states below it are visited
+        queue = [child for _, child in children[0]]
+        for state in queue:
+            for c, child in children[state]:
+                f = fail[state]
+                while f and (f << _CHAR_BITS | c) not in transitions:
+                    f = fail[f]
+                fail[child] = transitions.get(f << _CHAR_BITS | c, 0)
+                outputs[child].extend(outputs[fail[child]])
+                queue.append(child)
+
+        return cls(keywords, intents, transitions, fail,
+                   [tuple(o) if o else _NO_OUTPUTS for o in outputs])
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def iter_matches(self, text):
+        # type: (Text) -> Iterator[Tuple[int, int, int]]
+        """Start, end and keyword index of every keyword in the text."""
+
+        transitions, fail, outputs = self.transitions, self.fail, self.outputs
+        lengths = self._lengths
+        state = 0
+        for end, char in enumerate(text, 1):
+            c = ord(char)
+            while True:
+                next_state = transitions.get(state << _CHAR_BITS | c)
+                if next_state is not None:
+                    state = next_state
+                    break
+                elif state == 0:
+                    break
+                state = fail[state]
+            for i in outputs[state]:
+                yield end - lengths[i], end, i
+
+    def persist(self, file_name):
+        # type: (Text) -> None
+
+        keys = np.fromiter(self.transitions.keys(), dtype=np.int64,
+                           count=len(self.transitions))
+        values = np.fromiter(self.transitions.values(), dtype=np.int32,
+                             count=len(self.transitions))
+        output_lengths = np.array([len(o) for o in self.outputs],
+                                  dtype=np.int32)
+        output_keywords = np.array([i for o in self.outputs for i in o],
+                                   dtype=np.int32)
+        intent_names = sorted(set(self.intents))
+        intent_ids = {intent: i for i, intent in enumerate(intent_names)}
+        with io.open(file_name, "wb") as f:
+            # the keywords are stored as a single string, an array of
+            # strings would pad every keyword to the longest one
+            np.savez(f,
+                     keywords=np.array("".join(self.keywords)),
+                     keyword_lengths=np.array(self._lengths, dtype=np.int32),
+                     intent_names=np.array([str(i) for i in intent_names]),
+                     keyword_intents=np.array(
+                             [intent_ids[i] for i in self.intents],
+                             dtype=np.int32),
+                     transition_keys=keys,
+                     transition_states=values,
+                     fail=np.array(self.fail, dtype=np.int32),
+                     output_lengths=output_lengths,
+                     output_keywords=output_keywords)
+
+    @classmethod
+    def load(cls, file_name):
+        # type: (Text) -> KeywordAutomaton
+
+        with np.load(file_name, allow_pickle=False) as data:
+            text = str(data["keywords"])
+            ends = np.cumsum(data["keyword_lengths"]).tolist()
+            keywords = [text[end - length:end] for end, length
+                        in zip(ends, data["keyword_lengths"].tolist())]
+            intent_names = [str(i) for i in data["intent_names"]]
+            intents = [intent_names[i]
+                       for i in data["keyword_intents"].tolist()]
+            transitions = dict(zip(data["transition_keys"].tolist(),
+                                   data["transition_states"].tolist()))
+            fail = data["fail"].tolist()
+            output_keywords = data["output_keywords"].tolist()
+            outputs = []
+            start = 0
+            for length in data["output_lengths"].tolist():
+                outputs.append(tuple(output_keywords[start:start + length])
+                               if length else _NO_OUTPUTS)
+                start += length
+        return cls(keywords, intents, transitions, fail, outputs)
@@ -2,43 +2,255 @@ from __future__ import unicode_literals
 from __future__ import print_function
 from __future__ import division
 from __future__ import absolute_import
-from builtins import map
+
+import logging
+import os
+
+import typing
 from typing import Any
 from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
 from typing import Text
 
+from rasa_nlu.classifiers.keyword_automaton import KeywordAutomaton
 from rasa_nlu.components import Component
+from rasa_nlu.config import RasaNLUModelConfig
 from rasa_nlu.training_data import Message
+from rasa_nlu.training_data import TrainingData
+from rasa_nlu.utils.text_normalizer import BASE_VARIANT, to_halfwidth
+
+logger = logging.getLogger(__name__)
+
+if typing.TYPE_CHECKING:
+    from rasa_nlu.model import Metadata
+
+KEYWORD_AUTOMATON_FILE_NAME = "intent_classifier_keyword.npz"
+
+WORD_BOUNDARIES = ["word", "tokens", "none"]
+
+# chinese and japanese text is written without spaces, so every character
+# of these blocks starts and ends a word
+CJK_RANGES = [("\u3040", "\u30ff"),  # hiragana and katakana
+              ("\u3400", "\u4dbf"),  # cjk unified ideographs extension a
+              ("\u4e00", "\u9fff"),  # cjk unified ideographs
+              ("\uf900", "\ufaff")]  # cjk compatibility ideographs
+
+
+def _is_cjk(char):
+    return any(low <= char <= high for low, high in CJK_RANGES)
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == "_"
+
+
+def is_word_boundary(text, index):
+    # type: (Text, int) -> bool
+    """Whether a word starts or ends at `index` of the text."""
+
+    if index == 0 or index == len(text):
+        return True
+    before, after = text[index - 1], text[index]
+    return (not _is_word_char(before) or not _is_word_char(after) or
+            _is_cjk(before) or _is_cjk(after))
 
 
 class KeywordIntentClassifier(Component):
+    """Classifies messages containing a keyword of an intent.
+
+    The keywords are the texts of the training examples and the configured
+    keywords of each intent. All keywords are found in a single pass over
+    the message using an Aho-Corasick automaton, which is persisted with
+    the model. If several keywords match, the longest one wins."""
 
     name = "intent_classifier_keyword"
 
-    provides = ["intent"]
+    provides = ["intent", "intent_ranking"]
 
-    his = ["hello", "hi", "hey"]
+    uses = ["tokens", "normalized_text"]
 
-    byes = ["bye", "goodbye"]
+    concurrent = True
 
-    def process(self, message, **kwargs):
-        # type: (Message, **Any) -> None
+    defaults = {
+        # keywords of each intent in addition to the training examples,
+        # they take precedence over training examples with the same text.
+        # Keywords of intents without training examples are dropped when
+        # training, the defaults only apply to an untrained classifier
+        "keywords": {
+            "greet": ["hello", "hi", "hey"],
+            "goodbye": ["bye", "goodbye"],
+        },
+
+        # use the text of every training example as a keyword of its
+        # intent, texts of several intents are dropped
+        "examples_as_keywords": True,
 
-        intent = {"name": self.parse(message.text), "confidence": 1.0}
-        message.set("intent", intent,
-                    add_to_output=True)
+        # where matched keywords need to start and end:
+        # "word" - at the start and end of the text, next to a non word
+        #          character or a chinese or japanese character
+        # "tokens" - at the start and end of tokens (e.g. the words found
+        #            by `tokenizer_jieba`), like "word" if the message
+        #            is not tokenized
+        # "none" - anywhere
+        "word_boundaries": "word",
 
-    def parse(self, text):
+        "case_sensitive": False
+    }
+
+    def __init__(self, component_config=None, automaton=None):
+        # type: (Dict[Text, Any], Optional[KeywordAutomaton]) -> None
+
+        super(KeywordIntentClassifier, self).__init__(component_config)
+
+        if self.component_config["word_boundaries"] not in WORD_BOUNDARIES:
+            raise ValueError("Invalid word boundaries '{}' of the keyword "
+                             "intent classifier, use one of {}."
+                             "".format(self.component_config["word_boundaries"],
+                                       WORD_BOUNDARIES))
+
+        if automaton is None:
+            automaton = KeywordAutomaton.build(self._configured_keywords())
+        self.automaton = automaton
+
+    def _normalize(self, text):
         # type: (Text) -> Text
+        """Normalizes configured keywords and texts passed to `parse` like
+        the texts of messages (see `_text`)."""
+
+        if not self.component_config["case_sensitive"]:
+            text = text.lower()
+        return to_halfwidth(text)
 
-        _text = text.lower()
+    def _text(self, message):
+        # type: (Message) -> Text
+        """The text of the message in the variant keywords are matched
+        against, shared with other components of the pipeline.
 
-        def is_present(x):
-            return x in _text
+        Keywords and texts are always matched in half width, whether or
+        not the `text_normalizer` converts the texts of the pipeline."""
 
-        if any(map(is_present, self.his)):
-            return "greet"
-        elif any(map(is_present, self.byes)):
-            return "goodbye"
+        if self.component_config["case_sensitive"]:
+            text = message.normalized_text(BASE_VARIANT)
         else:
+            text = message.normalized_text("lowercase")
+        return to_halfwidth(text)
+
+    def _configured_keywords(self, intents=None):
+        # type: (Optional[Set[Text]]) -> Dict[Text, Text]
+        """Configured keywords, only those of `intents` if passed."""
+
+        keywords = {}
+        for intent, intent_keywords in \
+                (self.component_config["keywords"] or {}).items():
+            if intents is not None and intent not in intents:
+                continue
+            for keyword in intent_keywords:
+                keywords[self._normalize(keyword.strip())] = intent
+        return keywords
+
+    def train(self, training_data, config, **kwargs):
+        # type: (TrainingData, RasaNLUModelConfig, **Any) -> None
+
+        keywords = {}
+        if self.component_config["examples_as_keywords"]:
+            ambiguous = set()
+            for example in training_data.intent_examples:
+                keyword = self._text(example).strip()
+                intent = example.get("intent")
+                if keywords.setdefault(keyword, intent) != intent:
+                    ambiguous.add(keyword)
+            for keyword in ambiguous:
+                del keywords[keyword]
+            if ambiguous:
+                logger.warning("Dropped {} keywords of the keyword intent "
+                               "classifier which are training examples of "
+                               "several intents.".format(len(ambiguous)))
+
+        # the model must not predict intents it has no examples of
+        keywords.update(self._configured_keywords(training_data.intents))
+        self.automaton = KeywordAutomaton.build(keywords)
+
+    def process(self, message, **kwargs):
+        # type: (Message, **Any) -> None
+
+        intent_name = self._match(self._text(message), message.get("tokens"))
+        if intent_name is not None:
+            intent = {"name": intent_name, "confidence": 1.0}
+            intent_ranking = [intent]
+        else:
+            intent = {"name": None, "confidence": 0.0}
+            intent_ranking = []
+        message.set("intent", intent, add_to_output=True)
+        # same response keys as the statistical classifiers, e.g. if the
+        # keyword ends an intent cascade
+        message.set("intent_ranking", intent_ranking, add_to_output=True)
+
+    def _token_boundaries(self, tokens):
+        # type: (Optional[List[Any]]) -> Optional[Set[int]]
+
+        if self.component_config["word_boundaries"] != "tokens" or \
+                not tokens:
             return None
+        boundaries = set()
+        for token in tokens:
+            boundaries.add(token.offset)
+            boundaries.add(token.end)
+        return boundaries
+
+    def parse(self, text, tokens=None):
+        # type: (Text, Optional[List[Any]]) -> Optional[Text]
+        """Intent of the longest keyword in the text, the first one of
+        keywords of the same length."""
+
+        return self._match(self._normalize(text), tokens)
+
+    def _match(self, text, tokens):
+        # type: (Text, Optional[List[Any]]) -> Optional[Text]
+
+        word_boundaries = self.component_config["word_boundaries"]
+        token_boundaries = self._token_boundaries(tokens)
+
+        best, best_length = None, 0
+        for start, end, i in self.automaton.iter_matches(text):
+            if end - start <= best_length:
+                continue
+            if token_boundaries is not None:
+                if start not in token_boundaries or \
+                        end not in token_boundaries:
+                    continue
+            elif word_boundaries != "none":
+                if not is_word_boundary(text, start) or \
+                        not is_word_boundary(text, end):
+                    continue
+            best, best_length = i, end - start
+
+        return self.automaton.intents[best] if best is not None else None
+
+    @classmethod
+    def load(cls,
+             model_dir=None,  # type: Optional[Text]
+             model_metadata=None,  # type: Optional[Metadata]
+             cached_component=None,  # type: Optional[Component]
+             **kwargs  # type: **Any
+             ):
+        # type: (...) -> KeywordIntentClassifier
+
+        meta = model_metadata.for_component(cls.name)
+        file_name = meta.get("automaton_file")
+        if model_dir and file_name:
+            automaton_file = os.path.join(model_dir, file_name)
+            if os.path.exists(automaton_file):
+                return cls(meta, KeywordAutomaton.load(automaton_file))
+
+        # models persisted without an automaton use the configured keywords
+        return cls(meta)
+
+    def persist(self, model_dir):
+        # type: (Text) -> Optional[Dict[Text, Any]]
+        """Persist this model into the passed directory."""
+
+        automaton_file = os.path.join(model_dir, KEYWORD_AUTOMATON_FILE_NAME)
+        self.automaton.persist(automaton_file)
+        return {"automaton_file": KEYWORD_AUTOMATON_FILE_NAME}
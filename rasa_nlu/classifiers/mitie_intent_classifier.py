@@ -31,6 +31,8 @@ class MitieIntentClassifier(Component):
 
     requires = ["tokens", "mitie_feature_extractor", "mitie_file"]
 
+    concurrent = True
+
     def __init__(self,
                  component_config=None,  # type: Dict[Text, Any]
                  clf=None
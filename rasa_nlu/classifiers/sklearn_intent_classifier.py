@@ -4,6 +4,7 @@ from __future__ import division
 from __future__ import absolute_import
 
 import logging
+import time
 import typing
 from builtins import zip
 import os
@@ -19,6 +20,8 @@ import numpy as np
 
 from rasa_nlu import utils
 from rasa_nlu.classifiers import INTENT_RANKING_LENGTH
+from rasa_nlu.classifiers.sklearn_scorer import LinearIntentScorer
+from rasa_nlu.classifiers.sklearn_scorer import decision_proba
 from rasa_nlu.components import Component
 from rasa_nlu.config import RasaNLUModelConfig
 from rasa_nlu.model import Metadata
@@ -32,6 +35,8 @@ if typing.TYPE_CHECKING:
 
 SKLEARN_MODEL_FILE_NAME = "intent_classifier_sklearn.pkl"
 
+SKLEARN_SCORER_FILE_NAME = "intent_classifier_sklearn_scorer.npz"
+
 
 def _sklearn_numpy_warning_fix():
     """Fixes unecessary warnings emitted by sklearns use of numpy.
@@ -54,6 +59,8 @@ class SklearnIntentClassifier(Component):
 
     requires = ["text_features"]
 
+    concurrent = True
+
     defaults = {
         # C parameter of the svm - cross validation will select the best value
         "C": [1, 2, 5, 10, 20, 100],
@@ -64,25 +71,55 @@ class SklearnIntentClassifier(Component):
 
         # We try to find a good number of cross folds to use during
         # intent training, this specifies the max number of folds
-        "max_cross_validation_folds": 5
+        "max_cross_validation_folds": 5,
+
+        # the classifier to train. `svc` trains a kernel svm with
+        # probability estimates. The linear models `linear_svc`, `sgd` and
+        # `logistic_regression` train a lot faster on large data sets,
+        # `linear_svc` is calibrated once after the search
+        "classifier": "svc",
+
+        # how to search for the best `C` (and kernel): `grid` tries all
+        # values, `randomized` samples `search_iterations` of them and
+        # `halving` runs a successive halving grid search
+        "search": "grid",
+
+        # number of parameter settings tried by the `randomized` search
+        "search_iterations": 10,
+
+        # maximum number of seconds spent on trying parameter settings of
+        # a `grid` or `randomized` search, `None` means no limit. The best
+        # setting found within the budget is used
+        "search_time_budget": None,
+
+        # predict using the exported parameters of the trained linear
+        # model and numpy only, instead of calling sklearn on every
+        # message. Supported by all classifiers except `svc`
+        "numpy_inference": True
     }
 
     def __init__(self,
                  component_config=None,  # type: Dict[Text, Any]
                  clf=None,  # type: sklearn.model_selection.GridSearchCV
-                 le=None  # type: sklearn.preprocessing.LabelEncoder
+                 le=None,  # type: sklearn.preprocessing.LabelEncoder
+                 scorer=None  # type: Optional[LinearIntentScorer]
                  ):
         # type: (...) -> None
         """Construct a new intent classifier using the sklearn framework."""
-        from sklearn.preprocessing import LabelEncoder
 
         super(SklearnIntentClassifier, self).__init__(component_config)
 
         if le is not None:
             self.le = le
-        else:
+        elif scorer is None:
+            from sklearn.preprocessing import LabelEncoder
+
             self.le = LabelEncoder()
+        else:
+            # the scorer knows the intent names already
+            self.le = None
         self.clf = clf
+        self.scorer = scorer
 
         _sklearn_numpy_warning_fix()
 
@@ -125,43 +162,226 @@ class SklearnIntentClassifier(Component):
             X = np.stack([example.get("text_features")
                           for example in training_data.intent_examples])
 
-            self.clf = self._create_classifier(num_threads, y)
+            if self.component_config["search_time_budget"]:
+                self.clf = self._search_with_time_budget(X, y, num_threads)
+            else:
+                self.clf = self._create_classifier(num_threads, y)
+                self.clf.fit(X, y)
+
+            if self.component_config["classifier"] == "linear_svc":
+                self.clf = self._calibrate(self.clf, X, y)
 
-            self.clf.fit(X, y)
+            if self.component_config["numpy_inference"]:
+                self.scorer = self._export_scorer(X.shape[1])
 
     def _num_cv_splits(self, y):
         folds = self.component_config["max_cross_validation_folds"]
         return max(2, min(folds, np.min(np.bincount(y)) // 5))
 
+    @staticmethod
+    def _sgd_log_loss():
+        import sklearn
+        from packaging import version
+
+        # the logistic loss got renamed in sklearn 1.1
+        if version.parse(sklearn.__version__) >= version.parse("1.1"):
+            return str("log_loss")
+        else:
+            return str("log")
+
+    def _create_estimator(self, num_examples):
+        # type: (int) -> Tuple[Any, Dict[Text, List[Any]]]
+        """Creates the estimator and the parameters to search over."""
+
+        classifier = self.component_config["classifier"]
+        C = self.component_config["C"]
+
+        if classifier == "svc":
+            from sklearn.svm import SVC
+
+            kernels = self.component_config["kernels"]
+            # dirty str fix because sklearn is expecting
+            # str not instance of basestr...
+            return (SVC(C=1, probability=True, class_weight='balanced'),
+                    {"C": C, "kernel": [str(k) for k in kernels]})
+        elif classifier == "linear_svc":
+            from sklearn.svm import LinearSVC
+
+            return LinearSVC(C=1, class_weight='balanced'), {"C": C}
+        elif classifier == "logistic_regression":
+            from sklearn.linear_model import LogisticRegression
+
+            return (LogisticRegression(C=1, class_weight='balanced',
+                                       max_iter=1000),
+                    {"C": C})
+        elif classifier == "sgd":
+            from sklearn.linear_model import SGDClassifier
+
+            # sgd is regularized by `alpha` which corresponds
+            # to `1 / (C * num_examples)`
+            alphas = [1.0 / (c * num_examples) for c in C]
+            return (SGDClassifier(loss=self._sgd_log_loss(),
+                                  class_weight='balanced',
+                                  max_iter=50,
+                                  tol=1e-3),
+                    {"alpha": alphas})
+        else:
+            raise ValueError("Unknown classifier '{}' for '{}'. Choose one "
+                             "of 'svc', 'linear_svc', 'sgd' or "
+                             "'logistic_regression'."
+                             "".format(classifier, self.name))
+
     def _create_classifier(self, num_threads, y):
         from sklearn.model_selection import GridSearchCV
-        from sklearn.svm import SVC
+        from sklearn.model_selection import ParameterGrid
+        from sklearn.model_selection import RandomizedSearchCV
 
-        C = self.component_config["C"]
-        kernels = self.component_config["kernels"]
-        # dirty str fix because sklearn is expecting
-        # str not instance of basestr...
-        tuned_parameters = [{"C": C,
-                             "kernel": [str(k) for k in kernels]}]
+        estimator, tuned_parameters = self._create_estimator(len(y))
+        search = self.component_config["search"]
 
         # aim for 5 examples in each fold
 
         cv_splits = self._num_cv_splits(y)
 
-        return GridSearchCV(SVC(C=1,
-                                probability=True,
-                                class_weight='balanced'),
-                            param_grid=tuned_parameters,
-                            n_jobs=num_threads,
-                            cv=cv_splits,
-                            scoring='f1_weighted',
-                            verbose=1)
+        if search == "grid":
+            return GridSearchCV(estimator,
+                                param_grid=[tuned_parameters],
+                                n_jobs=num_threads,
+                                cv=cv_splits,
+                                scoring='f1_weighted',
+                                verbose=1)
+        elif search == "randomized":
+            n_iter = min(self.component_config["search_iterations"],
+                         len(ParameterGrid(tuned_parameters)))
+            return RandomizedSearchCV(estimator,
+                                      param_distributions=tuned_parameters,
+                                      n_iter=n_iter,
+                                      n_jobs=num_threads,
+                                      cv=cv_splits,
+                                      scoring='f1_weighted',
+                                      verbose=1)
+        elif search == "halving":
+            # successive halving is experimental in sklearn
+            from sklearn.experimental import enable_halving_search_cv  # noqa
+            from sklearn.model_selection import HalvingGridSearchCV
+
+            return HalvingGridSearchCV(estimator,
+                                       param_grid=tuned_parameters,
+                                       n_jobs=num_threads,
+                                       cv=cv_splits,
+                                       scoring='f1_weighted',
+                                       verbose=1)
+        else:
+            raise ValueError("Unknown search '{}' for '{}'. Choose one of "
+                             "'grid', 'randomized' or 'halving'."
+                             "".format(search, self.name))
+
+    def _search_candidates(self, tuned_parameters):
+        from sklearn.model_selection import ParameterGrid
+        from sklearn.model_selection import ParameterSampler
+
+        grid = ParameterGrid(tuned_parameters)
+        if self.component_config["search"] == "randomized":
+            n_iter = min(self.component_config["search_iterations"],
+                         len(grid))
+            return list(ParameterSampler(tuned_parameters, n_iter))
+        elif self.component_config["search"] == "grid":
+            return list(grid)
+        else:
+            raise ValueError("A 'search_time_budget' is only supported "
+                             "for the 'grid' and 'randomized' search.")
+
+    def _search_with_time_budget(self, X, y, num_threads):
+        """Cross validates parameter settings until the budget is used up.
+
+        Returns the estimator trained on all data using the best
+        setting found."""
+        from sklearn.base import clone
+        from sklearn.model_selection import cross_val_score
+
+        budget = self.component_config["search_time_budget"]
+        estimator, tuned_parameters = self._create_estimator(len(y))
+        cv_splits = self._num_cv_splits(y)
+
+        start = time.time()
+        best_score, best_params = None, None
+        candidates = self._search_candidates(tuned_parameters)
+        for i, params in enumerate(candidates):
+            clf = clone(estimator).set_params(**params)
+            score = np.mean(cross_val_score(clf, X, y,
+                                            cv=cv_splits,
+                                            scoring='f1_weighted',
+                                            n_jobs=num_threads))
+            if best_score is None or score > best_score:
+                best_score, best_params = score, params
+            if time.time() - start > budget:
+                logger.info("Search time budget of {}s used up after {} "
+                            "of {} parameter settings."
+                            "".format(budget, i + 1, len(candidates)))
+                break
+
+        logger.info("Best parameters {} (f1 score {:.3f})"
+                    "".format(best_params, best_score))
+        return clone(estimator).set_params(**best_params).fit(X, y)
+
+    def _calibrate(self, clf, X, y):
+        """Fits probability estimates for the best found estimator.
+
+        Calibrating once after the search is a lot cheaper than calibrating
+        every estimator during the search. Every fold needs an example of
+        each intent, without two examples of every intent the estimator
+        stays uncalibrated (see `predict_prob`)."""
+        from sklearn.base import clone
+        from sklearn.calibration import CalibratedClassifierCV
+
+        best = getattr(clf, "best_estimator_", clf)
+        cv_splits = min(self._num_cv_splits(y), np.min(np.bincount(y)))
+        if cv_splits < 2:
+            logger.warning("Can not calibrate the probabilities of the "
+                           "linear svm, some intents have a single "
+                           "training example. Using the softmax of its "
+                           "decision values as confidence instead.")
+            return best
+
+        calibrated = CalibratedClassifierCV(clone(best),
+                                            method=str("sigmoid"),
+                                            cv=cv_splits)
+        return calibrated.fit(X, y)
+
+    def _export_scorer(self, num_features):
+        # type: (int) -> Optional[LinearIntentScorer]
+        """Exports the trained classifier to a numpy scorer.
+
+        The scorer is only used if it predicts the same probabilities
+        as the classifier."""
+
+        scorer = LinearIntentScorer.from_sklearn(self.clf, self.le.classes_)
+        if scorer is None:
+            logger.info("Numpy inference is not supported for the trained "
+                        "classifier, predicting using sklearn.")
+            return None
+        elif not scorer.is_equivalent_to(self.predict_prob, num_features):
+            logger.warning("Exported numpy scorer does not match the "
+                           "predictions of the trained classifier, "
+                           "predicting using sklearn.")
+            return None
+        else:
+            return scorer
 
     def process(self, message, **kwargs):
         # type: (Message, **Any) -> None
         """Return the most likely intent and its probability for a message."""
 
-        if not self.clf:
+        # models persisted before numpy inference have no scorer
+        scorer = getattr(self, "scorer", None)
+        if scorer is not None:
+            intents, probabilities = scorer.ranking(
+                    message.get("text_features"), INTENT_RANKING_LENGTH)
+            intent = {"name": intents[0], "confidence": probabilities[0]}
+            intent_ranking = [{"name": intent_name, "confidence": score}
+                              for intent_name, score in zip(intents,
+                                                            probabilities)]
+        elif not self.clf:
             # component is either not trained or didn't
             # receive enough training data
             intent = None
@@ -169,7 +389,8 @@ class SklearnIntentClassifier(Component):
         else:
             X = message.get("text_features").reshape(1, -1)
             intent_ids, probabilities = self.predict(X)
-            intents = self.transform_labels_num2str(intent_ids)
+            # newer sklearn versions only inverse transform 1d arrays
+            intents = self.transform_labels_num2str(np.ravel(intent_ids))
             # `predict` returns a matrix as it is supposed
             # to work for multiple examples as well, hence we need to flatten
             intents, probabilities = intents.flatten(), probabilities.flatten()
@@ -198,7 +419,11 @@ class SklearnIntentClassifier(Component):
         :param X: bow of input text
         :return: vector of probabilities containing one entry for each label"""
 
-        return self.clf.predict_proba(X)
+        if hasattr(self.clf, "predict_proba"):
+            return self.clf.predict_proba(X)
+        else:
+            # linear svms which could not be calibrated
+            return decision_proba(self.clf, X)
 
     def predict(self, X):
         # type: (np.ndarray) -> Tuple[np.ndarray, np.ndarray]
@@ -229,6 +454,12 @@ class SklearnIntentClassifier(Component):
         file_name = meta.get("classifier_file", SKLEARN_MODEL_FILE_NAME)
         classifier_file = os.path.join(model_dir, file_name)
 
+        if meta.get("numpy_inference", True) and meta.get("scorer_file"):
+            scorer_file = os.path.join(model_dir, meta["scorer_file"])
+            if os.path.exists(scorer_file):
+                # neither unpickles the classifier nor imports sklearn
+                return cls(meta, scorer=LinearIntentScorer.load(scorer_file))
+
         if os.path.exists(classifier_file):
             return utils.pycloud_unpickle(classifier_file)
         else:
@@ -240,4 +471,10 @@ class SklearnIntentClassifier(Component):
 
         classifier_file = os.path.join(model_dir, SKLEARN_MODEL_FILE_NAME)
         utils.pycloud_pickle(classifier_file, self)
-        return {"classifier_file": SKLEARN_MODEL_FILE_NAME}
+        meta = {"classifier_file": SKLEARN_MODEL_FILE_NAME}
+
+        if self.scorer is not None:
+            scorer_file = os.path.join(model_dir, SKLEARN_SCORER_FILE_NAME)
+            self.scorer.persist(scorer_file)
+            meta["scorer_file"] = SKLEARN_SCORER_FILE_NAME
+        return meta
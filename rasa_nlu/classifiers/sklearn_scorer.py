@@ -0,0 +1,201 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import logging
+
+import numpy as np
+from builtins import object, str
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Optional
+from typing import Text
+from typing import Tuple
+
+from rasa_nlu.classifiers import top_k
+
+logger = logging.getLogger(__name__)
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _softmax(x):
+    e = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return e / np.sum(e, axis=-1, keepdims=True)
+
+
+def decision_proba(clf, X):
+    # type: (Any, np.ndarray) -> np.ndarray
+    """Probabilities of a classifier without probability estimates, e.g.
+    an uncalibrated linear svm: a softmax over its decision values, a
+    sigmoid for two classes."""
+
+    decision = clf.decision_function(X)
+    if decision.ndim == 1:
+        prob = _sigmoid(decision)[:, None]
+        return np.hstack([1 - prob, prob])
+    return _softmax(decision)
+
+
+class LinearIntentScorer(object):
+    """Predicts intent probabilities of a trained sklearn classifier.
+
+    Uses the learned parameters of linear models (logistic regression,
+    sgd with logistic loss and linear svms, sigmoid calibrated or using
+    the softmax of `decision_proba`) and only
+    needs numpy. Kernel svms are not exported, coupling their pairwise
+    probabilities in numpy is slower than libsvm."""
+
+    def __init__(self, kind, params, labels):
+        # type: (Text, Dict[Text, np.ndarray], np.ndarray) -> None
+
+        self.kind = kind
+        self.params = params
+        # maps the column of a probability to its intent name
+        self.labels = labels
+
+    @classmethod
+    def from_sklearn(cls, clf, labels):
+        # type: (Any, np.ndarray) -> Optional[LinearIntentScorer]
+        """Exports the parameters of a fitted sklearn classifier.
+
+        `labels` are the intent names of the encoded classes. Returns
+        `None` if the classifier type is not supported."""
+
+        clf = getattr(clf, "best_estimator_", clf)
+        labels = np.asarray(labels)[clf.classes_]
+        clf_type = type(clf).__name__
+
+        if clf_type == "LogisticRegression":
+            kind = cls._logistic_regression_kind(clf)
+            params = {"W": clf.coef_, "b": clf.intercept_}
+        elif clf_type == "SGDClassifier" and clf.loss in {"log", "log_loss"}:
+            kind = "ovr"
+            params = {"W": clf.coef_, "b": clf.intercept_}
+        elif clf_type == "LinearSVC":
+            # uncalibrated, see `decision_proba`
+            kind = "softmax" if clf.coef_.shape[0] > 1 else "ovr"
+            params = {"W": clf.coef_, "b": clf.intercept_}
+        elif clf_type == "CalibratedClassifierCV":
+            kind, params = cls._calibrated_params(clf)
+        else:
+            kind, params = None, None
+
+        if kind is None:
+            logger.debug("No numpy inference for classifier '{}'."
+                         "".format(clf_type))
+            return None
+
+        params = {k: np.asarray(v, dtype=np.float64)
+                  for k, v in params.items()}
+        return cls(kind, params, labels)
+
+    @staticmethod
+    def _logistic_regression_kind(clf):
+        if len(clf.classes_) == 2:
+            return "ovr"
+        multi_class = getattr(clf, "multi_class", "auto")
+        if multi_class == "ovr" or (multi_class == "auto" and
+                                    clf.solver == "liblinear"):
+            return "ovr"
+        elif multi_class in {"multinomial", "auto", "deprecated"}:
+            return "softmax"
+        else:
+            return None
+
+    @staticmethod
+    def _calibrated_params(clf):
+        Ws, bs, As, Bs = [], [], [], []
+        for calibrated in clf.calibrated_classifiers_:
+            # attribute names differ between sklearn versions
+            estimator = getattr(calibrated, "estimator", None)
+            if estimator is None:
+                estimator = calibrated.base_estimator
+            calibrators = getattr(calibrated, "calibrators", None)
+            if calibrators is None:
+                calibrators = calibrated.calibrators_
+
+            if (type(estimator).__name__ != "LinearSVC" or
+                    type(calibrators[0]).__name__ != "_SigmoidCalibration"):
+                return None, None
+            Ws.append(estimator.coef_)
+            bs.append(estimator.intercept_)
+            As.append([c.a_ for c in calibrators])
+            Bs.append([c.b_ for c in calibrators])
+        return "calibrated", {"W": np.stack(Ws), "b": np.stack(bs),
+                              "A": np.array(As), "B": np.array(Bs)}
+
+    def predict_proba(self, X):
+        # type: (np.ndarray) -> np.ndarray
+        """Probabilities of all intents for every row of `X`."""
+
+        p = self.params
+        if self.kind == "softmax":
+            return _softmax(X.dot(p["W"].T) + p["b"])
+        elif self.kind == "ovr":
+            prob = _sigmoid(X.dot(p["W"].T) + p["b"])
+            if prob.shape[1] == 1:
+                return np.hstack([1 - prob, prob])
+            return prob / np.sum(prob, axis=1, keepdims=True)
+        elif self.kind == "calibrated":
+            return self._calibrated_proba(X)
+        else:
+            raise ValueError("Unknown scorer '{}'.".format(self.kind))
+
+    def _calibrated_proba(self, X):
+        p = self.params
+        # decision values of all folds: (folds, examples, classes)
+        dec = np.einsum("nd,fkd->fnk", X, p["W"]) + p["b"][:, None, :]
+        prob = _sigmoid(-(p["A"][:, None, :] * dec + p["B"][:, None, :]))
+        if prob.shape[2] == 1:
+            prob = np.concatenate([1 - prob, prob], axis=2)
+        else:
+            denominator = np.sum(prob, axis=2, keepdims=True)
+            uniform = np.full_like(prob, 1.0 / prob.shape[2])
+            prob = np.where(denominator == 0, uniform,
+                            prob / np.where(denominator == 0, 1.0,
+                                            denominator))
+        prob[(1.0 < prob) & (prob <= 1.0 + 1e-5)] = 1.0
+        return np.mean(prob, axis=0)
+
+    def ranking(self, x, k):
+        # type: (np.ndarray, int) -> Tuple[np.ndarray, np.ndarray]
+        """The `k` most likely intents of a feature vector and their
+        probabilities."""
+
+        prob = self.predict_proba(x.reshape(1, -1))[0]
+        indices = top_k(prob, k)
+        return self.labels[indices], prob[indices]
+
+    def is_equivalent_to(self, predict_proba, num_features, num_samples=20):
+        # type: (Callable[[np.ndarray], np.ndarray], int, int) -> bool
+        """Checks the scorer predicts the same probabilities as the sklearn
+        classifier does using `predict_proba`."""
+
+        X = np.random.RandomState(42).normal(size=(num_samples,
+                                                   num_features))
+        return np.allclose(self.predict_proba(X), predict_proba(X),
+                           atol=1e-6)
+
+    def persist(self, file_name):
+        # type: (Text) -> None
+
+        arrays = {"param_" + k: v for k, v in self.params.items()}
+        with io.open(file_name, "wb") as f:
+            np.savez(f, kind=np.array(self.kind),
+                     labels=np.array([str(label) for label in self.labels]),
+                     **arrays)
+
+    @classmethod
+    def load(cls, file_name):
+        # type: (Text) -> LinearIntentScorer
+
+        with np.load(file_name, allow_pickle=False) as data:
+            params = {k[len("param_"):]: data[k]
+                      for k in data.files if k.startswith("param_")}
+            return cls(str(data["kind"]), params, data["labels"])
@@ -42,18 +42,25 @@ def find_unavailable_packages(package_names):
     return failed_imports
 
 
-def validate_requirements(component_names):
-    # type: (List[Text], Text) -> None
+def validate_requirements(component_names, model_metadata=None):
+    # type: (List[Text], Optional[Metadata]) -> None
     """Ensures that all required python packages are installed to
-    instantiate and used the passed components."""
+    instantiate and used the passed components.
+
+    If the metadata of a persisted model is passed, only the packages
+    needed to load the components of that model are required."""
     from rasa_nlu import registry
 
     # Validate that all required packages are installed
     failed_imports = set()
     for component_name in component_names:
         component_class = registry.get_component_class(component_name)
-        failed_imports.update(find_unavailable_packages(
-                component_class.required_packages()))
+        if model_metadata is not None:
+            required = component_class.required_packages_for_load(
+                    model_metadata.for_component(component_class.name))
+        else:
+            required = component_class.required_packages()
+        failed_imports.update(find_unavailable_packages(required))
     if failed_imports:  # pragma: no cover
         # if available, use the development file to figure out the correct
         # version numbers for each requirement
@@ -165,6 +172,19 @@ class Component(object):
     # within the above described `provides` property.
     requires = []
 
+    # Attributes of a message the component uses if they are present,
+    # without requiring them, e.g. the spacy doc of a message.
+    uses = []
+
+    # Whether the parallel scheduler of the interpreter may run the
+    # component concurrently with components it does not depend on.
+    # This requires `requires`, `uses` and `provides` to name every
+    # attribute `process` reads or writes. Provided `entities` have to
+    # be appended to the entities of the message, unless the component
+    # uses them. Other components run after all components before them
+    # and before all components after them.
+    concurrent = False
+
     # Defines the default configuration parameters of a component
     # these values can be overwritten in the pipeline configuration
     # of the model. The component should choose sensible defaults
@@ -203,6 +223,13 @@ class Component(object):
         if a required package is not installed."""
         return []
 
+    @classmethod
+    def required_packages_for_load(cls, component_meta):
+        # type: (Dict[Text, Any]) -> List[Text]
+        """Python packages needed to load a persisted component, given its
+        metadata. Defaults to the packages of `required_packages`."""
+        return cls.required_packages()
+
     @classmethod
     def load(cls,
              model_dir=None,   # type: Optional[Text]
@@ -285,6 +312,15 @@ class Component(object):
 
         pass
 
+    def resource_usage(self):
+        # type: () -> Optional[Dict[Text, Any]]
+        """Resources used by the loaded component, e.g. `{"memory": 1024}`.
+
+        Reported by the status endpoint of the server. Components without
+        noteworthy resources return `None`."""
+
+        return None
+
     @classmethod
     def cache_key(cls, model_metadata):
         # type: (Metadata) -> Optional[Text]
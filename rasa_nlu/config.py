@@ -3,6 +3,7 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import copy
 import logging
 import os
 
@@ -21,6 +22,14 @@ DEFAULT_CONFIG = {
     "language": "en",
     "pipeline": [],
     "data": None,
+    # "sequential" runs the components of the pipeline one after another
+    # when parsing a message, "parallel" runs independent components
+    # concurrently
+    "scheduler": "sequential",
+    # intent classifiers with at least this confidence skip the later
+    # intent classifiers and the components only they need, `None` runs
+    # all of them
+    "cascade_threshold": None,
 }
 
 
@@ -54,7 +63,9 @@ def load(filename=None, **kwargs):
 
 
 def override_defaults(defaults, custom):
-    cfg = defaults or {}
+    # copy, otherwise the class level defaults of a component
+    # would be modified by the configuration of a single model
+    cfg = copy.deepcopy(defaults) if defaults else {}
     if custom:
         cfg.update(custom)
     return cfg
@@ -7,6 +7,7 @@ import glob
 import io
 import logging
 import tempfile
+import threading
 
 import datetime
 import os
@@ -16,6 +17,7 @@ from future.utils import PY3
 from rasa_nlu.training_data import Message
 
 from rasa_nlu import utils, config
+from rasa_nlu.utils import tensorflow_utils
 from rasa_nlu.components import ComponentBuilder
 from rasa_nlu.config import RasaNLUModelConfig
 from rasa_nlu.evaluate import get_evaluation_metrics, clean_intent_labels
@@ -107,6 +109,12 @@ class DataRouter(object):
         self.project_store = self._create_project_store(project_dir)
         self.pool = ProcessPool(self._training_processes)
 
+        # parsed messages, see `get_metrics`
+        self._parse_counts = {"requests": 0,
+                              "requests_with_deadline": 0,
+                              "partial_results": 0}
+        self._parse_counts_lock = threading.Lock()
+
     def __del__(self):
         """Terminates workers pool processes"""
         self.pool.shutdown()
@@ -237,9 +245,13 @@ class DataRouter(object):
                             project, e))
 
         time = data.get('time')
+        # `time.time()` timestamp the message should be parsed before
+        deadline = data.get('deadline')
         response, used_model = self.project_store[project].parse(data['text'],
                                                                  time,
-                                                                 model)
+                                                                 model,
+                                                                 deadline)
+        self._count_parse(deadline, response)
 
         if self.responses:
             self.responses.info('', user_input=response, project=project,
@@ -247,6 +259,14 @@ class DataRouter(object):
 
         return self.format_response(response)
 
+    def _count_parse(self, deadline, response):
+        with self._parse_counts_lock:
+            self._parse_counts["requests"] += 1
+            if deadline is not None:
+                self._parse_counts["requests_with_deadline"] += 1
+            if response.get("partial"):
+                self._parse_counts["partial_results"] += 1
+
     @staticmethod
     def _list_projects(path):
         """List the projects in the path, ignoring hidden directories."""
@@ -280,9 +300,18 @@ class DataRouter(object):
             "available_projects": {
                 name: project.as_dict()
                 for name, project in self.project_store.items()
-            }
+            },
+            "num_threads": utils.process_thread_count(),
+            "tensorflow_sessions": tensorflow_utils.session_manager.as_dict()
         }
 
+    def get_metrics(self):
+        # type: () -> Dict[Text, Any]
+        """Counts of the messages parsed by this process."""
+
+        with self._parse_counts_lock:
+            return {"parse": dict(self._parse_counts)}
+
     def start_train_process(self, data_file, project, train_config):
         # type: (Text, Text, RasaNLUModelConfig) -> Deferred
         """Start a model training."""
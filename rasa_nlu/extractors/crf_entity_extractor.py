@@ -5,10 +5,12 @@ from __future__ import unicode_literals
 
 import logging
 import os
+import threading
 
 import typing
-from builtins import str
-from typing import Any, Dict, List, Optional, Text, Tuple
+from builtins import range, str
+from typing import Any, Callable, Dict, Iterator, List, Optional, Text
+from typing import Tuple
 
 from rasa_nlu.config import RasaNLUModelConfig
 from rasa_nlu.extractors import EntityExtractor
@@ -23,13 +25,53 @@ if typing.TYPE_CHECKING:
 
 CRF_MODEL_FILE_NAME = "crf_model.pkl"
 
+# training algorithms of crfsuite and which of the regularization
+# coefficients (`L1_c`, `L2_c`) they use
+CRF_ALGORITHMS = {
+    "lbfgs": ("c1", "c2"),
+    "l2sgd": ("c2",),
+    "ap": (),
+    "pa": (),
+    "arow": ()
+}
+
+# ways to find the labels of a sentence, see `decoding`
+CRF_DECODINGS = ["marginals", "viterbi"]
+
+# extractor used by the processes of a parallel training
+_worker_extractor = None
+
+
+def _joblib():
+    try:
+        from sklearn.externals import joblib
+    except ImportError:
+        # removed from sklearn 0.23 on
+        import joblib
+    return joblib
+
+
+def _init_crf_worker(component_config):
+    """Creates the extractor used by a worker process of the pool."""
+    global _worker_extractor
+
+    _worker_extractor = CRFEntityExtractor(component_config)
+
+
+def _sentence_to_features_in_worker(sentence):
+    return _worker_extractor._sentence_to_features(sentence)
+
 
 class CRFEntityExtractor(EntityExtractor):
     name = "ner_crf"
 
     provides = ["entities"]
 
-    requires = ["spacy_doc", "tokens"]
+    requires = ["tokens"]
+
+    uses = ["spacy_doc", "token_patterns"]
+
+    concurrent = True
 
     defaults = {
         # BILOU_flag determines whether to use BILOU tagging or not.
@@ -55,7 +97,29 @@ class CRFEntityExtractor(EntityExtractor):
         "L1_c": 1,
 
         # weight of the L2 regularization
-        "L2_c": 1e-3
+        "L2_c": 1e-3,
+
+        # crfsuite training algorithm: "lbfgs", "l2sgd" (stochastic
+        # gradient descent, for large datasets), "ap" (averaged
+        # perceptron), "pa" (passive aggressive) or "arow". Only "lbfgs"
+        # uses `L1_c`, only "lbfgs" and "l2sgd" use `L2_c`
+        "algorithm": "lbfgs",
+
+        # features occurring less often in the training data are pruned
+        "feature_min_frequency": 0,
+
+        # build the features of the training sentences using a pool of
+        # `num_threads` processes
+        "parallel_training": False,
+
+        # "marginals" computes the probabilities of all labels of every
+        # token and reports the confidence of each entity. "viterbi" only
+        # searches the most likely labels of the sentence, which is faster
+        "decoding": "marginals",
+
+        # confidence of the entities found by "viterbi" decoding: "none"
+        # or "sequence", the probability of the labels of the sentence
+        "viterbi_confidence": "sequence"
     }
 
     function_dict = {
@@ -65,7 +129,7 @@ class CRFEntityExtractor(EntityExtractor):
         'word2': lambda doc: doc[0][-2:],
         'word1': lambda doc: doc[0][-1:],
         'pos': lambda doc: doc[1],
-        'pos2': lambda doc: doc[1][:2],
+        'pos2': lambda doc: doc[1][:2] if doc[1] is not None else None,
         'bias': lambda doc: 'bias',
         'upper': lambda doc: doc[0].isupper(),
         'digit': lambda doc: doc[0].isdigit(),
@@ -79,16 +143,60 @@ class CRFEntityExtractor(EntityExtractor):
 
         self.ent_tagger = ent_tagger
 
+        # crfsuite taggers keep the last tagged sentence, every thread
+        # parsing messages needs its own (see `_tagger`)
+        self._taggers = threading.local()
+
         self._validate_configuration()
 
+        # resolved with the first spacy doc, spacy isn't needed otherwise
+        self._tag_of_token = None
+
     def _validate_configuration(self):
         if len(self.component_config.get("features", [])) % 2 != 1:
             raise ValueError("Need an odd number of crf feature "
                              "lists to have a center word.")
+        algorithm = self.component_config["algorithm"]
+        if algorithm not in CRF_ALGORITHMS:
+            raise ValueError("Unknown crf training algorithm '{}', use one "
+                             "of {}.".format(algorithm,
+                                             sorted(CRF_ALGORITHMS)))
+        if self.component_config["decoding"] not in CRF_DECODINGS:
+            raise ValueError("Unknown crf decoding '{}', use one of {}."
+                             "".format(self.component_config["decoding"],
+                                       CRF_DECODINGS))
+
+        self._feature_plan = self._create_feature_plan(
+                self.component_config["features"])
+
+    @classmethod
+    def _create_feature_plan(cls, configured_features):
+        # type: (List[List[Text]]) -> Tuple[List[Tuple], List[Tuple]]
+        """Resolves the configured features once instead of per word.
+
+        Returns the features computed for every token (each feature once,
+        whatever window positions use it) and, for every window position,
+        its offset and the keys and features it adds to the feature dict
+        of a word."""
+
+        half_span = len(configured_features) // 2
+        token_features = []
+        window = []
+        for f_i, features in enumerate(configured_features):
+            prefix = str(f_i - half_span)
+            window.append((f_i - half_span,
+                           [(prefix + ":" + feature, feature)
+                            for feature in features]))
+            for feature in features:
+                if feature not in token_features:
+                    token_features.append(feature)
+        return ([(feature, cls.function_dict[feature])
+                 for feature in token_features],
+                window)
 
     @classmethod
     def required_packages(cls):
-        return ["sklearn_crfsuite", "sklearn", "spacy"]
+        return ["sklearn_crfsuite", "sklearn"]
 
     def train(self, training_data, config, **kwargs):
         # type: (TrainingData, RasaNLUModelConfig) -> None
@@ -110,7 +218,7 @@ class CRFEntityExtractor(EntityExtractor):
             # without annotations
             dataset = self._create_dataset(filtered_entity_examples)
 
-            self._train_model(dataset)
+            self._train_model(dataset, kwargs.get("num_threads", 1))
 
     def _create_dataset(self, examples):
         # type: (List[Message]) -> List[List[Tuple[Text, Text, Text, Text]]]
@@ -143,38 +251,97 @@ class CRFEntityExtractor(EntityExtractor):
         if self.ent_tagger is not None:
             text_data = self._from_text_to_crf(message)
             features = self._sentence_to_features(text_data)
-            ents = self.ent_tagger.predict_marginals_single(features)
-            return self._from_crf_to_json(message, ents)
+            if self.component_config["decoding"] == "viterbi":
+                return self._tagged_to_json(message,
+                                            self._viterbi_tags(features))
+            return self._from_crf_to_json(message,
+                                          self._marginals(features))
         else:
             return []
 
+    def _viterbi_tags(self, features):
+        # type: (List[Dict[Text, Any]]) -> List[Tuple[Text, Optional[float]]]
+        """The most likely labels of a sentence.
+
+        All tokens get the confidence of the whole sequence, no label
+        probabilities per token are computed."""
+
+        tagger = self._tagger()
+        labels = tagger.tag(features)
+        if self.component_config["viterbi_confidence"] == "sequence":
+            # the tagger of this thread still holds the sentence
+            confidence = tagger.probability(labels)
+        else:
+            confidence = None
+        return [(label, confidence) for label in labels]
+
+    def _marginals(self, features):
+        # type: (List[Dict[Text, Any]]) -> List[Dict[Text, float]]
+        """The probabilities of all labels of every token."""
+
+        tagger = self._tagger()
+        tagger.set(features)
+        labels = tagger.labels()
+        return [{label: tagger.marginal(label, i) for label in labels}
+                for i in range(len(features))]
+
+    def _tagger(self):
+        # type: () -> Any
+        """The crfsuite tagger of the current thread.
+
+        The tagger of `sklearn_crfsuite.CRF` is shared by all threads, but
+        a tagger holds the sentence it tagged last. Hence the threads of
+        the server and of the parallel scheduler open their own tagger of
+        the trained model."""
+        import pycrfsuite
+
+        taggers = self._taggers
+        if getattr(taggers, "crf", None) is not self.ent_tagger:
+            taggers.tagger = pycrfsuite.Tagger()
+            taggers.tagger.open(self.ent_tagger.modelfile.name)
+            taggers.crf = self.ent_tagger
+        return taggers.tagger
+
+    def _most_likely_label(self, entity_probs):
+        # type: (Dict[Text, float]) -> Tuple[Text, float]
+
+        if not entity_probs:
+            return "", 0.0
+
+        label = max(entity_probs, key=lambda key: entity_probs[key])
+        if self.component_config["BILOU_flag"]:
+            # if we are using bilou flags, we will combine the prob
+            # of the B, I, L and U tags for an entity (so if we have a
+            # score of 60% for `B-address` and 40% and 30%
+            # for `I-address`, we will return 70%)
+            return label, sum([v
+                               for k, v in entity_probs.items()
+                               if k[2:] == label[2:]])
+        else:
+            return label, entity_probs[label]
+
     def most_likely_entity(self, idx, entities):
         if len(entities) > idx:
-            entity_probs = entities[idx]
+            return self._most_likely_label(entities[idx])
         else:
-            entity_probs = None
-        if entity_probs:
-            label = max(entity_probs,
-                        key=lambda key: entity_probs[key])
-            if self.component_config["BILOU_flag"]:
-                # if we are using bilou flags, we will combine the prob
-                # of the B, I, L and U tags for an entity (so if we have a
-                # score of 60% for `B-address` and 40% and 30%
-                # for `I-address`, we will return 70%)
-                return label, sum([v
-                                   for k, v in entity_probs.items()
-                                   if k[2:] == label[2:]])
-            else:
-                return label, entity_probs[label]
+            return "", 0.0
+
+    @staticmethod
+    def _tag_at(idx, tags):
+        # type: (int, List[Tuple[Text, Optional[float]]]) -> Tuple
+        if len(tags) > idx:
+            return tags[idx]
         else:
             return "", 0.0
 
     @staticmethod
-    def _create_entity_dict(sentence_doc, start, end, entity, confidence):
+    def _create_entity_dict(text, tokens, start, end, entity, confidence):
+        start_char = tokens[start][1]
+        end_char = tokens[end][2]
         return {
-            'start': sentence_doc[start].idx,
-            'end': sentence_doc[start:end + 1].end_char,
-            'value': sentence_doc[start:end + 1].text,
+            'start': start_char,
+            'end': end_char,
+            'value': text[start_char:end_char],
             'entity': entity,
             'confidence': confidence
         }
@@ -189,19 +356,19 @@ class CRFEntityExtractor(EntityExtractor):
             return label[0].upper()
         return None
 
-    def _find_bilou_end(self, word_idx, entities):
+    def _find_bilou_end(self, word_idx, tags):
         ent_word_idx = word_idx + 1
         finished = False
 
         # get information about the first word, tagged with `B-...`
-        label, confidence = self.most_likely_entity(word_idx, entities)
+        label, confidence = self._tag_at(word_idx, tags)
         entity_label = self._entity_from_label(label)
 
         while not finished:
-            label, label_confidence = self.most_likely_entity(
-                    ent_word_idx, entities)
+            label, label_confidence = self._tag_at(ent_word_idx, tags)
 
-            confidence = min(confidence, label_confidence)
+            if confidence is not None:
+                confidence = min(confidence, label_confidence)
 
             if label[2:] != entity_label:
                 # words are not tagged the same entity class
@@ -225,8 +392,8 @@ class CRFEntityExtractor(EntityExtractor):
                              "[B-a, L-a, O].\nAssuming last tag is L-")
         return ent_word_idx, confidence
 
-    def _handle_bilou_label(self, word_idx, entities):
-        label, confidence = self.most_likely_entity(word_idx, entities)
+    def _handle_bilou_label(self, word_idx, tags):
+        label, confidence = self._tag_at(word_idx, tags)
         entity_label = self._entity_from_label(label)
 
         if self._bilou_from_label(label) == "U":
@@ -235,7 +402,7 @@ class CRFEntityExtractor(EntityExtractor):
         elif self._bilou_from_label(label) == "B":
             # start of multi word-entity need to represent whole extent
             ent_word_idx, confidence = self._find_bilou_end(
-                    word_idx, entities)
+                    word_idx, tags)
             return ent_word_idx, confidence, entity_label
 
         else:
@@ -244,30 +411,41 @@ class CRFEntityExtractor(EntityExtractor):
     def _from_crf_to_json(self, message, entities):
         # type: (Message, List[Any]) -> List[Dict[Text, Any]]
 
-        sentence_doc = message.get("spacy_doc")
+        # the label probabilities of each token are reduced once
+        tags = [self._most_likely_label(entity_probs)
+                for entity_probs in entities]
+        return self._tagged_to_json(message, tags)
+
+    def _tagged_to_json(self, message, tags):
+        # type: (Message, List[Tuple[Text, Any]]) -> List[Dict[Text, Any]]
+        """Creates the entities from the label and confidence of every
+        token."""
+
+        text, tokens = self._crf_tokens(message)
 
-        if len(sentence_doc) != len(entities):
+        if len(tokens) != len(tags):
             raise Exception('Inconsistency in amount of tokens '
-                            'between crfsuite and spacy')
+                            'between crfsuite and the message')
 
         if self.component_config["BILOU_flag"]:
             return self._convert_bilou_tagging_to_entity_result(
-                    sentence_doc, entities)
+                    text, tokens, tags)
         else:
             # not using BILOU tagging scheme, multi-word entities are split.
             return self._convert_simple_tagging_to_entity_result(
-                    sentence_doc, entities)
+                    text, tokens, tags)
 
-    def _convert_bilou_tagging_to_entity_result(self, sentence_doc, entities):
+    def _convert_bilou_tagging_to_entity_result(self, text, tokens, tags):
         # using the BILOU tagging scheme
         json_ents = []
         word_idx = 0
-        while word_idx < len(sentence_doc):
+        while word_idx < len(tokens):
             end_idx, confidence, entity_label = self._handle_bilou_label(
-                    word_idx, entities)
+                    word_idx, tags)
 
             if end_idx is not None:
-                ent = self._create_entity_dict(sentence_doc,
+                ent = self._create_entity_dict(text,
+                                               tokens,
                                                word_idx,
                                                end_idx,
                                                entity_label,
@@ -278,19 +456,18 @@ class CRFEntityExtractor(EntityExtractor):
                 word_idx += 1
         return json_ents
 
-    def _convert_simple_tagging_to_entity_result(self, sentence_doc, entities):
+    def _convert_simple_tagging_to_entity_result(self, text, tokens, tags):
         json_ents = []
 
-        for word_idx in range(len(sentence_doc)):
-            entity_label, confidence = self.most_likely_entity(
-                    word_idx, entities)
-            word = sentence_doc[word_idx]
+        for word_idx in range(len(tokens)):
+            entity_label, confidence = tags[word_idx]
             if entity_label != 'O':
-                ent = {'start': word.idx,
-                       'end': word.idx + len(word),
-                       'value': word.text,
-                       'entity': entity_label,
-                       'confidence': confidence}
+                ent = self._create_entity_dict(text,
+                                               tokens,
+                                               word_idx,
+                                               word_idx,
+                                               entity_label,
+                                               confidence)
                 json_ents.append(ent)
 
         return json_ents
@@ -303,7 +480,7 @@ class CRFEntityExtractor(EntityExtractor):
              **kwargs  # type: **Any
              ):
         # type: (...) -> CRFEntityExtractor
-        from sklearn.externals import joblib
+        joblib = _joblib()
 
         meta = model_metadata.for_component(cls.name)
         file_name = meta.get("classifier_file", CRF_MODEL_FILE_NAME)
@@ -321,7 +498,7 @@ class CRFEntityExtractor(EntityExtractor):
 
         Returns the metadata necessary to load the model again."""
 
-        from sklearn.externals import joblib
+        joblib = _joblib()
 
         if self.ent_tagger:
             model_file_name = os.path.join(model_dir, CRF_MODEL_FILE_NAME)
@@ -335,31 +512,31 @@ class CRFEntityExtractor(EntityExtractor):
         """Convert a word into discrete features in self.crf_features,
         including word before and word after."""
 
-        configured_features = self.component_config["features"]
+        token_features, window = self._feature_plan
+        # the features of each token are computed once and then
+        # used for all the window positions the token is part of
+        features = [{feature: f(word) for feature, f in token_features}
+                    for word in sentence]
+
+        num_words = len(sentence)
         sentence_features = []
-        for word_idx in range(len(sentence)):
-            # word before(-1), current word(0), next word(+1)
-            feature_span = len(configured_features)
-            half_span = feature_span // 2
-            feature_range = range(- half_span, half_span + 1)
-            prefixes = [str(i) for i in feature_range]
+        for word_idx in range(num_words):
             word_features = {}
-            for f_i in feature_range:
-                if word_idx + f_i >= len(sentence):
+            for f_i, keys in window:
+                idx = word_idx + f_i
+                if idx >= num_words:
                     word_features['EOS'] = True
                     # End Of Sentence
-                elif word_idx + f_i < 0:
+                elif idx < 0:
                     word_features['BOS'] = True
                     # Beginning Of Sentence
                 else:
-                    word = sentence[word_idx + f_i]
-                    f_i_from_zero = f_i + half_span
-                    prefix = prefixes[f_i_from_zero]
-                    features = configured_features[f_i_from_zero]
-                    for feature in features:
-                        # append each feature to a feature vector
-                        value = self.function_dict[feature](word)
-                        word_features[prefix + ":" + feature] = value
+                    values = features[idx]
+                    for key, feature in keys:
+                        value = values[feature]
+                        # e.g. the pos tags of tokens without a tagger
+                        if value is not None:
+                            word_features[key] = value
             sentence_features.append(word_features)
         return sentence_features
 
@@ -369,23 +546,50 @@ class CRFEntityExtractor(EntityExtractor):
 
         return [label for _, _, label, _ in sentence]
 
+    @staticmethod
+    def _bilou_tags_from_offsets(tokens, entity_offsets):
+        # type: (List[Tuple], List[Tuple[int, int, Text]]) -> List[Text]
+        """BILOU tags of the tokens from the character offsets of the
+        entities.
+
+        Tokens of entities which do not start and end at token boundaries
+        are tagged with `-` (like `spacy.gold.biluo_tags_from_offsets`)."""
+
+        starts = {start: i for i, (_, start, _, _) in enumerate(tokens)}
+        ends = {end: i for i, (_, _, end, _) in enumerate(tokens)}
+        tags = ["O"] * len(tokens)
+
+        for start, end, label in entity_offsets:
+            if start in starts and end in ends:
+                first, last = starts[start], ends[end]
+                if first == last:
+                    tags[first] = "U-" + label
+                else:
+                    tags[first] = "B-" + label
+                    for i in range(first + 1, last):
+                        tags[i] = "I-" + label
+                    tags[last] = "L-" + label
+            else:
+                for i, (_, token_start, token_end, _) in enumerate(tokens):
+                    if token_start < end and token_end > start:
+                        tags[i] = "-"
+        return tags
+
     def _from_json_to_crf(self,
                           message,  # type: Message
                           entity_offsets  # type: List[Tuple[int, int, Text]]
                           ):
         # type: (...) -> List[Tuple[Text, Text, Text, Text]]
         """Convert json examples to format of underlying crfsuite."""
-        from spacy.gold import GoldParse
 
-        doc = message.get("spacy_doc")
-        gold = GoldParse(doc, entities=entity_offsets)
-        ents = [l[5] for l in gold.orig_annot]
+        text, tokens = self._crf_tokens(message)
+        ents = self._bilou_tags_from_offsets(tokens, entity_offsets)
         if '-' in ents:
             logger.warn("Misaligned entity annotation in sentence '{}'. "
                         "Make sure the start and end values of the "
                         "annotated training examples end at token "
                         "boundaries (e.g. don't include trailing "
-                        "whitespaces).".format(doc.text))
+                        "whitespaces).".format(text))
         if not self.component_config["BILOU_flag"]:
             for i, label in enumerate(ents):
                 if self._bilou_from_label(label) in {"B", "I", "U", "L"}:
@@ -402,41 +606,116 @@ class CRFEntityExtractor(EntityExtractor):
             return None
 
     @staticmethod
-    def __tag_of_token(token):
+    def _tag_function():
+        # type: () -> Callable[[Any], Text]
+        """Returns the function reading the pos tag of a spacy token.
+
+        spacy 2 tokens can carry custom tags, the spacy version is only
+        checked once."""
         import spacy
-        if spacy.about.__version__ > "2" and token._.has("tag"):
-            return token._.get("tag")
+
+        if spacy.about.__version__ > "2":
+            def tag_of_token(token):
+                if token._.has("tag"):
+                    return token._.get("tag")
+                else:
+                    return token.tag_
+
+            return tag_of_token
+        else:
+            return lambda token: token.tag_
+
+    def _crf_tokens(self, message):
+        # type: (Message) -> Tuple[Text, List[Tuple[Text, int, int, Text]]]
+        """The text and the tokens of a message, with their character
+        offsets and pos tags.
+
+        Uses the spacy doc of the message if there is one. Otherwise the
+        tokens of any tokenizer are used, their pos tags are read from
+        the `pos` attribute of the tokens, set by an (optional) tagger."""
+
+        doc = message.get("spacy_doc")
+        if doc is not None:
+            if self._tag_of_token is None:
+                self._tag_of_token = self._tag_function()
+            return doc.text, [(t.text, t.idx, t.idx + len(t),
+                               self._tag_of_token(t))
+                              for t in doc]
         else:
-            return token.tag_
+            return message.text, [(t.text, t.offset, t.end, t.get("pos"))
+                                  for t in message.get("tokens") or []]
 
     def _from_text_to_crf(self, message, entities=None):
         # type: (Message, List[Text]) -> List[Tuple[Text, Text, Text, Text]]
         """Takes a sentence and switches it to crfsuite format."""
 
         crf_format = []
-        for i, token in enumerate(message.get("spacy_doc")):
+        for i, (text, _, _, tag) in enumerate(self._crf_tokens(message)[1]):
             pattern = self.__pattern_of_token(message, i)
             entity = entities[i] if entities else "N/A"
-            tag = self.__tag_of_token(token)
-            crf_format.append((token.text, tag, entity, pattern))
+            crf_format.append((text, tag, entity, pattern))
         return crf_format
 
-    def _train_model(self, df_train):
-        # type: (List[List[Tuple[Text, Text, Text, Text]]]) -> None
-        """Train the crf tagger based on the training data."""
+    def _training_features(self, df_train, num_threads=1):
+        # type: (List[List[Tuple[Text, Text, Text, Text]]], int) -> Iterator
+        """Generates the features of the training sentences one by one.
+
+        If the component is configured with `parallel_training`, the
+        features are built by a pool of `num_threads` processes."""
+
+        if (not self.component_config["parallel_training"] or
+                num_threads <= 1 or len(df_train) < num_threads):
+            for sent in df_train:
+                yield self._sentence_to_features(sent)
+            return
+
+        from rasa_nlu.utils import process_pool
+
+        logger.info("Building the crf features of {} sentences using {} "
+                    "processes".format(len(df_train), num_threads))
+        pool = process_pool(num_threads,
+                            _init_crf_worker,
+                            (self.component_config,))
+        try:
+            chunksize = max(1, min(100, len(df_train) // (num_threads * 4)))
+            # `imap` keeps the order of the sentences and hands the
+            # features to the trainer as soon as they are built
+            for features in pool.imap(_sentence_to_features_in_worker,
+                                      df_train, chunksize):
+                yield features
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _train_model(self, df_train, num_threads=1):
+        # type: (List[List[Tuple[Text, Text, Text, Text]]], int) -> None
+        """Train the crf tagger based on the training data.
+
+        The features of a sentence are appended to the crfsuite trainer
+        as soon as they are built, so the feature dicts of the whole
+        corpus are never held in memory at once."""
         import sklearn_crfsuite
 
-        X_train = [self._sentence_to_features(sent) for sent in df_train]
+        algorithm = self.component_config["algorithm"]
+        coefficients = CRF_ALGORITHMS[algorithm]
         y_train = [self._sentence_to_labels(sent) for sent in df_train]
         self.ent_tagger = sklearn_crfsuite.CRF(
-                algorithm='lbfgs',
+                algorithm=algorithm,
                 # coefficient for L1 penalty
-                c1=self.component_config["L1_c"],
+                c1=(self.component_config["L1_c"]
+                    if "c1" in coefficients else None),
                 # coefficient for L2 penalty
-                c2=self.component_config["L2_c"],
+                c2=(self.component_config["L2_c"]
+                    if "c2" in coefficients else None),
                 # stop earlier
                 max_iterations=self.component_config["max_iterations"],
+                # prune rare features
+                min_freq=self.component_config["feature_min_frequency"],
                 # include transitions that are possible, but not observed
                 all_possible_transitions=True
         )
-        self.ent_tagger.fit(X_train, y_train)
+        features = self._training_features(df_train, num_threads)
+        try:
+            self.ent_tagger.fit(features, y_train)
+        finally:
+            features.close()
@@ -5,13 +5,16 @@ from __future__ import unicode_literals
 
 import logging
 import os
+import time
 
 import requests
 import simplejson
 from typing import Any
+from typing import Dict
 from typing import List
 from typing import Optional
 from typing import Text
+from typing import Tuple
 
 from rasa_nlu.config import RasaNLUModelConfig
 from rasa_nlu.extractors import EntityExtractor
@@ -19,6 +22,7 @@ from rasa_nlu.extractors.duckling_extractor import (
     filter_irrelevant_matches, convert_duckling_format_to_rasa)
 from rasa_nlu.model import Metadata
 from rasa_nlu.training_data import Message
+from rasa_nlu.utils import CircuitBreaker, LRUCache
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +34,8 @@ class DucklingHTTPExtractor(EntityExtractor):
 
     provides = ["entities"]
 
+    concurrent = True
+
     defaults = {
         # by default all dimensions recognized by duckling are returned
         # dimensions can be configured to contain an array of strings
@@ -41,6 +47,23 @@ class DucklingHTTPExtractor(EntityExtractor):
 
         # locale - if not set, we will use the language of the model
         "locale": None,
+
+        # seconds to wait for the connection to the duckling server and
+        # for its response
+        "connect_timeout": 2.0,
+        "read_timeout": 5.0,
+
+        # number of duckling responses to cache, `0` disables the cache
+        "cache_size": 1000,
+
+        # seconds a cached response is used. Relative times, e.g.
+        # "in 5 minutes", can be off by up to this duration
+        "cache_ttl": 60,
+
+        # skip duckling for `circuit_breaker_reset_timeout` seconds after
+        # this many consecutive failed requests, `0` never skips duckling
+        "circuit_breaker_failures": 5,
+        "circuit_breaker_reset_timeout": 30
     }
 
     def __init__(self, component_config=None, language=None):
@@ -48,6 +71,12 @@ class DucklingHTTPExtractor(EntityExtractor):
 
         super(DucklingHTTPExtractor, self).__init__(component_config)
         self.language = language
+        # keeps the connections to the duckling server alive
+        self.session = requests.Session()
+        self.cache = LRUCache(self.component_config["cache_size"])
+        self.circuit_breaker = CircuitBreaker(
+                self.component_config["circuit_breaker_failures"],
+                self.component_config["circuit_breaker_reset_timeout"])
 
     @classmethod
     def create(cls, config):
@@ -72,23 +101,70 @@ class DucklingHTTPExtractor(EntityExtractor):
 
         return self.component_config.get("url")
 
-    def _duckling_parse(self, text):
-        """Sends the request to the duckling server and parses the result."""
+    def _duckling_parse(self, text, reference_time=None):
+        # type: (Text, Optional[int]) -> List[Dict[Text, Any]]
+        """Sends the request to the duckling server and parses the result.
+
+        Responses are cached per text, locale and reference time bucket of
+        `cache_ttl` seconds. The cache keeps the response text and every
+        request decodes its own matches, as the entities of a message
+        (e.g. their `additional_info`) must not share objects with the
+        entities of other messages. If the duckling server failed
+        repeatedly, no request is sent until the circuit breaker lets the
+        next one through."""
+
+        locale = self._locale()
+        ref_time = reference_time or int(time.time() * 1000)
+        ttl = max(1, int(self.component_config["cache_ttl"] * 1000))
+        cache_key = (text, locale, ref_time // ttl)
+
+        response = self.cache.get(cache_key)
+        if response is not None:
+            return simplejson.loads(response)
+
+        if not self.circuit_breaker.allow():
+            logger.debug("Skipping duckling after {} failed requests."
+                         "".format(self.circuit_breaker.failures))
+            return []
+
+        parsed = self._request_parse(text, locale, reference_time)
+        if parsed is None:
+            self.circuit_breaker.record_failure()
+            return []
+
+        response, matches = parsed
+        self.circuit_breaker.record_success()
+        self.cache.put(cache_key, response)
+        return matches
+
+    def _request_parse(self,
+                       text,  # type: Text
+                       locale,  # type: Text
+                       reference_time=None  # type: Optional[int]
+                       ):
+        # type: (...) -> Optional[Tuple[Text, List[Dict[Text, Any]]]]
+        """Response of the duckling server and its decoded matches, `None`
+        if the request failed or the response is not valid JSON."""
 
         try:
-            payload = {"text": text, "locale": self._locale()}
+            payload = {"text": text, "locale": locale}
+            if reference_time is not None:
+                payload["reftime"] = reference_time
             headers = {"Content-Type": "application/x-www-form-urlencoded; "
                                        "charset=UTF-8"}
-            response = requests.post(self._url() + "/parse",
-                                     data=payload,
-                                     headers=headers)
+            response = self.session.post(
+                    self._url() + "/parse",
+                    data=payload,
+                    headers=headers,
+                    timeout=(self.component_config["connect_timeout"],
+                             self.component_config["read_timeout"]))
             if response.status_code == 200:
-                return simplejson.loads(response.text)
+                return response.text, simplejson.loads(response.text)
             else:
                 logger.error("Failed to get a proper response from remote "
                              "duckling. Status Code: {}. Response: {}"
                              "".format(response.status_code, response.text))
-                return []
+                return None
         except requests.exceptions.ConnectionError as e:
             logger.error("Failed to connect to duckling http server. Make sure "
                          "the duckling server is running and the proper host "
@@ -97,13 +173,40 @@ class DucklingHTTPExtractor(EntityExtractor):
                          "github: "
                          "https://github.com/facebook/duckling#quickstart "
                          "Error: {}".format(e))
-            return []
+            return None
+        except requests.exceptions.Timeout as e:
+            logger.error("The duckling http server did not respond in time. "
+                         "Error: {}".format(e))
+            return None
+        except requests.exceptions.RequestException as e:
+            logger.error("The request to the duckling http server failed. "
+                         "Error: {}".format(e))
+            return None
+        except simplejson.JSONDecodeError as e:
+            logger.error("The duckling http server did not respond with "
+                         "valid JSON. Error: {}".format(e))
+            return None
+
+    @staticmethod
+    def _reference_time_from_message(message):
+        # type: (Message) -> Optional[int]
+        """Reference time of the message in milliseconds, if it has one."""
+
+        if message.time is not None:
+            try:
+                return int(message.time)
+            except (ValueError, TypeError) as e:
+                logger.warning("Could not parse timestamp {}. Instead "
+                               "current UTC time will be passed to "
+                               "duckling. Error: {}".format(message.time, e))
+        return None
 
     def process(self, message, **kwargs):
         # type: (Message, **Any) -> None
 
         if self._url() is not None:
-            matches = self._duckling_parse(message.text)
+            matches = self._duckling_parse(
+                    message.text, self._reference_time_from_message(message))
             dimensions = self.component_config["dimensions"]
             relevant_matches = filter_irrelevant_matches(matches, dimensions)
             extracted = convert_duckling_format_to_rasa(relevant_matches)
@@ -14,6 +14,7 @@ from typing import Text
 
 from rasa_nlu import utils
 from rasa_nlu.extractors import EntityExtractor
+from rasa_nlu.extractors.synonym_store import CompactSynonymStore
 from rasa_nlu.model import Metadata
 from rasa_nlu.training_data import Message
 from rasa_nlu.training_data import TrainingData
@@ -21,14 +22,28 @@ from rasa_nlu.utils import write_json_to_file
 
 ENTITY_SYNONYMS_FILE_NAME = "entity_synonyms.json"
 
+ENTITY_SYNONYMS_STORE_FILE_NAME = "entity_synonyms.bin"
+
 
 class EntitySynonymMapper(EntityExtractor):
     name = "ner_synonyms"
 
     provides = ["entities"]
 
+    uses = ["entities"]
+
+    concurrent = True
+
+    defaults = {
+        # persist the synonyms in a compact binary file instead of json,
+        # the file is memory mapped when the model is loaded. Use it for
+        # large synonym tables, to load them quickly and to share their
+        # memory between processes
+        "compact_store": False
+    }
+
     def __init__(self, component_config=None, synonyms=None):
-        # type: (Optional[Dict[Text, Text]]) -> None
+        # type: (Optional[Dict[Text, Any]], Optional[Dict[Text, Text]]) -> None
 
         super(EntitySynonymMapper, self).__init__(component_config)
 
@@ -56,6 +71,12 @@ class EntitySynonymMapper(EntityExtractor):
     def persist(self, model_dir):
         # type: (Text) -> Optional[Dict[Text, Any]]
 
+        if self.component_config["compact_store"]:
+            store_file = os.path.join(model_dir,
+                                      ENTITY_SYNONYMS_STORE_FILE_NAME)
+            CompactSynonymStore.write(store_file, self.synonyms)
+            return {"synonyms_store_file": ENTITY_SYNONYMS_STORE_FILE_NAME}
+
         if self.synonyms:
             entity_synonyms_file = os.path.join(model_dir,
                                                 ENTITY_SYNONYMS_FILE_NAME)
@@ -74,6 +95,12 @@ class EntitySynonymMapper(EntityExtractor):
         # type: (...) -> EntitySynonymMapper
 
         meta = model_metadata.for_component(cls.name)
+
+        if meta.get("synonyms_store_file"):
+            store_file = os.path.join(model_dir, meta["synonyms_store_file"])
+            return EntitySynonymMapper(meta,
+                                       CompactSynonymStore.load(store_file))
+
         file_name = meta.get("synonyms_file", ENTITY_SYNONYMS_FILE_NAME)
         entity_synonyms_file = os.path.join(model_dir, file_name)
 
@@ -90,8 +117,9 @@ class EntitySynonymMapper(EntityExtractor):
         for entity in entities:
             # need to wrap in `str` to handle e.g. entity values of type int
             entity_value = str(entity["value"])
-            if entity_value.lower() in self.synonyms:
-                entity["value"] = self.synonyms[entity_value.lower()]
+            synonym = self.synonyms.get(entity_value.lower())
+            if synonym is not None:
+                entity["value"] = synonym
                 self.add_processor_name(entity)
 
     def add_entities_if_synonyms(self, entity_a, entity_b):
@@ -35,6 +35,8 @@ class MitieEntityExtractor(EntityExtractor):
 
     requires = ["tokens", "mitie_feature_extractor", "mitie_file"]
 
+    concurrent = True
+
     def __init__(self,
                  component_config=None,  # type: Dict[Text, Any]
                  ner=None
@@ -23,6 +23,8 @@ class SpacyEntityExtractor(EntityExtractor):
 
     requires = ["spacy_nlp"]
 
+    concurrent = True
+
     def process(self, message, **kwargs):
         # type: (Message, **Any) -> None
 
@@ -0,0 +1,160 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import mmap
+import struct
+
+import numpy as np
+from builtins import object, range
+from typing import Dict
+from typing import Iterator
+from typing import Optional
+from typing import Text
+from typing import Tuple
+
+# identifies the file format, changes with incompatible versions
+SYNONYM_STORE_MAGIC = b"RASASYN1"
+
+# magic, number of keys, number of distinct values, size of the encoded
+# keys and values in bytes
+_HEADER = struct.Struct("<8sQQQQ")
+
+_OFFSETS = struct.Struct("<qq")
+
+_VALUE_ID = struct.Struct("<I")
+
+
+def _offsets(blobs):
+    offsets = np.zeros(len(blobs) + 1, dtype="<i8")
+    np.cumsum([len(b) for b in blobs], out=offsets[1:])
+    return offsets.tobytes()
+
+
+class CompactSynonymStore(object):
+    """Read only synonym mapping stored in a memory mapped file.
+
+    The utf-8 encoded keys are sorted and found using binary search over
+    their offsets, every distinct value is stored once. Hence loading the
+    store does not read the file and the operating system shares its pages
+    between all processes loading the same model.
+
+    Layout of the file: header, key offsets, value offsets, value index of
+    every key, encoded keys, encoded values."""
+
+    def __init__(self, buffer):
+        # type: (mmap.mmap) -> None
+
+        magic, num_keys, num_values, key_size, _ = \
+            _HEADER.unpack_from(buffer, 0)
+        if magic != SYNONYM_STORE_MAGIC:
+            raise ValueError("Not an entity synonym store.")
+
+        self._buffer = buffer
+        self._num_keys = num_keys
+        # positions of the sections in the file
+        self._key_offsets = _HEADER.size
+        self._value_offsets = self._key_offsets + 8 * (num_keys + 1)
+        self._value_ids = self._value_offsets + 8 * (num_values + 1)
+        self._keys = self._value_ids + 4 * num_keys
+        self._values = self._keys + key_size
+
+    @staticmethod
+    def write(file_name, synonyms):
+        # type: (Text, Dict[Text, Text]) -> None
+
+        items = sorted((key.encode("utf-8"), value)
+                       for key, value in synonyms.items())
+        values = sorted(set(value for _, value in items))
+        value_ids = {value: i for i, value in enumerate(values)}
+        keys = [key for key, _ in items]
+        encoded_values = [value.encode("utf-8") for value in values]
+
+        with io.open(file_name, "wb") as f:
+            f.write(_HEADER.pack(SYNONYM_STORE_MAGIC, len(keys), len(values),
+                                 sum(len(k) for k in keys),
+                                 sum(len(v) for v in encoded_values)))
+            f.write(_offsets(keys))
+            f.write(_offsets(encoded_values))
+            f.write(np.array([value_ids[value] for _, value in items],
+                             dtype="<u4").tobytes())
+            f.write(b"".join(keys))
+            f.write(b"".join(encoded_values))
+
+    @classmethod
+    def load(cls, file_name):
+        # type: (Text) -> CompactSynonymStore
+
+        with io.open(file_name, "rb") as f:
+            # the mapping stays valid after the file is closed
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer)
+
+    def _key(self, i):
+        # type: (int) -> bytes
+
+        start, end = _OFFSETS.unpack_from(self._buffer,
+                                          self._key_offsets + 8 * i)
+        return self._buffer[self._keys + start:self._keys + end]
+
+    def _value(self, i):
+        # type: (int) -> Text
+
+        value_id, = _VALUE_ID.unpack_from(self._buffer, self._value_ids + 4 * i)
+        start, end = _OFFSETS.unpack_from(self._buffer,
+                                          self._value_offsets + 8 * value_id)
+        return self._buffer[self._values + start:
+                            self._values + end].decode("utf-8")
+
+    def _find(self, key):
+        # type: (Text) -> Optional[int]
+
+        encoded = key.encode("utf-8")
+        low, high = 0, self._num_keys
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._num_keys and self._key(low) == encoded:
+            return low
+        else:
+            return None
+
+    def get(self, key, default=None):
+        # type: (Text, Optional[Text]) -> Optional[Text]
+
+        i = self._find(key)
+        return self._value(i) if i is not None else default
+
+    def __getitem__(self, key):
+        # type: (Text) -> Text
+
+        i = self._find(key)
+        if i is None:
+            raise KeyError(key)
+        return self._value(i)
+
+    def __contains__(self, key):
+        # type: (Text) -> bool
+        return self._find(key) is not None
+
+    def __len__(self):
+        return self._num_keys
+
+    def items(self):
+        # type: () -> Iterator[Tuple[Text, Text]]
+
+        for i in range(self._num_keys):
+            yield self._key(i).decode("utf-8"), self._value(i)
+
+    def __iter__(self):
+        for key, _ in self.items():
+            yield key
+
+    def close(self):
+        # type: () -> None
+        self._buffer.close()
@@ -7,7 +7,6 @@ import logging
 import typing
 import os
 import io
-import re
 from future.utils import PY3
 from typing import Any, Dict, List, Optional, Text
 
@@ -18,6 +17,7 @@ from rasa_nlu.training_data import TrainingData
 from rasa_nlu.components import Component
 from rasa_nlu.config import RasaNLUModelConfig
 from rasa_nlu.model import Metadata
+from rasa_nlu.utils.text_normalizer import replace_numbers
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +39,10 @@ class CountVectorsFeaturizer(Featurizer):
 
     requires = []
 
+    uses = ["spacy_doc", "normalized_text"]
+
+    concurrent = True
+
     defaults = {
         # the parameters are taken from
         # sklearn's CountVectorizer
@@ -101,9 +105,6 @@ class CountVectorsFeaturizer(Featurizer):
         # declare class instance for CountVect
         self.vect = None
 
-        # preprocessor
-        self.preprocessor = lambda s: re.sub(r'\b[0-9]+\b', 'NUMBER', s)
-
     @classmethod
     def required_packages(cls):
         # type: () -> List[Text]
@@ -115,16 +116,17 @@ class CountVectorsFeaturizer(Featurizer):
             construct a new count vectorizer using the sklearn framework."""
         from sklearn.feature_extraction.text import CountVectorizer
 
-        # use even single character word as a token
+        # use even single character word as a token. The texts are not
+        # lowercased, their numbers are already replaced
         self.vect = CountVectorizer(token_pattern=self.token_pattern,
+                                    lowercase=False,
                                     strip_accents=self.strip_accents,
                                     stop_words=self.stop_words,
                                     ngram_range=(self.min_ngram,
                                                  self.max_ngram),
                                     max_df=self.max_df,
                                     min_df=self.min_df,
-                                    max_features=self.max_features,
-                                    preprocessor=self.preprocessor)
+                                    max_features=self.max_features)
 
         lem_exs = [self._lemmatize(example)
                    for example in training_data.intent_examples]
@@ -152,9 +154,11 @@ class CountVectorsFeaturizer(Featurizer):
     @staticmethod
     def _lemmatize(message):
         if message.get("spacy_doc"):
-            return ' '.join([t.lemma_ for t in message.get("spacy_doc")])
+            return replace_numbers(
+                    ' '.join([t.lemma_ for t in message.get("spacy_doc")]))
         else:
-            return message.text
+            # shared with the other components of the pipeline
+            return message.normalized_text("numbers")
 
     @classmethod
     def load(cls,
@@ -3,10 +3,13 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import logging
+
 import numpy as np
 import typing
 from typing import Any
 from typing import List
+from typing import Optional
 from typing import Text
 
 from rasa_nlu.config import RasaNLUModelConfig
@@ -14,6 +17,9 @@ from rasa_nlu.featurizers import Featurizer
 from rasa_nlu.tokenizers import Token
 from rasa_nlu.training_data import Message
 from rasa_nlu.training_data import TrainingData
+from rasa_nlu.utils import LRUCache
+
+logger = logging.getLogger(__name__)
 
 if typing.TYPE_CHECKING:
     import mitie
@@ -27,6 +33,8 @@ class MitieFeaturizer(Featurizer):
 
     requires = ["tokens", "mitie_feature_extractor"]
 
+    concurrent = True
+
     @classmethod
     def required_packages(cls):
         # type: () -> List[Text]
@@ -41,19 +49,29 @@ class MitieFeaturizer(Featurizer):
         # type: (TrainingData, RasaNLUModelConfig, **Any) -> None
 
         mitie_feature_extractor = self._mitie_feature_extractor(**kwargs)
+        vector_cache = kwargs.get("mitie_word_vector_cache")
         for example in training_data.intent_examples:
             features = self.features_for_tokens(example.get("tokens"),
-                                                mitie_feature_extractor)
+                                                mitie_feature_extractor,
+                                                vector_cache)
             example.set("text_features",
                         self._combine_with_existing_text_features(
                                 example, features))
 
+        if vector_cache is not None:
+            logger.info("MITIE word vector cache hit rate: {:.2%} "
+                        "({} of {} word vectors cached)"
+                        "".format(vector_cache.hit_rate,
+                                  len(vector_cache),
+                                  vector_cache.max_size))
+
     def process(self, message, **kwargs):
         # type: (Message, **Any) -> None
 
         mitie_feature_extractor = self._mitie_feature_extractor(**kwargs)
-        features = self.features_for_tokens(message.get("tokens"),
-                                            mitie_feature_extractor)
+        features = self.features_for_tokens(
+                message.get("tokens"), mitie_feature_extractor,
+                kwargs.get("mitie_word_vector_cache"))
         message.set("text_features",
                     self._combine_with_existing_text_features(message,
                                                               features))
@@ -68,13 +86,33 @@ class MitieFeaturizer(Featurizer):
                             "configuration.")
         return mitie_feature_extractor
 
-    def features_for_tokens(self, tokens, feature_extractor):
-        # type: (List[Token], mitie.total_word_feature_extractor) -> np.ndarray
+    @staticmethod
+    def _word_vector(word, feature_extractor, vector_cache=None):
+        # type: (Text, mitie.total_word_feature_extractor, Optional[LRUCache]) -> np.ndarray
+
+        if vector_cache is None:
+            return feature_extractor.get_feature_vector(word)
 
-        vec = np.zeros(self.ndim(feature_extractor))
-        for token in tokens:
-            vec += feature_extractor.get_feature_vector(token.text)
-        if tokens:
-            return vec / len(tokens)
-        else:
+        def compute(w):
+            vec = np.asarray(feature_extractor.get_feature_vector(w))
+            # cached vectors are shared across requests and models
+            vec.flags.writeable = False
             return vec
+
+        return vector_cache.get_or_compute(word, compute)
+
+    def features_for_tokens(self,
+                            tokens,  # type: List[Token]
+                            feature_extractor,  # type: mitie.total_word_feature_extractor
+                            vector_cache=None  # type: Optional[LRUCache]
+                            ):
+        # type: (...) -> np.ndarray
+
+        if not tokens:
+            return np.zeros(self.ndim(feature_extractor))
+
+        vectors = [self._word_vector(token.text,
+                                     feature_extractor,
+                                     vector_cache)
+                   for token in tokens]
+        return np.mean(vectors, axis=0, dtype=np.float64)
@@ -37,6 +37,8 @@ class NGramFeaturizer(Featurizer):
 
     requires = ["spacy_doc"]
 
+    concurrent = True
+
     defaults = {
         # defines the maximum number of ngrams to collect and add
         # to the featurization of a sentence
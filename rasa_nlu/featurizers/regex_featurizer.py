@@ -31,10 +31,13 @@ REGEX_FEATURIZER_FILE_NAME = "regex_featurizer.json"
 class RegexFeaturizer(Featurizer):
     name = "intent_entity_featurizer_regex"
 
-    provides = ["text_features"]
+    # the matching patterns are set on the tokens
+    provides = ["text_features", "token_patterns"]
 
     requires = ["tokens"]
 
+    concurrent = True
+
     def __init__(self, component_config=None, known_patterns=None):
         super(RegexFeaturizer, self).__init__(component_config)
 
@@ -35,6 +35,8 @@ class SpacyFeaturizer(Featurizer):
 
     requires = ["spacy_doc"]
 
+    concurrent = True
+
     def train(self, training_data, config, **kwargs):
         # type: (TrainingData) -> None
 
@@ -20,6 +20,8 @@ from rasa_nlu import components, utils, config
 from rasa_nlu.components import Component, ComponentBuilder
 from rasa_nlu.config import RasaNLUModelConfig, override_defaults
 from rasa_nlu.persistor import Persistor
+from rasa_nlu.scheduler import IntentCascade, ParallelScheduler
+from rasa_nlu.scheduler import Scheduler, SequentialScheduler
 from rasa_nlu.training_data import TrainingData, Message
 from rasa_nlu.utils import create_dir, write_json_to_file
 
@@ -204,6 +206,8 @@ class Trainer(object):
         timestamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
         metadata = {
             "language": self.config["language"],
+            "scheduler": self.config.get("scheduler", "sequential"),
+            "cascade_threshold": self.config.get("cascade_threshold"),
             "pipeline": [],
         }
 
@@ -295,7 +299,8 @@ class Interpreter(object):
         # Before instantiating the component classes,
         # lets check if all required packages are available
         if not skip_valdation:
-            components.validate_requirements(model_metadata.component_classes)
+            components.validate_requirements(model_metadata.component_classes,
+                                             model_metadata)
 
         for component_name in model_metadata.component_classes:
             component = component_builder.load_component(
@@ -310,20 +315,48 @@ class Interpreter(object):
                 raise Exception("Failed to initialize component '{}'. "
                                 "{}".format(component.name, e))
 
-        return Interpreter(pipeline, context, model_metadata)
+        threshold = model_metadata.get("cascade_threshold")
+        if threshold is not None:
+            cascade = IntentCascade(pipeline, threshold)
+        else:
+            cascade = None
+
+        if model_metadata.get("scheduler") == "parallel":
+            scheduler = ParallelScheduler(pipeline, cascade=cascade)
+        else:
+            scheduler = SequentialScheduler(pipeline, cascade)
+
+        return Interpreter(pipeline, context, model_metadata, scheduler)
 
-    def __init__(self, pipeline, context, model_metadata=None):
-        # type: (List[Component], Dict[Text, Any], Optional[Metadata]) -> None
+    def __init__(self,
+                 pipeline,  # type: List[Component]
+                 context,  # type: Dict[Text, Any]
+                 model_metadata=None,  # type: Optional[Metadata]
+                 scheduler=None  # type: Optional[Scheduler]
+                 ):
+        # type: (...) -> None
 
         self.pipeline = pipeline
         self.context = context if context is not None else {}
         self.model_metadata = model_metadata
+        if scheduler is None:
+            scheduler = SequentialScheduler(pipeline)
+        self.scheduler = scheduler
 
-    def parse(self, text, time=None, only_output_properties=True):
-        # type: (Text) -> Dict[Text, Any]
+    @property
+    def cascade(self):
+        # type: () -> Optional[IntentCascade]
+        return self.scheduler.cascade
+
+    def parse(self, text, time=None, only_output_properties=True,
+              deadline=None):
+        # type: (Text, Any, bool, Optional[float]) -> Dict[Text, Any]
         """Parse the input text, classify it and return pipeline result.
 
-        The pipeline result usually contains intent and entities."""
+        The pipeline result usually contains intent and entities. Optional
+        components, e.g. entity extractors, which are not expected to
+        finish before the `deadline` (a `time.time()` timestamp) are
+        skipped. The result of such a parse is marked as `partial`."""
 
         if not text:
             # Not all components are able to handle empty strings. So we need
@@ -336,10 +369,29 @@ class Interpreter(object):
 
         message = Message(text, self.default_output_attributes(), time=time)
 
-        for component in self.pipeline:
-            component.process(message, **self.context)
+        skipped = self.scheduler.process(message, self.context, deadline)
 
         output = self.default_output_attributes()
         output.update(message.as_dict(
                 only_output_properties=only_output_properties))
+        if skipped:
+            output["partial"] = True
+            output["skipped_components"] = [self.pipeline[i].name
+                                            for i in skipped]
         return output
+
+    def resource_usage(self):
+        # type: () -> Dict[Text, Any]
+        """Resources used by the components of the pipeline.
+
+        Components cached by the component builder are shared between
+        models and are reported for every model using them."""
+
+        components = {}
+        for component in self.pipeline:
+            usage = component.resource_usage()
+            if usage:
+                components[component.name] = usage
+        return {"memory": sum(u.get("memory", 0)
+                              for u in components.values()),
+                "components": components}
@@ -107,7 +107,8 @@ class Project(object):
         logger.warn("Invalid model requested. Using default")
         return self._latest_project_model()
 
-    def parse(self, text, time=None, requested_model_name=None):
+    def parse(self, text, time=None, requested_model_name=None,
+              deadline=None):
         self._begin_read()
 
         model_name = self._dynamic_load_model(requested_model_name)
@@ -120,7 +121,8 @@ class Project(object):
         finally:
             self._loader_lock.release()
 
-        response = self._models[model_name].parse(text, time)
+        response = self._models[model_name].parse(text, time,
+                                                  deadline=deadline)
 
         self._end_read()
 
@@ -214,7 +216,9 @@ class Project(object):
     def as_dict(self):
         return {'status': 'training' if self.status else 'ready',
                 'available_models': list(self._models.keys()),
-                'loaded_models': self._list_loaded_models()}
+                'loaded_models': self._list_loaded_models(),
+                'resource_usage': self._loaded_models_resource_usage(),
+                'intent_cascades': self._loaded_models_intent_cascades()}
 
     def _list_loaded_models(self):
         models = []
@@ -223,6 +227,16 @@ class Project(object):
                 models.append(model)
         return models
 
+    def _loaded_models_resource_usage(self):
+        return {model: interpreter.resource_usage()
+                for model, interpreter in self._models.items()
+                if interpreter is not None}
+
+    def _loaded_models_intent_cascades(self):
+        return {model: interpreter.cascade.as_dict()
+                for model, interpreter in self._models.items()
+                if interpreter is not None and interpreter.cascade is not None}
+
     def _list_models_in_cloud(self):
         # type: () -> List[Text]
 
@@ -40,6 +40,7 @@ from rasa_nlu.tokenizers.jieba_tokenizer import JiebaTokenizer
 from rasa_nlu.tokenizers.whitespace_tokenizer import WhitespaceTokenizer
 from rasa_nlu.utils.mitie_utils import MitieNLP
 from rasa_nlu.utils.spacy_utils import SpacyNLP
+from rasa_nlu.utils.text_normalizer import TextNormalizer
 
 if typing.TYPE_CHECKING:
     from rasa_nlu.components import Component
@@ -48,7 +49,7 @@ if typing.TYPE_CHECKING:
 # Classes of all known components. If a new component should be added,
 # its class name should be listed here.
 component_classes = [
-    SpacyNLP, MitieNLP,
+    SpacyNLP, MitieNLP, TextNormalizer,
     SpacyEntityExtractor, MitieEntityExtractor, DucklingExtractor,
     CRFEntityExtractor, DucklingHTTPExtractor,
     EntitySynonymMapper,
@@ -0,0 +1,450 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+import threading
+import time
+
+from builtins import object, range
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Text
+
+from rasa_nlu.components import Component
+from rasa_nlu.training_data import Message
+
+logger = logging.getLogger(__name__)
+
+# attributes concurrent components append to, merged in pipeline order
+APPENDED_ATTRIBUTES = {"entities"}
+
+# attributes which are only read once they are set, components reading
+# them do not have to be ordered (missing text variants are added to the
+# normalized texts, but they only depend on the text)
+READ_ONLY_ATTRIBUTES = {"normalized_text"}
+
+# attributes set by intent classifiers
+INTENT_ATTRIBUTES = {"intent", "intent_ranking"}
+
+# attributes of the components which are skipped if they would not finish
+# before the deadline of a message
+OPTIONAL_ATTRIBUTES = {"entities"}
+
+# number of threads of the executor shared by all parallel schedulers
+EXECUTOR_THREADS = 8
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def shared_executor():
+    # type: () -> ThreadPoolExecutor
+    """The thread pool shared by the schedulers of all loaded models."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(EXECUTOR_THREADS)
+        return _executor
+
+
+def _reads(component):
+    return set(component.requires) | set(component.uses)
+
+
+def _appends(component):
+    if component.concurrent:
+        return (set(component.provides) & APPENDED_ATTRIBUTES) - \
+               _reads(component)
+    else:
+        return set()
+
+
+def _depends_on(component, earlier):
+    # type: (Component, Component) -> bool
+    """Whether `component` has to run after the `earlier` component."""
+
+    if not component.concurrent or not earlier.concurrent:
+        return True
+
+    reads, writes = _reads(component), set(component.provides)
+    earlier_reads, earlier_writes = _reads(earlier), set(earlier.provides)
+    written_by_both = ((writes & earlier_writes) -
+                       (_appends(component) & _appends(earlier)))
+    # components reading the same attribute might annotate it, e.g. the
+    # regex featurizer sets the patterns of the tokens
+    return bool(reads & earlier_writes or
+                (reads & earlier_reads) - READ_ONLY_ATTRIBUTES or
+                writes & earlier_reads or
+                written_by_both)
+
+
+def component_dependencies(pipeline):
+    # type: (List[Component]) -> List[Set[int]]
+    """Indices of the components each component of the pipeline depends
+    on. Works on component classes as well."""
+
+    return [{i for i in range(j) if _depends_on(component, pipeline[i])}
+            for j, component in enumerate(pipeline)]
+
+
+def _is_intent_classifier(component):
+    provides = set(component.provides)
+    return "intent" in provides and provides <= INTENT_ATTRIBUTES
+
+
+def skipped_after(pipeline, stage):
+    # type: (List[Component], int) -> Set[int]
+    """Indices of the components after the intent classifier at `stage`
+    which are not needed once it classified the intent.
+
+    These are the later intent classifiers and the components whose
+    attributes are only read by skipped components, e.g. their
+    featurizers."""
+
+    skipped = set()
+    # attributes read by the skipped and by the remaining components
+    skipped_reads, needed = set(), set()
+    # components which do not declare everything they read might read
+    # any attribute
+    needs_all = False
+    for j in range(len(pipeline) - 1, stage, -1):
+        component = pipeline[j]
+        provides = set(component.provides)
+        if (_is_intent_classifier(component) or
+                (provides & skipped_reads and
+                 not needs_all and not provides & needed)):
+            skipped.add(j)
+            skipped_reads.update(_reads(component))
+        else:
+            needed.update(_reads(component))
+            needs_all = needs_all or not component.concurrent
+    return skipped
+
+
+class IntentCascade(object):
+    """Ends the intent classification once an intent classifier is
+    confident.
+
+    The intent classifiers of the pipeline are the stages of the cascade,
+    so the cheap ones should come first. If a stage classifies the intent
+    with a confidence of at least `threshold`, the later stages and the
+    components only they need are skipped. The intent ranking of stages
+    without one is the classified intent. Counts how often each stage
+    was evaluated and ended the cascade."""
+
+    def __init__(self, pipeline, threshold):
+        # type: (List[Component], float) -> None
+
+        self.pipeline = pipeline
+        self.threshold = threshold
+        self.stages = [i for i, component in enumerate(pipeline)
+                       if _is_intent_classifier(component)]
+        self.skipped = {i: skipped_after(pipeline, i) for i in self.stages}
+        self._evaluated = {i: 0 for i in self.stages}
+        self._exits = {i: 0 for i in self.stages}
+        self._lock = threading.Lock()
+
+    def is_confident(self, message):
+        # type: (Message) -> bool
+
+        intent = message.get("intent") or {}
+        return (bool(intent.get("name")) and
+                intent.get("confidence", 0.0) >= self.threshold)
+
+    def exit(self, index, message):
+        # type: (int, Message) -> Set[int]
+        """Indices of the components to skip after the component at `index`
+        processed the message."""
+
+        if index not in self.skipped:
+            return set()
+
+        confident = self.is_confident(message)
+        with self._lock:
+            self._evaluated[index] += 1
+            if confident:
+                self._exits[index] += 1
+
+        if confident and \
+                "intent_ranking" not in self.pipeline[index].provides:
+            # the response has the same keys whichever stage answered
+            message.set("intent_ranking", [message.get("intent")],
+                        add_to_output=True)
+        return self.skipped[index] if confident else set()
+
+    def as_dict(self):
+        # type: () -> Dict[Text, Any]
+
+        with self._lock:
+            stages = [{"name": self.pipeline[i].name,
+                       "evaluated": self._evaluated[i],
+                       "exits": self._exits[i],
+                       "hit_rate": (self._exits[i] / self._evaluated[i]
+                                    if self._evaluated[i] else 0.0),
+                       "skips": [self.pipeline[j].name
+                                 for j in sorted(self.skipped[i])]}
+                      for i in self.stages]
+        return {"threshold": self.threshold, "stages": stages}
+
+
+def is_optional(component):
+    # type: (Component) -> bool
+    """Whether the component can be skipped to meet a deadline."""
+
+    provides = set(component.provides)
+    return bool(provides) and provides <= OPTIONAL_ATTRIBUTES
+
+
+class ComponentTimer(object):
+    """Moving averages of the time the components of a pipeline take to
+    process a message."""
+
+    def __init__(self, pipeline, smoothing=0.2):
+        # type: (List[Component], float) -> None
+
+        self.pipeline = pipeline
+        self.smoothing = smoothing
+        self.averages = [None] * len(pipeline)  # type: List[Optional[float]]
+        self._optional = [is_optional(c) for c in pipeline]
+
+    def record(self, index, seconds):
+        # type: (int, float) -> None
+
+        average = self.averages[index]
+        if average is None:
+            self.averages[index] = seconds
+        else:
+            self.averages[index] = average + self.smoothing * (seconds -
+                                                               average)
+
+    def fits(self, index, deadline):
+        # type: (int, float) -> bool
+        """Whether the component at `index` and the required components
+        after it are expected to finish before the deadline."""
+
+        expected = sum(self.averages[j] or 0.0
+                       for j in range(index, len(self.pipeline))
+                       if j == index or not self._optional[j])
+        return time.time() + expected <= deadline
+
+    def is_late(self, index, deadline):
+        # type: (int, Optional[float]) -> bool
+        """Whether the component at `index` should be skipped to meet the
+        deadline."""
+
+        return (deadline is not None and self._optional[index] and
+                not self.fits(index, deadline))
+
+
+class Scheduler(object):
+    """Runs the components of a pipeline on a message."""
+
+    def __init__(self, pipeline, cascade=None):
+        # type: (List[Component], Optional[IntentCascade]) -> None
+
+        self.pipeline = pipeline
+        self.cascade = cascade
+        self.timer = ComponentTimer(pipeline)
+
+    def _run(self, index, message, context):
+        # type: (int, Message, Dict[Text, Any]) -> None
+
+        start = time.time()
+        self.pipeline[index].process(message, **context)
+        self.timer.record(index, time.time() - start)
+
+    def process(self, message, context, deadline=None):
+        # type: (Message, Dict[Text, Any], Optional[float]) -> List[int]
+        """Processes the message with the components of the pipeline.
+
+        Optional components, e.g. entity extractors, which are not
+        expected to finish before the `deadline` (a `time.time()`
+        timestamp) are skipped. Returns the indices of these components."""
+
+        raise NotImplementedError
+
+
+class SequentialScheduler(Scheduler):
+    """Runs the components one after another."""
+
+    def process(self, message, context, deadline=None):
+        # type: (Message, Dict[Text, Any], Optional[float]) -> List[int]
+
+        skipped, late = set(), []
+        for i in range(len(self.pipeline)):
+            if i in skipped:
+                continue
+            elif self.timer.is_late(i, deadline):
+                late.append(i)
+                continue
+
+            self._run(i, message, context)
+            if self.cascade is not None:
+                skipped.update(self.cascade.exit(i, message))
+        return late
+
+
+class _MessageMerger(object):
+    """Applies the results of the components to the parsed message.
+
+    Every component processes its own view of the message. The attributes
+    a component changed are copied to the message once it is finished,
+    appended entities are merged in pipeline order."""
+
+    def __init__(self, message):
+        # type: (Message) -> None
+
+        self.message = message
+        # value of an appended attribute before the appending components
+        self._base = {a: message.get(a, []) for a in APPENDED_ATTRIBUTES}
+        self._appended = {a: {} for a in APPENDED_ATTRIBUTES}
+
+    def view(self):
+        # type: () -> Message
+
+        return Message(self.message.text, dict(self.message.data),
+                       set(self.message.output_properties),
+                       self.message.time)
+
+    def merge(self, index, component, view, snapshot):
+        # type: (int, Component, Message, Dict[Text, Any]) -> None
+
+        appends = _appends(component)
+        for key, value in view.data.items():
+            if key in snapshot and snapshot[key] is value:
+                continue
+            if key in appends:
+                appended = self._appended[key]
+                appended[index] = value[len(snapshot.get(key, [])):]
+                self.message.data[key] = (
+                        self._base[key] +
+                        [v for i in sorted(appended) for v in appended[i]])
+            else:
+                if key in self._base:
+                    # set by a component depending on all components
+                    # which appended to it before
+                    self._base[key] = value
+                    self._appended[key] = {}
+                self.message.data[key] = value
+        self.message.output_properties.update(view.output_properties)
+
+
+class ParallelScheduler(Scheduler):
+    """Runs independent components of a pipeline concurrently.
+
+    The dependencies between the components are derived from the
+    attributes they require, use and provide (see `Component.concurrent`).
+    A component starts as soon as all components it depends on are
+    finished. One of the ready components runs in the calling thread, the
+    others on an executor shared by all models. The parsed message is the
+    same as the one of running the components one after another.
+
+    With a `cascade`, the components an intent classifier might skip start
+    after it is finished."""
+
+    def __init__(self,
+                 pipeline,  # type: List[Component]
+                 executor=None,  # type: Optional[ThreadPoolExecutor]
+                 cascade=None  # type: Optional[IntentCascade]
+                 ):
+        # type: (...) -> None
+
+        super(ParallelScheduler, self).__init__(pipeline, cascade)
+        self.dependencies = component_dependencies(pipeline)
+        if cascade is not None:
+            for stage, skipped in cascade.skipped.items():
+                for j in skipped:
+                    self.dependencies[j].add(stage)
+        self.dependents = [[j for j in range(len(pipeline))
+                            if i in self.dependencies[j]]
+                           for i in range(len(pipeline))]
+        self._executor = executor
+
+    @property
+    def executor(self):
+        # type: () -> ThreadPoolExecutor
+        if self._executor is None:
+            self._executor = shared_executor()
+        return self._executor
+
+    def process(self, message, context, deadline=None):
+        # type: (Message, Dict[Text, Any], Optional[float]) -> List[int]
+
+        merger = _MessageMerger(message)
+        waiting_for = [len(d) for d in self.dependencies]
+        ready = [i for i, n in enumerate(waiting_for) if n == 0]
+        running = {}
+        skipped, late = set(), []
+
+        def start():
+            view = merger.view()
+            return view, dict(view.data)
+
+        def release(i):
+            for j in self.dependents[i]:
+                waiting_for[j] -= 1
+                if waiting_for[j] == 0:
+                    if j in skipped:
+                        release(j)
+                    else:
+                        ready.append(j)
+
+        def finish(i, view, snapshot):
+            merger.merge(i, self.pipeline[i], view, snapshot)
+            if self.cascade is not None:
+                skipped.update(self.cascade.exit(i, merger.message))
+            release(i)
+
+        try:
+            while ready or running:
+                starting = []
+                while ready:
+                    i = ready.pop()
+                    if self.timer.is_late(i, deadline):
+                        late.append(i)
+                        # might make further components ready
+                        release(i)
+                    else:
+                        starting.append(i)
+                starting.sort()
+
+                current, later = starting[:1], starting[1:]
+                for i in later:
+                    view, snapshot = start()
+                    future = self.executor.submit(self._run, i, view,
+                                                  context)
+                    running[future] = (i, view, snapshot)
+
+                for i in current:
+                    view, snapshot = start()
+                    self._run(i, view, context)
+                    finish(i, view, snapshot)
+
+                if running and not ready:
+                    done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                else:
+                    done = [f for f in running if f.done()]
+                for future in done:
+                    i, view, snapshot = running.pop(future)
+                    future.result()
+                    finish(i, view, snapshot)
+        finally:
+            # components still running only change their own view
+            for future in running:
+                future.cancel()
+        return sorted(late)
+
+    def as_dict(self):
+        # type: () -> List[Dict[Text, Any]]
+
+        return [{"name": component.name,
+                 "depends_on": [self.pipeline[i].name
+                                for i in sorted(self.dependencies[j])]}
+                for j, component in enumerate(self.pipeline)]
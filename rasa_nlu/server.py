@@ -5,6 +5,9 @@ from __future__ import unicode_literals
 
 import argparse
 import logging
+import math
+import threading
+import time
 from functools import wraps
 
 import simplejson
@@ -12,7 +15,8 @@ import six
 from builtins import str
 from klein import Klein
 from twisted.internet import reactor, threads
-from twisted.internet.defer import inlineCallbacks, returnValue
+from twisted.internet.defer import inlineCallbacks, maybeDeferred, returnValue
+from typing import Any, Dict, Text
 
 from rasa_nlu import utils, config
 from rasa_nlu.config import RasaNLUModelConfig
@@ -74,6 +78,23 @@ def create_argument_parser():
                         default=1,
                         help='Number of parallel threads to use for '
                              'handling parse requests.')
+    parser.add_argument('--deadline',
+                        type=float,
+                        help='Default time in milliseconds a parse request '
+                             'may take, requests can set their own using '
+                             'the `deadline` parameter. Optional '
+                             'components, e.g. entity extractors, are '
+                             'skipped if they would not finish in time.')
+    parser.add_argument('--max_queue_depth',
+                        type=int,
+                        help='Maximum number of parse requests waiting for '
+                             'a thread, further requests are rejected '
+                             'with a 503 response. Unbounded if not set.')
+    parser.add_argument('--max_queue_wait',
+                        type=float,
+                        help='Maximum time in milliseconds a parse request '
+                             'may wait for a thread, requests waiting '
+                             'longer are rejected with a 503 response.')
     parser.add_argument('--response_log',
                         help='Directory where logs will be saved '
                              '(containing queries and responses).'
@@ -166,6 +187,94 @@ def is_yaml_request(request):
             iter(request.requestHeaders.getRawHeaders("Content-Type", [])), "")
 
 
+class OverloadedError(Exception):
+    """Raised when a parse request is shed because the parse queue is full
+    or the request waited too long for a thread.
+
+    Attributes:
+        retry_after -- seconds the client should wait before retrying
+    """
+
+    def __init__(self, message, retry_after):
+        self.message = message
+        self.retry_after = retry_after
+
+    def __str__(self):
+        return self.message
+
+
+class ParseQueue(object):
+    """Bounds the parse requests waiting for a thread of the reactor pool.
+
+    `deferToThread` queues work without a limit, so during traffic spikes
+    every request waits until the client gave up on it. Instead, requests
+    beyond `max_depth` are rejected right away and requests which waited
+    longer than `max_wait` seconds are dropped before parsing them."""
+
+    def __init__(self, max_depth=None, max_wait=None, run_in_thread=True):
+        self.max_depth = max_depth
+        self.max_wait = max_wait
+        self._defer = threads.deferToThread if run_in_thread \
+            else maybeDeferred
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._running = 0
+        self._counts = {"accepted": 0,
+                        "shed_queue_full": 0,
+                        "shed_wait_exceeded": 0}
+
+    def retry_after(self):
+        # type: () -> int
+        """Seconds a rejected client should wait, the queue drains within
+        the maximum wait."""
+
+        return max(1, int(math.ceil(self.max_wait or 0)))
+
+    def submit(self, f, *args):
+        """Runs `f` in a thread of the reactor pool, returns a deferred.
+
+        Fails with an `OverloadedError` if the request is shed."""
+
+        with self._lock:
+            if self.max_depth is not None and \
+                    self._waiting >= self.max_depth:
+                self._counts["shed_queue_full"] += 1
+                raise OverloadedError("Too many parse requests are queued.",
+                                      self.retry_after())
+            self._waiting += 1
+            self._counts["accepted"] += 1
+        return self._defer(self._run, time.time(), f, *args)
+
+    def _run(self, queued_at, f, *args):
+        with self._lock:
+            self._waiting -= 1
+            if self.max_wait is not None and \
+                    time.time() - queued_at > self.max_wait:
+                self._counts["shed_wait_exceeded"] += 1
+                raise OverloadedError("Parse request waited too long for "
+                                      "a thread.", self.retry_after())
+            self._running += 1
+        try:
+            return f(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def get_metrics(self):
+        # type: () -> Dict[Text, Any]
+        """Current depth of the queue and the number of shed requests."""
+
+        with self._lock:
+            metrics = dict(self._counts,
+                           depth=self._waiting,
+                           running=self._running,
+                           max_depth=self.max_depth,
+                           max_wait=self.max_wait)
+        metrics["shed"] = (metrics["shed_queue_full"] +
+                           metrics["shed_wait_exceeded"])
+        return metrics
+
+
 class RasaNLU(object):
     """Class representing Rasa NLU http server"""
 
@@ -179,7 +288,10 @@ class RasaNLU(object):
                  token=None,
                  cors_origins=None,
                  testing=False,
-                 default_config_path=None):
+                 default_config_path=None,
+                 default_deadline=None,
+                 max_queue_depth=None,
+                 max_queue_wait=None):
 
         self._configure_logging(loglevel, logfile)
 
@@ -190,6 +302,12 @@ class RasaNLU(object):
         self._testing = testing
         self.cors_origins = cors_origins if cors_origins else ["*"]
         self.access_token = token
+        # milliseconds, used for parse requests without a deadline
+        self.default_deadline = default_deadline
+        self.parse_queue = ParseQueue(
+                max_queue_depth,
+                max_queue_wait / 1000.0 if max_queue_wait else None,
+                run_in_thread=not testing)
         reactor.suggestThreadPoolSize(num_threads * 5)
 
     @staticmethod
@@ -205,6 +323,20 @@ class RasaNLU(object):
                             level=loglevel)
         logging.captureWarnings(True)
 
+    def _deadline(self, request_params):
+        """The `time.time()` timestamp a parse request has to be finished
+        at, counting from now."""
+
+        budget = request_params.get('deadline')
+        if budget is None:
+            # also for an explicit `null`, clients can not opt out of
+            # the deadline of the server
+            budget = self.default_deadline
+        if budget is None:
+            return None
+        else:
+            return time.time() + float(budget) / 1000.0
+
     @app.route("/", methods=['GET', 'OPTIONS'])
     @check_cors
     def hello(self, request):
@@ -233,11 +365,22 @@ class RasaNLU(object):
             returnValue(dumped)
         else:
             data = self.data_router.extract(request_params)
+            try:
+                data['deadline'] = self._deadline(request_params)
+            except (TypeError, ValueError):
+                request.setResponseCode(400)
+                dumped = json_to_string(
+                        {"error": "Invalid deadline specified"})
+                returnValue(dumped)
             try:
                 request.setResponseCode(200)
-                response = yield (self.data_router.parse(data) if self._testing
-                                  else threads.deferToThread(self.data_router.parse, data))
+                response = yield self.parse_queue.submit(
+                        self.data_router.parse, data)
                 returnValue(json_to_string(response))
+            except OverloadedError as e:
+                request.setResponseCode(503)
+                request.setHeader('Retry-After', str(e.retry_after))
+                returnValue(json_to_string({"error": "{}".format(e)}))
             except InvalidProjectError as e:
                 request.setResponseCode(404)
                 returnValue(json_to_string({"error": "{}".format(e)}))
@@ -246,6 +389,17 @@ class RasaNLU(object):
                 logger.exception(e)
                 returnValue(json_to_string({"error": "{}".format(e)}))
 
+    @app.route("/metrics", methods=['GET', 'OPTIONS'])
+    @requires_auth
+    @check_cors
+    def metrics(self, request):
+        """Counts of the requests handled by this process"""
+
+        request.setHeader('Content-Type', 'application/json')
+        metrics = self.data_router.get_metrics()
+        metrics["parse_queue"] = self.parse_queue.get_metrics()
+        return json_to_string(metrics)
+
     @app.route("/version", methods=['GET', 'OPTIONS'])
     @requires_auth
     @check_cors
@@ -387,7 +541,10 @@ if __name__ == '__main__':
             cmdline_args.num_threads,
             cmdline_args.token,
             cmdline_args.cors,
-            default_config_path=cmdline_args.config
+            default_config_path=cmdline_args.config,
+            default_deadline=cmdline_args.deadline,
+            max_queue_depth=cmdline_args.max_queue_depth,
+            max_queue_wait=cmdline_args.max_queue_wait
     )
 
     logger.info('Started http server on port %s' % cmdline_args.port)
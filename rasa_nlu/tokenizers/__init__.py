@@ -2,22 +2,192 @@ from __future__ import unicode_literals
 from __future__ import print_function
 from __future__ import division
 from __future__ import absolute_import
-from builtins import object
+from builtins import object, range
+
+import array
+import logging
+
+from typing import List
+from typing import Text
+from typing import Tuple
+
+logger = logging.getLogger(__name__)
+
+# tokenizer used by the processes of a parallel training
+_worker_tokenizer = None
+
+
+def _init_tokenizer_worker(tokenizer_class, component_config):
+    """Creates the tokenizer used by a worker process of the pool."""
+    global _worker_tokenizer
+
+    _worker_tokenizer = tokenizer_class(component_config)
+
+
+def _tokenize_in_worker(text):
+    """Tokenizes a text in a worker process.
+
+    Returns plain tuples which are cheaper to send back to the parent
+    process than `Token` objects."""
+
+    return [(t.text, t.offset) for t in _worker_tokenizer.tokenize(text)]
 
 
 class Tokenizer(object):
-    pass
+
+    def tokenize_training_data(self, training_data, num_threads=1):
+        """Sets the tokens of all training examples.
+
+        If the component is configured with `parallel_training`, the
+        examples are split across a pool of `num_threads` processes.
+        Every process creates its own tokenizer from the configuration
+        of this component, so it uses the same dictionaries. The texts
+        are the base variant of the text normalizer, e.g. with half width
+        characters."""
+
+        examples = training_data.training_examples
+        config = getattr(self, "component_config", None) or {}
+
+        if (not config.get("parallel_training") or num_threads <= 1 or
+                len(examples) < num_threads):
+            for example in examples:
+                example.set("tokens", Tokens(
+                        self.tokenize(example.normalized_text("text"))))
+            return
+
+        from rasa_nlu.utils import process_pool
+
+        logger.info("Tokenizing {} training examples using {} processes"
+                    "".format(len(examples), num_threads))
+        pool = process_pool(num_threads,
+                            _init_tokenizer_worker,
+                            (self.__class__, config))
+        try:
+            chunksize = max(1, len(examples) // (num_threads * 4))
+            tokenized = pool.map(_tokenize_in_worker,
+                                 [e.normalized_text("text")
+                                  for e in examples],
+                                 chunksize)
+        finally:
+            pool.close()
+            pool.join()
+
+        for example, tokens in zip(examples, tokenized):
+            example.set("tokens", Tokens.from_offsets(tokens))
 
 
 class Token(object):
-    def __init__(self, text, offset, data=None):
+    # tokens are created for every word of every message, slots
+    # avoid the overhead of a `__dict__` per token
+    __slots__ = ("text", "offset", "end", "_data", "_owner", "_index")
+
+    def __init__(self, text, offset, data=None, owner=None, index=None):
         self.offset = offset
         self.text = text
         self.end = offset + len(text)
-        self.data = data if data else {}
+        # attributes are only allocated once a value gets set
+        self._data = data if data else None
+        # sequence this token is a view of (see `Tokens`)
+        self._owner = owner
+        self._index = index
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._init_data()
+        return self._data
+
+    def _init_data(self):
+        self._data = {}
+        if self._owner is not None:
+            self._owner._set_token_data(self._index, self._data)
 
     def set(self, prop, info):
-        self.data[prop] = info
+        if self._data is None:
+            self._init_data()
+        self._data[prop] = info
 
     def get(self, prop, default=None):
-        return self.data.get(prop, default)
+        if self._data is None:
+            return default
+        return self._data.get(prop, default)
+
+    def __getstate__(self):
+        return self.text, self.offset, self._data
+
+    def __setstate__(self, state):
+        text, offset, data = state
+        self.__init__(text, offset, data)
+
+    def __repr__(self):
+        return "Token({!r}, {})".format(self.text, self.offset)
+
+
+class Tokens(object):
+    """Compact, read only sequence of the tokens of a single message.
+
+    Texts and offsets are stored in per message arrays instead of one
+    object per token and token attributes are only stored for tokens that
+    have any. Indexing creates `Token` views - values set on them are
+    written back to the sequence."""
+
+    __slots__ = ("texts", "offsets", "_data")
+
+    def __init__(self, tokens=None):
+        tokens = tokens or []
+        self.texts = [t.text for t in tokens]
+        self.offsets = array.array(str("i"), [t.offset for t in tokens])
+        self._data = None
+        for i, t in enumerate(tokens):
+            if t._data:
+                self._set_token_data(i, t._data)
+
+    @classmethod
+    def from_offsets(cls, texts_and_offsets):
+        # type: (List[Tuple[Text, int]]) -> Tokens
+        """Creates the sequence from `(text, offset)` tuples."""
+
+        tokens = cls()
+        tokens.texts = [text for text, _ in texts_and_offsets]
+        tokens.offsets = array.array(str("i"),
+                                     [o for _, o in texts_and_offsets])
+        return tokens
+
+    def _set_token_data(self, index, data):
+        if self._data is None:
+            self._data = [None] * len(self.texts)
+        self._data[index] = data
+
+    def _token(self, index):
+        data = self._data[index] if self._data else None
+        return Token(self.texts[index], self.offsets[index],
+                     data, self, index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._token(i)
+                    for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("token index out of range")
+        return self._token(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._token(i)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __getstate__(self):
+        return self.texts, self.offsets.tolist(), self._data
+
+    def __setstate__(self, state):
+        texts, offsets, data = state
+        self.texts = texts
+        self.offsets = array.array(str("i"), offsets)
+        self._data = data
+
+    def __repr__(self):
+        return "Tokens({})".format(list(self))
@@ -3,97 +3,141 @@ from __future__ import print_function
 from __future__ import division
 from __future__ import absolute_import
 
+import glob
+import hashlib
+import io
+import logging
+import marshal
+import os
+import shutil
+
+import typing
 from typing import Any
 from typing import Dict
 from typing import List
+from typing import Optional
 from typing import Text
+from typing import Tuple
 
 from rasa_nlu.config import RasaNLUModelConfig
-from rasa_nlu.tokenizers import Tokenizer, Token
+from rasa_nlu.tokenizers import Tokenizer, Token, Tokens
 from rasa_nlu.components import Component
 from rasa_nlu.training_data import Message
 from rasa_nlu.training_data import TrainingData
 
-import os
-import glob
-import shutil
+logger = logging.getLogger(__name__)
+
+if typing.TYPE_CHECKING:
+    import jieba
+    from rasa_nlu.model import Metadata
 
 DEFAULT_DICT_FILE_NAME = "jieba_default_dict"
 USER_DICTS_FOLDER_NAME = "jieba_user_dicts/"
 USER_DICT_FILE_NAME = USER_DICTS_FOLDER_NAME + "user_dict.txt"
+DICT_CACHE_FILE_NAME = "jieba_dict_cache.dat"
+
+# increase if the layout of the persisted dictionary cache changes
+DICT_CACHE_VERSION = 1
+
 
 class JiebaTokenizer(Tokenizer, Component):
-    
-    
+
     name = "tokenizer_jieba"
 
     provides = ["tokens"]
 
+    uses = ["normalized_text"]
+
+    concurrent = True
+
     language_list = ["zh"]
 
+    defaults = {
+        # store the prefix dictionary jieba builds from the custom
+        # dictionaries in the model directory, so loading the model does
+        # not need to rebuild it. Models without `default_dict` or
+        # `user_dicts` never store it, jieba caches its default dictionary
+        # on its own
+        "persist_dict_cache": True,
+
+        # tokenize the training data using a pool of `num_threads`
+        # processes, each of them loading the same dictionaries
+        "parallel_training": False
+    }
+
     def __init__(self,
                  component_config=None,  # type: Dict[Text, Any]
-                 tokenizer=None
+                 tokenizer=None  # type: Optional[jieba.Tokenizer]
                  ):
         # type: (...) -> None
-        
+        """Construct a new tokenizer using its own `jieba.Tokenizer`.
+
+        Every instance has its own dictionaries, hence models with different
+        dictionaries do not interfere with each other."""
+
         super(JiebaTokenizer, self).__init__(component_config)
 
+        if tokenizer is None:
+            tokenizer = self.init_jieba(self.component_config)
         self.tokenizer = tokenizer
 
-
     @classmethod
     def create(cls, cfg):
         # type: (RasaNLUModelConfig) -> JiebaTokenizer
 
-        import jieba as tokenizer
-
         component_conf = cfg.for_component(cls.name, cls.defaults)
-        tokenizer = cls.init_jieba(tokenizer, component_conf)
-                        
-        return cls(component_conf, tokenizer)
+        return cls(component_conf)
 
     @classmethod
     def load(cls,
              model_dir=None,  # type: Optional[Text]
              model_metadata=None,  # type: Optional[Metadata]
-             cached_component=None,  # type: Optional[Component]
+             cached_component=None,  # type: Optional[JiebaTokenizer]
              **kwargs  # type: **Any
              ):
         # type: (...) -> JiebaTokenizer
-                
-        import jieba as tokenizer
 
-        component_meta = model_metadata.for_component(cls.name)
-
-        if component_meta.get("default_dict"):
-            path_default_dict = os.path.join(model_dir, component_meta.get("default_dict"))
-            component_meta["default_dict"] = path_default_dict
-        if component_meta.get("user_dicts"):
-            path_user_dicts = os.path.join(model_dir, component_meta.get("user_dicts"))
-            component_meta["user_dicts"] = path_user_dicts
-        tokenizer = cls.init_jieba(tokenizer, component_meta)
+        if cached_component:
+            return cached_component
 
+        component_meta = cls._meta_with_model_paths(
+                model_metadata.for_component(cls.name), model_dir)
+        tokenizer = cls.load_dict_cache(component_meta)
         return cls(component_meta, tokenizer)
 
+    @classmethod
+    def cache_key(cls, model_metadata):
+        # type: (Metadata) -> Optional[Text]
+        """Key based on the content of the configured dictionaries.
+
+        Models using identical dictionaries share one tokenizer."""
+
+        component_meta = cls._meta_with_model_paths(
+                model_metadata.for_component(cls.name),
+                model_metadata.model_dir)
+        default_dict, user_dicts = cls.dictionary_paths(component_meta)
+        fingerprint = cls.dictionary_fingerprint(default_dict, user_dicts)
+
+        return "{}-{}-{}".format(cls.name,
+                                 "custom" if default_dict else "default",
+                                 fingerprint)
+
     @classmethod
     def required_packages(cls):
         # type: () -> List[Text]
         return ["jieba"]
 
-
     def train(self, training_data, config, **kwargs):
         # type: (TrainingData, RasaNLUModelConfig, **Any) -> None
-            
-        for example in training_data.training_examples:
-            example.set("tokens", self.tokenize(example.text))
 
+        self.tokenize_training_data(training_data,
+                                    kwargs.get("num_threads", 1))
 
     def process(self, message, **kwargs):
         # type: (Message, **Any) -> None
 
-        message.set("tokens", self.tokenize(message.text))
-
+        message.set("tokens",
+                    Tokens(self.tokenize(message.normalized_text("text"))))
 
     def tokenize(self, text):
         # type: (Text) -> List[Token]
@@ -102,54 +146,166 @@ class JiebaTokenizer(Tokenizer, Component):
 
         return tokens
 
+    @staticmethod
+    def _meta_with_model_paths(component_meta, model_dir):
+        # type: (Dict[Text, Any], Optional[Text]) -> Dict[Text, Any]
+        """Resolves the dictionaries persisted relative to the model dir."""
 
-    @classmethod
-    def init_jieba(cls, tokenizer, dict_config):
-        
-        if dict_config.get("default_dict"):
-            if os.path.isfile(dict_config.get("default_dict")):
-                path_default_dict = glob.glob("{}".format(dict_config.get("default_dict")))
-                tokenizer = cls.set_default_dict(tokenizer, path_default_dict[0])
-            else:
-                print("Because the path of Jieba Default Dictionary has to be a file, not a directory, \
-                       so Jieba Default Dictionary hasn't been switched.")
-        else:
-            print("No Jieba Default Dictionary found")
+        if model_dir is None:
+            return component_meta
 
-        if dict_config.get("user_dicts"):
-            if os.path.isdir(dict_config.get("user_dicts")):
+        component_meta = component_meta.copy()
+        for key in ["default_dict", "user_dicts", "dict_cache"]:
+            if component_meta.get(key):
+                component_meta[key] = os.path.join(model_dir,
+                                                   component_meta[key])
+        return component_meta
+
+    @staticmethod
+    def dictionary_fingerprint(default_dict, user_dicts):
+        # type: (Optional[Text], List[Text]) -> Text
+        """Hash over the content of all passed dictionary files."""
+
+        fingerprint = hashlib.md5()
+        for path in ([default_dict] if default_dict else []) + user_dicts:
+            with io.open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    fingerprint.update(chunk)
+            # separates the files, so moving lines between
+            # two dictionaries changes the fingerprint
+            fingerprint.update(b"\0")
+        return fingerprint.hexdigest()
+
+    @staticmethod
+    def dictionary_paths(dict_config):
+        # type: (Dict[Text, Any]) -> Tuple[Optional[Text], List[Text]]
+        """Returns the default dictionary and the user dictionary files."""
+
+        default_dict = dict_config.get("default_dict")
+        if default_dict and not os.path.isfile(default_dict):
+            logger.warning("The path of the Jieba Default Dictionary has to "
+                           "be a file, not a directory. Jieba Default "
+                           "Dictionary hasn't been switched.")
+            default_dict = None
+
+        user_dicts = dict_config.get("user_dicts")
+        if user_dicts:
+            if os.path.isdir(user_dicts):
                 parse_pattern = "{}/*"
             else:
                 parse_pattern = "{}"
+            path_user_dicts = sorted(glob.glob(parse_pattern.format(
+                    user_dicts)))
+        else:
+            path_user_dicts = []
+
+        return default_dict, path_user_dicts
 
-            path_user_dicts = glob.glob(parse_pattern.format(dict_config.get("user_dicts")))    
-            tokenizer = cls.set_user_dicts(tokenizer, path_user_dicts)
+    @classmethod
+    def init_jieba(cls, dict_config):
+        # type: (Dict[Text, Any]) -> jieba.Tokenizer
+        """Creates a new `jieba.Tokenizer` with the configured dictionaries."""
+        import jieba
+
+        default_dict, path_user_dicts = cls.dictionary_paths(dict_config)
+
+        tokenizer = jieba.Tokenizer()
+        if default_dict:
+            tokenizer = cls.set_default_dict(tokenizer, default_dict)
         else:
-            print("No Jieba User Dictionary found")
+            logger.debug("No Jieba Default Dictionary found")
 
+        tokenizer = cls.set_user_dicts(tokenizer, path_user_dicts)
+        # build the prefix dictionary now instead of
+        # during the first call to `tokenize`
+        tokenizer.initialize()
+        return tokenizer
+
+    @classmethod
+    def load_dict_cache(cls, dict_config):
+        # type: (Dict[Text, Any]) -> Optional[jieba.Tokenizer]
+        """Creates a tokenizer from a persisted prefix dictionary.
+
+        Returns `None` if there is no cache or it does not match the
+        dictionaries of the model anymore."""
+        import jieba
+
+        cache_file = dict_config.get("dict_cache")
+        if not cache_file or not os.path.isfile(cache_file):
+            return None
+
+        default_dict, path_user_dicts = cls.dictionary_paths(dict_config)
+        try:
+            with io.open(cache_file, "rb") as f:
+                cache = marshal.load(f)
+            payload = cache["payload"]
+            if (cache["version"] != DICT_CACHE_VERSION or
+                    cache["checksum"] != hashlib.md5(payload).hexdigest() or
+                    cache["fingerprint"] != cls.dictionary_fingerprint(
+                        default_dict, path_user_dicts)):
+                logger.warning("Jieba dictionary cache '{}' is invalid, "
+                               "rebuilding the dictionary."
+                               "".format(cache_file))
+                return None
+            freq, total, user_word_tags = marshal.loads(payload)
+        except Exception as e:
+            logger.warning("Failed to read Jieba dictionary cache '{}', "
+                           "rebuilding the dictionary. Error: {}"
+                           "".format(cache_file, e))
+            return None
+
+        tokenizer = jieba.Tokenizer()
+        if default_dict:
+            tokenizer.dictionary = os.path.abspath(default_dict)
+        tokenizer.FREQ = freq
+        tokenizer.total = total
+        tokenizer.user_word_tag_tab = user_word_tags
+        tokenizer.initialized = True
+        logger.debug("Loaded Jieba dictionary from cache "
+                     "'{}'".format(cache_file))
         return tokenizer
 
+    def _persist_dict_cache(self, model_dir, dict_config):
+        # type: (Text, Dict[Text, Any]) -> Text
+        """Stores the prefix dictionary and a checksum in the model dir."""
+
+        self.tokenizer.check_initialized()
+        payload = marshal.dumps((self.tokenizer.FREQ,
+                                 self.tokenizer.total,
+                                 self.tokenizer.user_word_tag_tab))
+        default_dict, path_user_dicts = self.dictionary_paths(
+                self._meta_with_model_paths(dict_config, model_dir))
+        cache = {
+            "version": DICT_CACHE_VERSION,
+            "fingerprint": self.dictionary_fingerprint(default_dict,
+                                                       path_user_dicts),
+            "checksum": hashlib.md5(payload).hexdigest(),
+            "payload": payload
+        }
+        with io.open(os.path.join(model_dir, DICT_CACHE_FILE_NAME), "wb") as f:
+            marshal.dump(cache, f)
+        return DICT_CACHE_FILE_NAME
 
     @staticmethod
     def set_default_dict(tokenizer, path_default_dict):
-        print("Setting Jieba Default Dictionary at " + str(path_default_dict))
+        logger.info("Setting Jieba Default Dictionary at "
+                    "{}".format(path_default_dict))
         tokenizer.set_dictionary(path_default_dict)
-        
-        return tokenizer
 
+        return tokenizer
 
     @staticmethod
     def set_user_dicts(tokenizer, path_user_dicts):
         if len(path_user_dicts) > 0:
             for path_user_dict in path_user_dicts:
-                print("Loading Jieba User Dictionary at " + str(path_user_dict))
+                logger.info("Loading Jieba User Dictionary at "
+                            "{}".format(path_user_dict))
                 tokenizer.load_userdict(path_user_dict)
         else:
-            print("No Jieba User Dictionary found")
+            logger.debug("No Jieba User Dictionary found")
 
         return tokenizer
 
-
     def persist(self, model_dir):
         # type: (Text) -> Dict[Text, Any]
         return_dict = {}
@@ -159,7 +315,7 @@ class JiebaTokenizer(Tokenizer, Component):
             if os.path.isfile(self.component_config.get("default_dict")):
                 shutil.copy2(self.component_config.get("default_dict"), des_path_default_dict)
                 return_dict.update({"default_dict": DEFAULT_DICT_FILE_NAME})
-        
+
         if self.component_config.get("user_dicts"):
             des_path_user_dicts = os.path.join(model_dir, USER_DICTS_FOLDER_NAME)
             os.mkdir(des_path_user_dicts)
@@ -173,5 +329,9 @@ class JiebaTokenizer(Tokenizer, Component):
                 des_path_user_dict = os.path.join(model_dir, USER_DICT_FILE_NAME)
                 shutil.copy2(self.component_config.get("user_dicts"), des_path_user_dict)
                 return_dict.update({"user_dicts":  USER_DICT_FILE_NAME})
-        
+
+        if self.component_config.get("persist_dict_cache") and return_dict:
+            return_dict["dict_cache"] = self._persist_dict_cache(model_dir,
+                                                                 return_dict)
+
         return return_dict
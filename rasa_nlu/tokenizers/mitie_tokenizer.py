@@ -14,6 +14,7 @@ from typing import Tuple
 from rasa_nlu.config import RasaNLUModelConfig
 from rasa_nlu.tokenizers import Token
 from rasa_nlu.tokenizers import Tokenizer
+from rasa_nlu.tokenizers import Tokens
 from rasa_nlu.components import Component
 from rasa_nlu.training_data import Message
 from rasa_nlu.training_data import TrainingData
@@ -24,6 +25,16 @@ class MitieTokenizer(Tokenizer, Component):
 
     provides = ["tokens"]
 
+    uses = ["normalized_text"]
+
+    concurrent = True
+
+    defaults = {
+        # tokenize the training data using a pool of `num_threads`
+        # processes
+        "parallel_training": False
+    }
+
     @classmethod
     def required_packages(cls):
         # type: () -> List[Text]
@@ -32,13 +43,14 @@ class MitieTokenizer(Tokenizer, Component):
     def train(self, training_data, config, **kwargs):
         # type: (TrainingData, RasaNLUModelConfig, **Any) -> None
 
-        for example in training_data.training_examples:
-            example.set("tokens", self.tokenize(example.text))
+        self.tokenize_training_data(training_data,
+                                    kwargs.get("num_threads", 1))
 
     def process(self, message, **kwargs):
         # type: (Message, **Any) -> None
 
-        message.set("tokens", self.tokenize(message.text))
+        message.set("tokens",
+                    Tokens(self.tokenize(message.normalized_text("text"))))
 
     def _token_from_offset(self, text, offset, encoded_sentence):
         return Token(text.decode('utf-8'),
@@ -8,7 +8,7 @@ from typing import Any, List
 
 from rasa_nlu.components import Component
 from rasa_nlu.config import RasaNLUModelConfig
-from rasa_nlu.tokenizers import Tokenizer, Token
+from rasa_nlu.tokenizers import Tokenizer, Token, Tokens
 from rasa_nlu.training_data import Message
 from rasa_nlu.training_data import TrainingData
 
@@ -21,16 +21,22 @@ class SpacyTokenizer(Tokenizer, Component):
 
     provides = ["tokens"]
 
+    uses = ["spacy_doc"]
+
+    concurrent = True
+
     def train(self, training_data, config, **kwargs):
         # type: (TrainingData, RasaNLUModelConfig, **Any) -> None
 
         for example in training_data.training_examples:
-            example.set("tokens", self.tokenize(example.get("spacy_doc")))
+            example.set("tokens",
+                        Tokens(self.tokenize(example.get("spacy_doc"))))
 
     def process(self, message, **kwargs):
         # type: (Message, **Any) -> None
 
-        message.set("tokens", self.tokenize(message.get("spacy_doc")))
+        message.set("tokens",
+                    Tokens(self.tokenize(message.get("spacy_doc"))))
 
     def tokenize(self, doc):
         # type: (Doc) -> List[Token]
@@ -7,7 +7,7 @@ from typing import Any, List, Text
 
 from rasa_nlu.components import Component
 from rasa_nlu.config import RasaNLUModelConfig
-from rasa_nlu.tokenizers import Tokenizer, Token
+from rasa_nlu.tokenizers import Tokenizer, Token, Tokens
 from rasa_nlu.training_data import Message
 from rasa_nlu.training_data import TrainingData
 
@@ -17,16 +17,27 @@ class WhitespaceTokenizer(Tokenizer, Component):
 
     provides = ["tokens"]
 
+    uses = ["normalized_text"]
+
+    concurrent = True
+
+    defaults = {
+        # tokenize the training data using a pool of `num_threads`
+        # processes
+        "parallel_training": False
+    }
+
     def train(self, training_data, config, **kwargs):
         # type: (TrainingData, RasaNLUModelConfig, **Any) -> None
 
-        for example in training_data.training_examples:
-            example.set("tokens", self.tokenize(example.text))
+        self.tokenize_training_data(training_data,
+                                    kwargs.get("num_threads", 1))
 
     def process(self, message, **kwargs):
         # type: (Message, **Any) -> None
 
-        message.set("tokens", self.tokenize(message.text))
+        message.set("tokens",
+                    Tokens(self.tokenize(message.normalized_text("text"))))
 
     def tokenize(self, text):
         # type: (Text) -> List[Token]
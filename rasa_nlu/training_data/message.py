@@ -9,15 +9,26 @@ from rasa_nlu.utils import ordered
 
 
 class Message(object):
+    # training keeps a message per example alive, slots avoid the
+    # overhead of a `__dict__` per message
+    __slots__ = ("text", "time", "data", "_output_properties")
+
     def __init__(self, text, data=None, output_properties=None, time=None):
         self.text = text
         self.time = time
         self.data = data if data else {}
+        # only created once a property is added to the output
+        self._output_properties = output_properties or None
 
-        if output_properties:
-            self.output_properties = output_properties
-        else:
-            self.output_properties = set()
+    @property
+    def output_properties(self):
+        if self._output_properties is None:
+            self._output_properties = set()
+        return self._output_properties
+
+    @output_properties.setter
+    def output_properties(self, value):
+        self._output_properties = value
 
     def set(self, prop, info, add_to_output=False):
         self.data[prop] = info
@@ -27,11 +38,33 @@ class Message(object):
     def get(self, prop, default=None):
         return self.data.get(prop, default)
 
+    def normalized_text(self, variant):
+        """The text in a variant of the text normalizer, e.g. `lowercase`.
+
+        Reuses the variants of the `text_normalizer` of the pipeline and
+        adds missing ones to them. Without a normalizer the variant is
+        computed from the text on every call."""
+        from rasa_nlu.utils.text_normalizer import (
+            NORMALIZED_TEXT, BASE_VARIANT, normalize)
+
+        variants = self.data.get(NORMALIZED_TEXT)
+        if variants is None:
+            return normalize(self.text, variant)
+
+        text = variants.get(variant)
+        if text is None:
+            # the variants only depend on the text, components computing
+            # the same variant concurrently store identical values
+            text = variants[variant] = normalize(variants[BASE_VARIANT],
+                                                 variant)
+        return text
+
     def as_dict(self, only_output_properties=False):
         if only_output_properties:
+            output_properties = self._output_properties or set()
             d = {key: value
                  for key, value in self.data.items()
-                 if key in self.output_properties}
+                 if key in output_properties}
         else:
             d = self.data
         return dict(d, text=self.text)
@@ -46,6 +79,12 @@ class Message(object):
     def __hash__(self):
         return hash((self.text, str(ordered(self.data))))
 
+    def __getstate__(self):
+        return self.text, self.time, self.data, self._output_properties
+
+    def __setstate__(self, state):
+        self.text, self.time, self.data, self._output_properties = state
+
     @classmethod
     def build(cls, text, intent=None, entities=None):
         data = {}
@@ -11,13 +11,18 @@ import logging
 import os
 import re
 import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 
 import simplejson
 import six
-from builtins import str
+from builtins import str, object
 import yaml
 from future.utils import PY3
 from typing import List, Any
+from typing import Dict
 from typing import Optional
 from typing import Text
 
@@ -142,6 +147,244 @@ def lazyproperty(fn):
     return _lazyprop
 
 
+class LRUCache(object):
+    """Thread safe, size bounded cache evicting least recently used entries.
+
+    Keeps count of hits and misses, so callers can report how effective
+    the cache is. A `max_size` of `0` disables caching."""
+
+    def __init__(self, max_size):
+        # type: (int) -> None
+
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._store = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._store:
+                # re-insert to mark the entry as most recently used
+                value = self._store.pop(key)
+                self._store[key] = value
+                self.hits += 1
+                return value
+            else:
+                self.misses += 1
+                return default
+
+    def put(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if key in self._store:
+                self._store.pop(key)
+            elif len(self._store) >= self.max_size:
+                self._store.popitem(last=False)
+            self._store[key] = value
+
+    def get_or_compute(self, key, compute):
+        """Returns the cached value or caches the result of `compute(key)`."""
+
+        if self.max_size <= 0:
+            # disabled, neither take the lock nor count misses
+            return compute(key)
+
+        value = self.get(key)
+        if value is None:
+            value = compute(key)
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._store.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def hit_rate(self):
+        # type: () -> float
+        total = self.hits + self.misses
+        return float(self.hits) / total if total else 0.0
+
+    def stats(self):
+        # type: () -> Dict[Text, Any]
+        """Hits, misses and size of the cache."""
+
+        with self._lock:
+            return {"hits": self.hits,
+                    "misses": self.misses,
+                    "hit_rate": self.hit_rate,
+                    "size": len(self._store),
+                    "max_size": self.max_size}
+
+    def __len__(self):
+        return len(self._store)
+
+    def __contains__(self, key):
+        return key in self._store
+
+
+class ReadWriteLock(object):
+    """Lock held by many readers or a single writer.
+
+    Waiting writers take precedence over new readers, so a steady stream
+    of readers can not starve a writer."""
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def reading(self):
+        with self._condition:
+            while self._writing or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def writing(self):
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class CircuitBreaker(object):
+    """Thread safe circuit breaker for calls to a remote service.
+
+    After `max_failures` consecutive failures the circuit opens and calls
+    are skipped for `reset_timeout` seconds. Afterwards a single call is
+    let through: its success closes the circuit again, a failure opens it
+    for another `reset_timeout` seconds. A `max_failures` of `0` disables
+    the breaker."""
+
+    def __init__(self, max_failures, reset_timeout):
+        # type: (int, float) -> None
+
+        self.max_failures = max_failures
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        # number of calls skipped while the circuit was open
+        self.skipped = 0
+        self._opened_at = None  # type: Optional[float]
+        self._lock = threading.Lock()
+
+    def allow(self):
+        # type: () -> bool
+        """Whether the next call should be made."""
+
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.time() - self._opened_at >= self.reset_timeout:
+                # let a trial call through, further calls are skipped
+                # until it reports its result
+                self._opened_at = time.time()
+                return True
+            self.skipped += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if 0 < self.max_failures <= self.failures:
+                self._opened_at = time.time()
+
+    @property
+    def is_open(self):
+        # type: () -> bool
+        return self._opened_at is not None
+
+
+def process_pool(processes, initializer=None, initargs=()):
+    """Pool of worker processes started as new interpreters.
+
+    Forked workers inherit the locks other threads of the process (e.g. of
+    the server or of logging) hold at the time of the fork, and can
+    deadlock on them. Python 2 can only fork."""
+    import multiprocessing
+
+    if hasattr(multiprocessing, "get_context"):
+        multiprocessing = multiprocessing.get_context("spawn")
+    return multiprocessing.Pool(processes, initializer, initargs)
+
+
+def prefetch(iterable, buffer_size=2):
+    """Iterates over `iterable`, producing its items in a background thread.
+
+    Up to `buffer_size` items are produced ahead, e.g. to create the next
+    training batches while the current one is processed. Exceptions of the
+    producer are raised to the consumer. The producer stops once the
+    returned generator gets closed."""
+    from six.moves import queue
+
+    if buffer_size <= 0:
+        for item in iterable:
+            yield item
+        return
+
+    items = queue.Queue(buffer_size)
+    stop = threading.Event()
+    end_marker = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+            put((end_marker, None))
+        except Exception as e:
+            put((end_marker, e))
+
+    producer = threading.Thread(target=produce)
+    producer.daemon = True
+    producer.start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is end_marker:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
+
 def list_to_str(l, delim=", ", quote="'"):
     return delim.join([quote + e + quote for e in l])
 
@@ -346,3 +589,20 @@ def create_temporary_file(data, suffix=""):
 
     f.close()
     return f.name
+
+
+def process_thread_count():
+    # type: () -> int
+    """Number of threads of this process.
+
+    Includes the threads of native libraries (e.g. tensorflow thread pools)
+    on linux, other platforms only report python threads."""
+
+    try:
+        with io.open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Threads:"):
+                    return int(line.split()[1])
+    except (IOError, OSError, ValueError):
+        pass
+    return threading.active_count()
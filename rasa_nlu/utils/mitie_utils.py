@@ -16,6 +16,7 @@ from typing import Text
 from rasa_nlu.components import Component
 from rasa_nlu.config import RasaNLUModelConfig
 from rasa_nlu.model import Metadata
+from rasa_nlu.utils import LRUCache
 
 if typing.TYPE_CHECKING:
     import mitie
@@ -24,12 +25,20 @@ if typing.TYPE_CHECKING:
 class MitieNLP(Component):
     name = "nlp_mitie"
 
-    provides = ["mitie_feature_extractor", "mitie_file"]
+    provides = ["mitie_feature_extractor", "mitie_file",
+                "mitie_word_vector_cache"]
+
+    concurrent = True
 
     defaults = {
         # name of the language model to load - this contains
         # the MITIE feature extractor
         "model": os.path.join("data", "total_word_feature_extractor.dat"),
+
+        # number of word vectors to keep in memory. the cache is shared
+        # by all models using the same language model file, set to `0`
+        # to disable caching
+        "word_vector_cache_size": 10000,
     }
 
     def __init__(self,
@@ -42,6 +51,10 @@ class MitieNLP(Component):
         super(MitieNLP, self).__init__(component_config)
 
         self.extractor = extractor
+        cache_size = self.component_config.get("word_vector_cache_size", 0)
+        # without a cache the featurizer asks the extractor directly
+        self.word_vector_cache = (LRUCache(cache_size) if cache_size > 0
+                                  else None)
 
     @classmethod
     def required_packages(cls):
@@ -83,7 +96,22 @@ class MitieNLP(Component):
         # type: () -> Dict[Text, Any]
 
         return {"mitie_feature_extractor": self.extractor,
-                "mitie_file": self.component_config.get("model")}
+                "mitie_file": self.component_config.get("model"),
+                "mitie_word_vector_cache": self.word_vector_cache}
+
+    def resource_usage(self):
+        # type: () -> Optional[Dict[Text, Any]]
+        """Memory and effectiveness of the word vector cache, shared by all
+        models using the same language model."""
+
+        if self.word_vector_cache is None:
+            return None
+
+        stats = self.word_vector_cache.stats()
+        # the cached vectors are float64 arrays
+        memory = (stats["size"] * self.extractor.num_dimensions * 8
+                  if self.extractor is not None else 0)
+        return {"memory": memory, "word_vector_cache": stats}
 
     @staticmethod
     def ensure_proper_language_model(extractor):
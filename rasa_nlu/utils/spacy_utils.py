@@ -23,12 +23,45 @@ if typing.TYPE_CHECKING:
     from spacy.language import Language
     from rasa_nlu.model import Metadata
 
+# spacy pipes the built-in components rely on, `[]` if a component does
+# not use spacy at all. Pipes are only disabled if every component of the
+# pipeline is listed here, any other (e.g. a custom) component might need
+# all of them. A built-in component using spacy must be added here.
+SPACY_PIPES_USED_BY_COMPONENT = {
+    "nlp_spacy": [],
+    "tokenizer_spacy": [],
+    "intent_featurizer_spacy": ["tensorizer", "tagger"],
+    "intent_featurizer_ngrams": ["tensorizer"],
+    "intent_featurizer_count_vectors": ["tagger"],
+    "ner_crf": ["tagger"],
+    "ner_spacy": ["ner"],
+    "text_normalizer": [],
+    "tokenizer_whitespace": [],
+    "tokenizer_jieba": [],
+    "tokenizer_mitie": [],
+    "nlp_mitie": [],
+    "intent_featurizer_mitie": [],
+    "intent_entity_featurizer_regex": [],
+    "intent_classifier_keyword": [],
+    "intent_classifier_mitie": [],
+    "intent_classifier_sklearn": [],
+    "intent_classifier_tensorflow_embedding": [],
+    "ner_mitie": [],
+    "ner_synonyms": [],
+    "ner_duckling": [],
+    "ner_duckling_http": [],
+}
+
 
 class SpacyNLP(Component):
     name = "nlp_spacy"
 
     provides = ["spacy_doc", "spacy_nlp"]
 
+    uses = ["normalized_text"]
+
+    concurrent = True
+
     defaults = {
         # name of the language model to load - if it is not set
         # we will be looking for a language model that is named
@@ -41,6 +74,14 @@ class SpacyNLP(Component):
         # applications and models it makes sense to differentiate
         # between these two words, therefore setting this to `True`.
         "case_sensitive": False,
+
+        # number of texts spacy processes at once when
+        # preprocessing the training data
+        "batch_size": 256,
+
+        # number of processes used to preprocess the training data,
+        # if not set the `num_threads` of the training is used
+        "num_processes": None,
     }
 
     def __init__(self, component_config=None, nlp=None):
@@ -92,21 +133,88 @@ class SpacyNLP(Component):
         return {"spacy_nlp": self.nlp}
 
     def doc_for_text(self, text):
+        return self.nlp(self._text_for_doc(text))
+
+    def _text_for_doc(self, text):
         if self.component_config.get("case_sensitive"):
-            return self.nlp(text)
+            return text
+        else:
+            return text.lower()
+
+    def _message_text_for_doc(self, message):
+        # type: (Message) -> Text
+
+        if self.component_config.get("case_sensitive"):
+            return message.normalized_text("text")
+        else:
+            return message.normalized_text("lowercase")
+
+    @staticmethod
+    def pipes_to_disable(pipe_names, component_names):
+        # type: (List[Text], List[Text]) -> List[Text]
+        """Names of the spacy pipes no component of the pipeline needs."""
+
+        required = set()
+        for name in component_names:
+            if name not in SPACY_PIPES_USED_BY_COMPONENT:
+                # might use any of the pipes
+                return []
+            required.update(SPACY_PIPES_USED_BY_COMPONENT[name])
+        return [p for p in pipe_names if p not in required]
+
+    @staticmethod
+    def _parallel_pipe_kwargs(num_processes):
+        # type: (int) -> Dict[Text, Any]
+        import spacy
+        from packaging import version
+
+        # spacy replaced the (no-op) thread count with
+        # multiprocessing in version 2.2.2
+        if (version.parse(spacy.about.__version__) >=
+                version.parse("2.2.2")):
+            return {"n_process": num_processes}
         else:
-            return self.nlp(text.lower())
+            return {"n_threads": num_processes}
+
+    def docs_for_texts(self, texts, disable=None, num_processes=1):
+        # type: (List[Text], Optional[List[Text]], int) -> List[Any]
+        """Process multiple texts in batches using `nlp.pipe`."""
+
+        return self._pipe([self._text_for_doc(t) for t in texts],
+                          disable, num_processes)
+
+    def _pipe(self, texts, disable=None, num_processes=1):
+        # type: (List[Text], Optional[List[Text]], int) -> List[Any]
+
+        kwargs = self._parallel_pipe_kwargs(num_processes)
+        return list(self.nlp.pipe(
+                texts,
+                batch_size=self.component_config.get("batch_size", 256),
+                disable=disable or [],
+                **kwargs))
 
     def train(self, training_data, config, **kwargs):
         # type: (TrainingData, RasaNLUModelConfig, **Any) -> None
 
-        for example in training_data.training_examples:
-            example.set("spacy_doc", self.doc_for_text(example.text))
+        examples = training_data.training_examples
+        num_processes = (self.component_config.get("num_processes") or
+                         kwargs.get("num_threads", 1))
+        disabled = self.pipes_to_disable(self.nlp.pipe_names,
+                                         config.component_names)
+        if disabled:
+            logger.debug("Disabled spacy pipes during training: {}"
+                         "".format(", ".join(disabled)))
+
+        docs = self._pipe([self._message_text_for_doc(e) for e in examples],
+                          disabled, num_processes)
+        for example, doc in zip(examples, docs):
+            example.set("spacy_doc", doc)
 
     def process(self, message, **kwargs):
         # type: (Message, **Any) -> None
 
-        message.set("spacy_doc", self.doc_for_text(message.text))
+        message.set("spacy_doc",
+                    self.nlp(self._message_text_for_doc(message)))
 
     @classmethod
     def load(cls,
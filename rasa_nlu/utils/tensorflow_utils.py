@@ -0,0 +1,186 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+import threading
+import weakref
+
+import typing
+from builtins import object
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Text
+from typing import Tuple
+
+from rasa_nlu.utils import ReadWriteLock
+
+logger = logging.getLogger(__name__)
+
+if typing.TYPE_CHECKING:
+    import tensorflow as tf
+
+
+def session_config(intra_op_parallelism_threads=0,
+                   inter_op_parallelism_threads=0):
+    # type: (int, int) -> tf.ConfigProto
+    """Session configuration limiting the tensorflow thread pools.
+
+    `0` lets tensorflow pick the number of threads (one per core)."""
+    import tensorflow as tf
+
+    return tf.ConfigProto(
+            intra_op_parallelism_threads=intra_op_parallelism_threads,
+            inter_op_parallelism_threads=inter_op_parallelism_threads,
+            allow_soft_placement=True)
+
+
+def variables_memory(graph, scope=None):
+    # type: (tf.Graph, Optional[Text]) -> int
+    """Bytes used by the variables of a graph (or a scope of it)."""
+    import tensorflow as tf
+
+    variables = graph.get_collection(tf.GraphKeys.GLOBAL_VARIABLES, scope)
+    return sum(v.dtype.base_dtype.size * v.shape.num_elements()
+               for v in variables)
+
+
+class SharedSession(object):
+    """A session and its graph, holding the graphs of several models.
+
+    Changing a graph while it runs is not safe in tensorflow, hence graphs
+    are imported while holding the write lock and runs hold the read
+    lock."""
+
+    def __init__(self, name, graph, session, thread_config):
+        # type: (Text, tf.Graph, tf.Session, Tuple[int, int]) -> None
+
+        self.name = name
+        self.graph = graph
+        self.session = session
+        self.thread_config = thread_config
+        # scopes of the models imported into the graph
+        self.scopes = []  # type: List[Text]
+        self.lock = ReadWriteLock()
+
+    def run(self, fetches, feed_dict=None):
+        """Runs the session, concurrently to other runs but not to
+        imports into the graph."""
+
+        with self.lock.reading():
+            return self.session.run(fetches, feed_dict=feed_dict)
+
+    def as_dict(self):
+        # type: () -> Dict[Text, Any]
+
+        intra_op, inter_op = self.thread_config
+        return {"name": self.name,
+                "num_models": len(self.scopes),
+                "intra_op_parallelism_threads": intra_op,
+                "inter_op_parallelism_threads": inter_op}
+
+
+class SessionManager(object):
+    """Process wide, bounded set of tensorflow sessions shared by models.
+
+    Creating a session per loaded model creates thread pools and memory
+    overhead per model. Instead, the graph of a model gets imported
+    under its own name scope into one of at most `max_sessions` shared
+    sessions with the same thread configuration.
+
+    Tensorflow can not remove nodes from a graph. The scope of a model is
+    released once the model is garbage collected, and a session is closed
+    (freeing its graph and variables) when all its models are released.
+    Until then, the graph keeps the nodes of released scopes."""
+
+    def __init__(self):
+        # sessions grouped by their thread configuration
+        self._sessions = {}  # type: Dict[Tuple[int, int], List[SharedSession]]
+        self._lock = threading.Lock()
+        self._num_loaded = 0
+        # references of the models using a scope, see `release_with`
+        self._owners = set()
+        # scopes of collected models, released with the next use of the
+        # manager as garbage collection might run while holding the lock
+        self._released = []  # type: List[Tuple[SharedSession, Text]]
+
+    def _session_for(self, thread_config, max_sessions):
+        # type: (Tuple[int, int], int) -> SharedSession
+        """Creates a new session or returns the least used one."""
+        import tensorflow as tf
+
+        sessions = self._sessions.setdefault(thread_config, [])
+        if len(sessions) < max(1, max_sessions):
+            graph = tf.Graph()
+            with graph.as_default():
+                session = tf.Session(config=session_config(*thread_config))
+            name = "shared_session_{}_{}".format(
+                    "_".join(str(t) for t in thread_config), len(sessions))
+            sessions.append(SharedSession(name, graph, session,
+                                          thread_config))
+            logger.debug("Created tensorflow session '{}'".format(name))
+        return min(sessions, key=lambda s: len(s.scopes))
+
+    def load_checkpoint(self,
+                        checkpoint,  # type: Text
+                        thread_config=(0, 0),  # type: Tuple[int, int]
+                        max_sessions=1  # type: int
+                        ):
+        # type: (...) -> Tuple[SharedSession, Text]
+        """Imports a checkpoint into a shared session.
+
+        Returns the session and the name scope of the imported graph."""
+        import tensorflow as tf
+
+        with self._lock:
+            self._release_collected()
+            shared = self._session_for(tuple(thread_config), max_sessions)
+            self._num_loaded += 1
+            scope = "model_{}".format(self._num_loaded)
+            with shared.lock.writing(), shared.graph.as_default():
+                saver = tf.train.import_meta_graph(checkpoint + '.meta',
+                                                   import_scope=scope)
+                saver.restore(shared.session, checkpoint)
+            shared.scopes.append(scope)
+
+        logger.info("Loaded '{}' into tensorflow session '{}'"
+                    "".format(checkpoint, shared.name))
+        return shared, scope
+
+    def release_with(self, owner, shared, scope):
+        # type: (Any, SharedSession, Text) -> None
+        """Releases the scope once `owner`, the model using it, is garbage
+        collected."""
+
+        def collected(reference):
+            self._owners.discard(reference)
+            self._released.append((shared, scope))
+
+        self._owners.add(weakref.ref(owner, collected))
+
+    def _release_collected(self):
+        while self._released:
+            shared, scope = self._released.pop()
+            shared.scopes.remove(scope)
+            if not shared.scopes:
+                with shared.lock.writing():
+                    shared.session.close()
+                self._sessions[shared.thread_config].remove(shared)
+                logger.debug("Closed tensorflow session '{}', all its "
+                             "models are unloaded".format(shared.name))
+
+    def as_dict(self):
+        # type: () -> List[Dict[Text, Any]]
+
+        with self._lock:
+            self._release_collected()
+            return [s.as_dict()
+                    for sessions in self._sessions.values()
+                    for s in sessions]
+
+
+# sessions shared by all models loaded in this process
+session_manager = SessionManager()
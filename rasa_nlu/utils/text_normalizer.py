@@ -0,0 +1,127 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import re
+
+from builtins import range
+from typing import Any
+from typing import Dict
+from typing import Text
+
+from rasa_nlu.components import Component
+from rasa_nlu.config import RasaNLUModelConfig
+from rasa_nlu.training_data import Message
+from rasa_nlu.training_data import TrainingData
+
+# message attribute holding the computed variants of the text
+NORMALIZED_TEXT = "normalized_text"
+
+# the variant every other variant is computed from: the text itself,
+# converted to half width characters if configured
+BASE_VARIANT = "text"
+
+# full width forms of the printable ascii characters and the ideographic
+# space, as typed by chinese and japanese input methods
+_HALFWIDTH_TABLE = {c: c - 0xfee0 for c in range(0xff01, 0xff5f)}
+_HALFWIDTH_TABLE[0x3000] = 0x20
+
+NUMBER_PATTERN = re.compile(r'\b[0-9]+\b', re.UNICODE)
+
+
+def to_halfwidth(text):
+    # type: (Text) -> Text
+    """Replaces full width characters by their half width forms, keeps
+    the length and hence all offsets of the text."""
+
+    return text.translate(_HALFWIDTH_TABLE)
+
+
+def replace_numbers(text):
+    # type: (Text) -> Text
+    """Replaces every number, e.g. 123 but not ab12d, by `NUMBER`."""
+
+    return NUMBER_PATTERN.sub("NUMBER", text)
+
+
+# functions computing a variant from the base variant of the text
+VARIANTS = {
+    "lowercase": lambda text: text.lower(),
+    "numbers": replace_numbers,
+    "lowercase_numbers": lambda text: replace_numbers(text.lower()),
+}
+
+
+def normalize(text, variant):
+    # type: (Text, Text) -> Text
+    """Computes a variant of an already normalized base text."""
+
+    if variant == BASE_VARIANT:
+        return text
+    elif variant in VARIANTS:
+        return VARIANTS[variant](text)
+    else:
+        raise ValueError("Unknown text variant '{}', use one of {}."
+                         "".format(variant,
+                                   [BASE_VARIANT] + sorted(VARIANTS)))
+
+
+class TextNormalizer(Component):
+    """Computes normalized variants of the text once per message.
+
+    Components ask the message for a variant, e.g.
+    `message.normalized_text("lowercase")`, instead of deriving it on
+    their own. Variants not configured here are computed on the first
+    request and shared with later components as well. Converting full
+    width to half width characters applies to all variants, hence to all
+    components reading them."""
+
+    name = "text_normalizer"
+
+    provides = [NORMALIZED_TEXT]
+
+    concurrent = True
+
+    defaults = {
+        # convert full width letters, digits and punctuation to their
+        # half width forms, e.g. "ｈｉ！" to "hi!"
+        "halfwidth": False,
+
+        # variants computed for every message: "lowercase", "numbers"
+        # (every number replaced by `NUMBER`) or "lowercase_numbers"
+        "variants": ["lowercase"]
+    }
+
+    def __init__(self, component_config=None):
+        # type: (Dict[Text, Any]) -> None
+
+        super(TextNormalizer, self).__init__(component_config)
+
+        for variant in self.component_config["variants"] or []:
+            if variant not in VARIANTS:
+                raise ValueError("Unknown text variant '{}' of the text "
+                                 "normalizer, use one of {}."
+                                 "".format(variant, sorted(VARIANTS)))
+
+    def normalized_texts(self, text):
+        # type: (Text) -> Dict[Text, Text]
+        """The base variant and all configured variants of the text."""
+
+        if self.component_config["halfwidth"]:
+            text = to_halfwidth(text)
+        variants = {BASE_VARIANT: text}
+        for variant in self.component_config["variants"] or []:
+            variants[variant] = VARIANTS[variant](text)
+        return variants
+
+    def train(self, training_data, config, **kwargs):
+        # type: (TrainingData, RasaNLUModelConfig, **Any) -> None
+
+        for example in training_data.training_examples:
+            self.process(example)
+
+    def process(self, message, **kwargs):
+        # type: (Message, **Any) -> None
+
+        message.set(NORMALIZED_TEXT, self.normalized_texts(message.text))
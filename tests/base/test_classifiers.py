@@ -0,0 +1,469 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import sys
+
+import numpy as np
+import pytest
+
+from rasa_nlu.training_data import Message
+from rasa_nlu.training_data import TrainingData
+
+
+def featurized_training_data(num_intents=4, examples_per_intent=20):
+    rs = np.random.RandomState(42)
+    centers = rs.normal(size=(num_intents, 8)) * 3
+    if isinstance(examples_per_intent, int):
+        examples_per_intent = [examples_per_intent] * num_intents
+    examples = []
+    for i, center in enumerate(centers):
+        for _ in range(examples_per_intent[i]):
+            m = Message("example of intent {}".format(i),
+                        {"intent": "intent_{}".format(i)})
+            m.set("text_features", center + rs.normal(size=8))
+            examples.append(m)
+    return TrainingData(examples), centers
+
+
+@pytest.mark.parametrize("component_config, examples_per_intent", [
+    ({}, [20] * 4),
+    ({"classifier": "linear_svc"}, [20] * 4),
+    ({"classifier": "logistic_regression", "search": "randomized",
+      "search_iterations": 2}, [20] * 4),
+    ({"classifier": "sgd", "search_time_budget": 0.01}, [20] * 4),
+    ({"classifier": "logistic_regression", "search": "halving"}, [20] * 4),
+    # an intent with a single example can not be calibrated
+    ({"classifier": "linear_svc"}, [20, 20, 20, 1]),
+    ({"classifier": "linear_svc", "numpy_inference": False},
+     [20, 20, 20, 1]),
+    ({"classifier": "linear_svc"}, [20, 1]),
+    ({}, [20, 20, 20, 1]),
+])
+def test_sklearn_intent_classifier(component_config, examples_per_intent):
+    from rasa_nlu.classifiers.sklearn_intent_classifier import \
+        SklearnIntentClassifier
+
+    td, centers = featurized_training_data(len(examples_per_intent),
+                                           examples_per_intent)
+    clf = SklearnIntentClassifier(component_config)
+    clf.train(td, None)
+
+    for i, center in enumerate(centers):
+        message = Message("test")
+        message.set("text_features", center)
+        clf.process(message)
+
+        assert message.get("intent")["name"] == "intent_{}".format(i)
+        ranking = message.get("intent_ranking")
+        assert len(ranking) == len(centers)
+        assert ranking[0]["name"] == message.get("intent")["name"]
+        assert np.isclose(sum(r["confidence"] for r in ranking), 1.0)
+
+
+@pytest.mark.parametrize("component_config, examples_per_intent", [
+    ({"classifier": "linear_svc"}, [20] * 4),
+    ({"classifier": "logistic_regression"}, [20] * 4),
+    ({"classifier": "sgd"}, [20] * 4),
+    # uncalibrated linear svm
+    ({"classifier": "linear_svc"}, [20, 20, 20, 1]),
+])
+def test_sklearn_numpy_inference_matches_sklearn(component_config,
+                                                 examples_per_intent, tmpdir):
+    from rasa_nlu.classifiers.sklearn_intent_classifier import \
+        SklearnIntentClassifier
+    from rasa_nlu.model import Metadata
+
+    td, centers = featurized_training_data(len(examples_per_intent),
+                                           examples_per_intent)
+    clf = SklearnIntentClassifier(component_config)
+    clf.train(td, None)
+    assert clf.scorer is not None
+
+    component_meta = clf.component_config.copy()
+    component_meta.update(clf.persist(tmpdir.strpath))
+    component_meta["name"] = clf.name
+    loaded = SklearnIntentClassifier.load(
+            tmpdir.strpath, Metadata({"pipeline": [component_meta]}, None))
+    # the numpy scorer is used without unpickling the classifier
+    assert loaded.clf is None
+
+    for features in np.random.RandomState(0).normal(size=(10, 8)) * 3:
+        expected, actual = Message("test"), Message("test")
+        expected.set("text_features", features)
+        actual.set("text_features", features)
+        clf.scorer = None
+        clf.process(expected)
+        loaded.process(actual)
+
+        assert actual.get("intent")["name"] == expected.get("intent")["name"]
+        assert np.isclose(actual.get("intent")["confidence"],
+                          expected.get("intent")["confidence"])
+        assert ([r["name"] for r in actual.get("intent_ranking")] ==
+                [r["name"] for r in expected.get("intent_ranking")])
+
+
+def test_top_k():
+    from rasa_nlu.classifiers import top_k
+
+    scores = np.array([0.1, 0.4, 0.05, 0.3, 0.15])
+
+    assert list(top_k(scores, 2)) == [1, 3]
+    assert list(top_k(scores, 10)) == [1, 3, 4, 0, 2]
+
+
+def test_sklearn_svc_is_not_exported():
+    from rasa_nlu.classifiers.sklearn_intent_classifier import \
+        SklearnIntentClassifier
+
+    td, _ = featurized_training_data()
+    clf = SklearnIntentClassifier()
+    clf.train(td, None)
+
+    assert clf.scorer is None
+
+
+def embedding_weights(num_features, num_intents, embed_dim=4):
+    rs = np.random.RandomState(42)
+    return {
+        "hidden_layer_a_0/kernel:0": rs.normal(size=(num_features, 6)),
+        "hidden_layer_a_0/bias:0": rs.normal(size=6),
+        "embed_layer_a/kernel:0": rs.normal(size=(6, embed_dim)),
+        "embed_layer_a/bias:0": rs.normal(size=embed_dim),
+        "embed_layer_b/kernel:0": rs.normal(size=(num_intents, embed_dim)),
+        "embed_layer_b/bias:0": rs.normal(size=embed_dim),
+    }
+
+
+@pytest.mark.parametrize("similarity_type", ["cosine", "inner"])
+def test_embedding_scorer(similarity_type, tmpdir):
+    from rasa_nlu.classifiers.embedding_scorer import EmbeddingIntentScorer
+
+    weights = embedding_weights(num_features=8, num_intents=3)
+    scorer = EmbeddingIntentScorer.from_weights(
+            weights, 1, 0, np.eye(3), similarity_type, ["a", "b", "c"])
+
+    x = np.random.RandomState(0).normal(size=8)
+    a = np.maximum(x.dot(weights["hidden_layer_a_0/kernel:0"]) +
+                   weights["hidden_layer_a_0/bias:0"], 0)
+    a = (a.dot(weights["embed_layer_a/kernel:0"]) +
+         weights["embed_layer_a/bias:0"])
+    b = weights["embed_layer_b/kernel:0"] + weights["embed_layer_b/bias:0"]
+    if similarity_type == "cosine":
+        a = a / np.linalg.norm(a)
+        b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    expected = b.dot(a)
+
+    file_name = tmpdir.join("scorer.npz").strpath
+    scorer.persist(file_name)
+    loaded = EmbeddingIntentScorer.load(file_name)
+
+    intents, sim = loaded.ranking(x, 2)
+    order = np.argsort(-expected)
+    assert intents == [["a", "b", "c"][i] for i in order[:2]]
+    assert np.allclose(sim, expected[order[:2]], atol=1e-5)
+
+
+def test_embedding_intent_classifier_loads_without_tensorflow(tmpdir):
+    from rasa_nlu.classifiers.embedding_intent_classifier import \
+        EmbeddingIntentClassifier
+    from rasa_nlu.classifiers.embedding_scorer import EmbeddingIntentScorer
+    from rasa_nlu.model import Metadata
+    from rasa_nlu.utils import pycloud_pickle
+
+    labels = ["goodbye", "greet", "restaurant_search"]
+    scorer = EmbeddingIntentScorer.from_weights(
+            embedding_weights(num_features=8, num_intents=3),
+            1, 0, np.eye(3), "cosine", labels)
+    scorer.persist(tmpdir.join("scorer.npz").strpath)
+    pycloud_pickle(tmpdir.join(EmbeddingIntentClassifier.name +
+                               "_inv_intent_dict.pkl").strpath,
+                   dict(enumerate(labels)))
+
+    meta = {"name": EmbeddingIntentClassifier.name,
+            "classifier_file": EmbeddingIntentClassifier.name + ".ckpt",
+            "scorer_file": "scorer.npz"}
+    classifier = EmbeddingIntentClassifier.load(
+            tmpdir.strpath, Metadata({"pipeline": [meta]}, None))
+
+    message = Message("hello")
+    message.set("text_features", np.random.RandomState(0).normal(size=8))
+    classifier.process(message)
+
+    assert classifier.session is None
+    assert message.get("intent")["name"] in labels
+    assert len(message.get("intent_ranking")) == len(labels)
+
+
+def test_interpreter_loads_scorer_model_without_tensorflow(tmpdir,
+                                                           monkeypatch):
+    import rasa_nlu
+    from rasa_nlu.classifiers.embedding_intent_classifier import \
+        EmbeddingIntentClassifier
+    from rasa_nlu.classifiers.embedding_scorer import EmbeddingIntentScorer
+    from rasa_nlu.model import Interpreter
+    from rasa_nlu.utils import pycloud_pickle, write_json_to_file
+
+    labels = ["goodbye", "greet", "restaurant_search"]
+    scorer = EmbeddingIntentScorer.from_weights(
+            embedding_weights(num_features=8, num_intents=3),
+            1, 0, np.eye(3), "cosine", labels)
+    scorer.persist(tmpdir.join("scorer.npz").strpath)
+    pycloud_pickle(tmpdir.join(EmbeddingIntentClassifier.name +
+                               "_inv_intent_dict.pkl").strpath,
+                   dict(enumerate(labels)))
+    write_json_to_file(tmpdir.join("metadata.json").strpath, {
+        "language": "en",
+        "rasa_nlu_version": rasa_nlu.__version__,
+        "pipeline": [{"name": EmbeddingIntentClassifier.name,
+                      "class": EmbeddingIntentClassifier.name,
+                      "classifier_file": "classifier.ckpt",
+                      "scorer_file": "scorer.npz"}]})
+
+    # importing tensorflow raises an `ImportError`
+    monkeypatch.setitem(sys.modules, "tensorflow", None)
+    interpreter = Interpreter.load(tmpdir.strpath)
+
+    message = Message("hello")
+    message.set("text_features", np.random.RandomState(0).normal(size=8))
+    interpreter.pipeline[0].process(message)
+    assert message.get("intent")["name"] in labels
+
+
+def test_embedding_negatives_exclude_correct_intent():
+    from rasa_nlu.classifiers.embedding_intent_classifier import \
+        EmbeddingIntentClassifier
+
+    intent_ids = np.repeat(np.arange(5), 200)
+    negs = EmbeddingIntentClassifier._sample_negatives(intent_ids, 5, 3)
+
+    assert negs.shape == (1000, 3)
+    assert not np.any(negs == intent_ids[:, np.newaxis])
+    # every wrong intent gets sampled
+    for intent_id in range(5):
+        sampled = negs[intent_ids == intent_id]
+        assert set(sampled.ravel()) == set(range(5)) - {intent_id}
+
+
+def test_embedding_validation_split_keeps_every_intent():
+    from rasa_nlu.classifiers.embedding_intent_classifier import \
+        EmbeddingIntentClassifier
+
+    intents_for_X = np.array([0] * 10 + [1] * 3 + [2])
+    train_idx, val_idx = EmbeddingIntentClassifier._split_validation(
+            intents_for_X, 0.5)
+
+    assert sorted(np.concatenate([train_idx, val_idx])) == list(range(14))
+    assert list(np.bincount(intents_for_X[val_idx], minlength=3)) == [5, 1, 0]
+    assert set(intents_for_X[train_idx]) == {0, 1, 2}
+
+
+def test_early_stopping():
+    from rasa_nlu.classifiers.embedding_intent_classifier import \
+        EarlyStopping
+
+    early_stopping = EarlyStopping(patience=2, min_delta=0.01)
+    assert not early_stopping.should_stop(0.5)
+    assert not early_stopping.should_stop(0.7)
+    # improvements smaller than `min_delta` do not count
+    assert not early_stopping.should_stop(0.705)
+    assert early_stopping.should_stop(0.6)
+
+    disabled = EarlyStopping(patience=0)
+    assert not any(disabled.should_stop(0.5) for _ in range(10))
+
+
+def test_embedding_index_finds_most_similar_intents(tmpdir):
+    from rasa_nlu.classifiers.embedding_scorer import EmbeddingIntentScorer
+
+    rs = np.random.RandomState(42)
+    num_intents, embed_dim = 2000, 8
+    layers = [(np.eye(embed_dim, dtype=np.float32),
+               np.zeros(embed_dim, dtype=np.float32))]
+    embeddings = rs.normal(size=(num_intents, embed_dim))
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    labels = np.array(["intent_{}".format(i) for i in range(num_intents)])
+    scorer = EmbeddingIntentScorer(layers, embeddings.astype(np.float32),
+                                   "cosine", labels)
+    scorer.build_index(num_clusters=20, num_probes=20)
+
+    file_name = tmpdir.join("scorer.npz").strpath
+    scorer.persist(file_name)
+    scorer = EmbeddingIntentScorer.load(file_name)
+
+    # every cluster gets searched, the approximate ranking is exact
+    for x in rs.normal(size=(20, embed_dim)):
+        intents, sim = scorer.ranking(x, 10)
+        exact_intents, exact_sim = scorer.ranking(x, 10, exact=True)
+        assert intents == exact_intents
+        assert np.allclose(sim, exact_sim)
+
+    scorer.index.num_probes = 3
+    found = 0
+    for x in rs.normal(size=(50, embed_dim)):
+        intents, sim = scorer.ranking(x, 10)
+        assert sim == sorted(sim, reverse=True)
+        found += len(set(intents) & set(scorer.ranking(x, 10, exact=True)[0]))
+    # recall of the 10 most similar intents
+    assert found / 500.0 > 0.5
+
+
+def test_embedding_index_stores_skewed_clusters_without_padding():
+    from rasa_nlu.classifiers.embedding_scorer import IntentEmbeddingIndex
+
+    rs = np.random.RandomState(42)
+    # most intents point in almost the same direction
+    embeddings = np.vstack([1.0 + 0.01 * rs.normal(size=(990, 4)),
+                            rs.normal(size=(10, 4))]).astype(np.float32)
+    index = IntentEmbeddingIndex.build(embeddings, num_clusters=10,
+                                       num_probes=10)
+
+    assert index.offsets[-1] == len(embeddings)
+    assert sorted(index.intents) == list(range(len(embeddings)))
+    assert np.array_equal(index.embeddings, embeddings[index.intents])
+    assert index.nbytes < 2 * embeddings.nbytes
+
+    intents, sim = index.search(embeddings[0], 5)
+    exact = embeddings.dot(embeddings[0])
+    assert np.allclose(sim, np.sort(exact)[::-1][:5])
+
+
+def test_keyword_automaton_finds_overlapping_keywords(tmpdir):
+    from rasa_nlu.classifiers.keyword_automaton import KeywordAutomaton
+
+    automaton = KeywordAutomaton.build({"he": "a", "she": "b",
+                                        "his": "c", "hers": "d"})
+    matches = {(start, end, automaton.keywords[i])
+               for start, end, i in automaton.iter_matches("ushers")}
+    assert matches == {(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")}
+
+    file_name = tmpdir.join("automaton.npz").strpath
+    automaton.persist(file_name)
+    loaded = KeywordAutomaton.load(file_name)
+    assert loaded.keywords == automaton.keywords
+    assert loaded.intents == automaton.intents
+    assert (list(loaded.iter_matches("ushers")) ==
+            list(automaton.iter_matches("ushers")))
+
+
+def test_keyword_intent_classifier(tmpdir):
+    from rasa_nlu.classifiers.keyword_intent_classifier import \
+        KeywordIntentClassifier
+    from rasa_nlu.model import Metadata
+
+    examples = [Message("good morning", {"intent": "greet"}),
+                Message("Show me restaurants", {"intent": "search"}),
+                Message("thanks", {"intent": "thank"}),
+                Message("thanks", {"intent": "affirm"}),
+                Message("see you", {"intent": "goodbye"})]
+    classifier = KeywordIntentClassifier({"keywords": {"goodbye": ["bye"]}})
+    classifier.train(TrainingData(training_examples=examples), {})
+
+    assert classifier.parse("good morning to you") == "greet"
+    assert classifier.parse("please SHOW ME RESTAURANTS") == "search"
+    # training examples of several intents are dropped
+    assert classifier.parse("thanks") is None
+    # keywords only match whole words
+    assert classifier.parse("byebye") is None
+    assert classifier.parse("ok, bye!") == "goodbye"
+    # the defaults are replaced by the configured keywords
+    assert classifier.parse("hello") is None
+
+    meta = classifier.persist(tmpdir.strpath)
+    meta.update(classifier.component_config)
+    meta["name"] = classifier.name
+    loaded = KeywordIntentClassifier.load(
+            tmpdir.strpath, Metadata({"pipeline": [meta]}, None))
+    message = Message("good morning, bye")
+    loaded.process(message)
+    assert message.get("intent") == {"name": "greet", "confidence": 1.0}
+
+
+def test_keyword_intent_classifier_drops_keywords_of_unknown_intents():
+    from rasa_nlu.classifiers.keyword_intent_classifier import \
+        KeywordIntentClassifier
+
+    classifier = KeywordIntentClassifier()
+    # the untrained classifier uses the default keywords
+    assert classifier.parse("hello") == "greet"
+
+    examples = [Message("\u4f60\u597d", {"intent": "hello_zh"}),
+                Message("bye", {"intent": "goodbye"})]
+    classifier.train(TrainingData(training_examples=examples), {})
+
+    assert classifier.parse("hello") is None
+    assert classifier.parse("goodbye") == "goodbye"
+    assert classifier.parse("\u4f60\u597d") == "hello_zh"
+
+
+def test_keyword_intent_classifier_uses_normalized_texts():
+    from rasa_nlu.classifiers.keyword_intent_classifier import \
+        KeywordIntentClassifier
+    from rasa_nlu.utils.text_normalizer import TextNormalizer
+
+    normalizer = TextNormalizer({"halfwidth": True})
+    data = TrainingData(training_examples=[
+        Message("ＯＫ", {"intent": "affirm"})])
+    classifier = KeywordIntentClassifier()
+    for component in [normalizer, classifier]:
+        component.train(data, {})
+
+    message = Message("ok！")
+    for component in [normalizer, classifier]:
+        component.process(message)
+    assert message.get("intent") == {"name": "affirm", "confidence": 1.0}
+    # the lowercase text is shared with the other components
+    assert message.get("normalized_text")["lowercase"] == "ok!"
+
+
+@pytest.mark.parametrize("halfwidth", [True, False])
+def test_keyword_intent_classifier_matches_full_width_keywords(halfwidth):
+    from rasa_nlu.classifiers.keyword_intent_classifier import \
+        KeywordIntentClassifier
+    from rasa_nlu.utils.text_normalizer import TextNormalizer
+
+    normalizer = TextNormalizer({"halfwidth": halfwidth})
+    # full width "hi" and "ok"
+    classifier = KeywordIntentClassifier({"keywords": {
+        "greet": ["\uff48\uff49"], "affirm": ["ok"]}})
+    data = TrainingData(training_examples=[
+        Message("hello", {"intent": "greet"}),
+        Message("sure", {"intent": "affirm"})])
+    for component in [normalizer, classifier]:
+        component.train(data, {})
+
+    for text, intent in [("HI there", "greet"),
+                         ("\uff48\uff49 there", "greet"),
+                         ("\uff2f\uff2b!", "affirm")]:
+        message = Message(text)
+        for component in [normalizer, classifier]:
+            component.process(message)
+        assert message.get("intent")["name"] == intent
+        assert classifier.parse(text) == intent
+
+
+@pytest.mark.parametrize("word_boundaries, text, intent", [
+    ("word", "你好吗", "greet"),
+    ("word", "ok你好", "greet"),
+    ("tokens", "你好吗", "greet"),
+    ("word", "不好看", "not_well"),
+    ("tokens", "不好看", None),
+    ("none", "不好看", "not_well"),
+])
+def test_keyword_intent_classifier_word_boundaries(word_boundaries, text,
+                                                   intent):
+    from rasa_nlu.classifiers.keyword_intent_classifier import \
+        KeywordIntentClassifier
+    from rasa_nlu.tokenizers import Token
+
+    classifier = KeywordIntentClassifier({
+        "keywords": {"greet": ["你好"], "not_well": ["不好"]},
+        "word_boundaries": word_boundaries})
+    # the words of the jieba tokenizer
+    tokens = {"你好吗": [Token("你好", 0), Token("吗", 2)],
+              "不好看": [Token("不好看", 0)],
+              "ok你好": [Token("ok", 0), Token("你好", 2)]}[text]
+
+    assert classifier.parse(text, tokens) == intent
@@ -76,3 +76,29 @@ def test_builder_load_unknown(component_builder):
         component_builder.load_component("my_made_up_componment", "",
                                          Metadata({}, None))
     assert "Unknown component name" in str(excinfo.value)
+
+
+def test_spacy_pipes_to_disable():
+    from rasa_nlu.utils.spacy_utils import SpacyNLP
+
+    pipes = ["tagger", "ner"]
+    assert SpacyNLP.pipes_to_disable(
+            pipes, ["nlp_spacy", "tokenizer_spacy",
+                    "intent_featurizer_spacy"]) == ["ner"]
+    assert SpacyNLP.pipes_to_disable(
+            pipes, ["nlp_spacy", "tokenizer_spacy"]) == ["tagger", "ner"]
+    assert SpacyNLP.pipes_to_disable(
+            pipes, ["nlp_spacy", "tokenizer_spacy", "ner_spacy"]) == [
+        "tagger"]
+    # custom components might need any of the pipes
+    assert SpacyNLP.pipes_to_disable(
+            pipes, ["nlp_spacy", "my.custom.Component"]) == []
+
+
+def test_spacy_pipes_of_all_components_are_known():
+    from rasa_nlu import registry
+    from rasa_nlu.utils.spacy_utils import SPACY_PIPES_USED_BY_COMPONENT
+
+    # an unlisted built-in component keeps all pipes enabled
+    assert (set(registry.registered_components) ==
+            set(SPACY_PIPES_USED_BY_COMPONENT))
@@ -4,6 +4,15 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import json
+import threading
+import time
+
+import pytest
+from six.moves.BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from six.moves.socketserver import ThreadingMixIn
+from six.moves.urllib.parse import parse_qs
+
 from rasa_nlu.config import RasaNLUModelConfig
 from rasa_nlu.extractors.spacy_entity_extractor import SpacyEntityExtractor
 from rasa_nlu.training_data import TrainingData, Message
@@ -58,6 +67,169 @@ def test_crf_extractor(spacy_nlp):
     }, 'Original examples are not mutated'
 
 
+def test_crf_sentence_to_features():
+    from rasa_nlu.extractors.crf_entity_extractor import CRFEntityExtractor
+    ext = CRFEntityExtractor(component_config={
+        "features": [["low"], ["bias", "word3", "pattern"], ["low", "upper"]]
+    })
+    sentence = [("Central", "JJ", "N/A", None),
+                ("INDIA", "NNP", "N/A", 2)]
+    assert ext._sentence_to_features(sentence) == [
+        {"BOS": True, "0:bias": "bias", "0:word3": "ral", "0:pattern": "N/A",
+         "1:low": "india", "1:upper": True},
+        {"-1:low": "central", "0:bias": "bias", "0:word3": "DIA",
+         "0:pattern": "2", "EOS": True}]
+
+
+@pytest.mark.parametrize("algorithm, num_threads",
+                         [("lbfgs", 1), ("ap", 1), ("l2sgd", 2)])
+def test_crf_streaming_training(algorithm, num_threads):
+    from rasa_nlu.extractors.crf_entity_extractor import CRFEntityExtractor
+    ext = CRFEntityExtractor(component_config={
+        "BILOU_flag": False,
+        "algorithm": algorithm,
+        "parallel_training": True})
+    dataset = [[("fly", "VB", "O", None), ("to", "TO", "O", None),
+                (city, "NNP", "city", None)]
+               for city in ["berlin", "paris", "london", "rome"]] * 5
+
+    features = list(ext._training_features(dataset, num_threads))
+    assert features == [ext._sentence_to_features(s) for s in dataset]
+
+    ext._train_model(dataset, num_threads)
+    assert ext.ent_tagger.algorithm == algorithm
+    assert ext.ent_tagger.predict_single(features[0]) == ["O", "O", "city"]
+
+
+def test_crf_unknown_algorithm():
+    from rasa_nlu.extractors.crf_entity_extractor import CRFEntityExtractor
+    with pytest.raises(ValueError):
+        CRFEntityExtractor(component_config={"algorithm": "svm"})
+
+
+@pytest.mark.parametrize("viterbi_confidence", ["sequence", "none"])
+def test_crf_viterbi_decoding(viterbi_confidence):
+    from rasa_nlu.extractors.crf_entity_extractor import CRFEntityExtractor
+    ext = CRFEntityExtractor(component_config={
+        "decoding": "viterbi",
+        "viterbi_confidence": viterbi_confidence})
+    dataset = [[("fly", "VB", "O", None), ("to", "TO", "O", None),
+                ("new", "NNP", "B-city", None),
+                ("york", "NNP", "L-city", None)],
+               [("fly", "VB", "O", None), ("to", "TO", "O", None),
+                ("paris", "NNP", "U-city", None)]] * 5
+    ext._train_model(dataset)
+
+    features = ext._sentence_to_features(dataset[0])
+    tags = ext._viterbi_tags(features)
+    marginals = ext.ent_tagger.predict_marginals_single(features)
+    assert [label for label, _ in tags] == [
+        ext._most_likely_label(probs)[0] for probs in marginals]
+    if viterbi_confidence == "sequence":
+        assert all(0 < confidence <= 1 for _, confidence in tags)
+    else:
+        assert all(confidence is None for _, confidence in tags)
+
+    assert ext._handle_bilou_label(2, tags) == (3, tags[2][1], "city")
+
+
+@pytest.mark.parametrize("decoding", ["viterbi", "marginals"])
+def test_crf_decoding_is_thread_safe(decoding):
+    from rasa_nlu.extractors.crf_entity_extractor import CRFEntityExtractor
+    ext = CRFEntityExtractor(component_config={"decoding": decoding})
+    dataset = [[("fly", "VB", "O", None), ("to", "TO", "O", None),
+                ("new", "NNP", "B-city", None),
+                ("york", "NNP", "L-city", None)],
+               [("fly", "VB", "O", None), ("to", "TO", "O", None),
+                ("paris", "NNP", "U-city", None)],
+               [("book", "VB", "O", None), ("a", "DT", "O", None),
+                ("table", "NN", "O", None), ("in", "IN", "O", None),
+                ("rome", "NNP", "U-city", None)]] * 5
+    ext._train_model(dataset)
+
+    def decode(sentence):
+        features = ext._sentence_to_features(sentence)
+        if decoding == "viterbi":
+            return ext._viterbi_tags(features)
+        else:
+            return ext._marginals(features)
+
+    expected = [decode(sentence) for sentence in dataset[:3]]
+    errors = []
+
+    def run(i):
+        try:
+            for _ in range(200):
+                assert decode(dataset[i]) == expected[i]
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i % 3,))
+               for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+
+
+def test_crf_bilou_tags_from_offsets():
+    from rasa_nlu.extractors.crf_entity_extractor import CRFEntityExtractor
+    tokens = [("fly", 0, 3, None), ("to", 4, 6, None),
+              ("new", 7, 10, None), ("york", 11, 15, None),
+              ("tomorrow", 16, 24, None)]
+
+    tags = CRFEntityExtractor._bilou_tags_from_offsets(
+            tokens, [(7, 15, "city"), (0, 3, "action")])
+    assert tags == ["U-action", "O", "B-city", "L-city", "O"]
+
+    # the entity does not end at a token boundary
+    tags = CRFEntityExtractor._bilou_tags_from_offsets(
+            tokens, [(16, 20, "time")])
+    assert tags == ["O", "O", "O", "O", "-"]
+
+
+def test_crf_extractor_without_spacy():
+    from rasa_nlu.extractors.crf_entity_extractor import CRFEntityExtractor
+    from rasa_nlu.tokenizers.whitespace_tokenizer import WhitespaceTokenizer
+
+    tk = WhitespaceTokenizer()
+    examples = []
+    for city in ["berlin", "paris", "new york", "london", "san francisco"]:
+        text = "i want to fly to {} today".format(city)
+        start = text.index(city)
+        examples.append(Message(text, {
+            "intent": "book_flight",
+            "entities": [{"start": start, "end": start + len(city),
+                          "value": city, "entity": "city"}]}))
+    td = TrainingData(training_examples=examples * 3)
+    tk.train(td, RasaNLUModelConfig())
+
+    ext = CRFEntityExtractor()
+    ext.train(td, RasaNLUModelConfig())
+    assert ext._tag_of_token is None, "spacy is not used"
+
+    message = Message("i want to fly to new york today")
+    tk.process(message)
+    # tokens without pos tags have no pos features
+    crf_format = ext._from_text_to_crf(message)
+    assert "0:pos" not in ext._sentence_to_features(crf_format)[0]
+
+    ext.process(message)
+    entities = message.get("entities")
+    assert len(entities) == 1
+    assert entities[0]["start"] == 17
+    assert entities[0]["end"] == 25
+    assert entities[0]["value"] == "new york"
+    assert entities[0]["entity"] == "city"
+
+    # pos tags set by a tagger are used as features
+    message.get("tokens")[0].set("pos", "PRP")
+    features = ext._sentence_to_features(ext._from_text_to_crf(message))
+    assert features[0]["0:pos"] == "PRP"
+    assert features[0]["0:pos2"] == "PR"
+
+
 def test_crf_json_from_BILOU(spacy_nlp):
     from rasa_nlu.extractors.crf_entity_extractor import CRFEntityExtractor
     ext = CRFEntityExtractor()
@@ -152,6 +324,140 @@ def test_duckling_entity_extractor_and_synonyms(component_builder):
     assert message is not None
 
 
+class DucklingStubHandler(BaseHTTPRequestHandler):
+    # keeps the connection alive between requests
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        self.server.requests.append((form, self.client_address))
+        time.sleep(self.server.delay)
+
+        text = form["text"][0]
+        matches = [{"start": 0, "end": len(text), "body": text,
+                    "dim": "number", "value": {"value": 6}}]
+        body = self.server.body or json.dumps(matches).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class DucklingStubServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # clients which timed out closed the connection
+        pass
+
+
+@pytest.fixture
+def duckling_stub():
+    server = DucklingStubServer(("127.0.0.1", 0), DucklingStubHandler)
+    server.requests = []
+    server.delay = 0
+    # replaces the JSON matches in the responses
+    server.body = None
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _duckling_http_extractor(server, **config):
+    from rasa_nlu.extractors.duckling_http_extractor import \
+        DucklingHTTPExtractor
+
+    config["url"] = "http://127.0.0.1:{}".format(server.server_address[1])
+    return DucklingHTTPExtractor(config, "en")
+
+
+def test_duckling_http_extractor_caches_responses(duckling_stub):
+    duckling = _duckling_http_extractor(duckling_stub)
+
+    for text in ["six", "six", "seven"]:
+        message = Message(text)
+        duckling.process(message)
+        assert message.get("entities")[0]["value"] == 6
+
+    # the repeated text is answered by the cache
+    assert [form["text"] for form, _ in duckling_stub.requests] == [
+        ["six"], ["seven"]]
+    assert duckling_stub.requests[0][0]["locale"] == ["en_EN"]
+    # both requests used the same connection
+    assert len({address for _, address in duckling_stub.requests}) == 1
+
+    # the reference time of the message is passed on and is part of
+    # the cache key
+    duckling.process(Message("six", time="1500000000000"))
+    assert duckling_stub.requests[-1][0]["reftime"] == ["1500000000000"]
+
+
+def test_duckling_http_extractor_cache_hits_are_copies(duckling_stub):
+    duckling = _duckling_http_extractor(duckling_stub)
+
+    first = Message("six")
+    duckling.process(first)
+    first.get("entities")[0]["additional_info"]["value"] = 7
+    second = Message("six")
+    duckling.process(second)
+
+    assert len(duckling_stub.requests) == 1
+    assert second.get("entities")[0]["additional_info"]["value"] == 6
+
+
+def test_duckling_http_extractor_circuit_breaker(duckling_stub):
+    duckling = _duckling_http_extractor(duckling_stub,
+                                        read_timeout=0.05,
+                                        circuit_breaker_failures=2,
+                                        circuit_breaker_reset_timeout=60)
+    duckling_stub.delay = 0.2
+
+    for text in ["one", "two", "three", "four"]:
+        message = Message(text)
+        duckling.process(message)
+        assert message.get("entities") == []
+
+    # after two timeouts duckling is skipped
+    assert len(duckling_stub.requests) == 2
+    assert duckling.circuit_breaker.is_open
+    assert duckling.circuit_breaker.skipped == 2
+
+    # the next request after the reset timeout closes the circuit again
+    duckling_stub.delay = 0
+    duckling.circuit_breaker.reset_timeout = 0
+    message = Message("five")
+    duckling.process(message)
+    assert message.get("entities")[0]["value"] == 6
+    assert not duckling.circuit_breaker.is_open
+
+
+def test_duckling_http_extractor_invalid_responses(duckling_stub):
+    duckling = _duckling_http_extractor(duckling_stub,
+                                        circuit_breaker_failures=2)
+    duckling_stub.body = b"<html>Bad Gateway</html>"
+
+    message = Message("six", time={"not": "a timestamp"})
+    duckling.process(message)
+
+    assert message.get("entities") == []
+    assert "reftime" not in duckling_stub.requests[-1][0]
+    # the failure counts for the circuit breaker and is not cached
+    assert duckling.circuit_breaker.failures == 1
+    duckling_stub.body = None
+    message = Message("six")
+    duckling.process(message)
+    assert message.get("entities")[0]["value"] == 6
+    assert duckling.circuit_breaker.failures == 0
+
+
 def test_unintentional_synonyms_capitalized(component_builder):
     _config = utilities.base_test_conf("spacy_sklearn")
     ner_syn = component_builder.create_component("ner_synonyms", _config)
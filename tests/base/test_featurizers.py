@@ -39,6 +39,65 @@ def test_mitie_featurizer(mitie_feature_extractor, default_config):
     assert np.allclose(vecs[:5], expected, atol=1e-5)
 
 
+def test_mitie_featurizer_word_vector_cache():
+    from rasa_nlu.featurizers.mitie_featurizer import MitieFeaturizer
+    from rasa_nlu.tokenizers.whitespace_tokenizer import WhitespaceTokenizer
+    from rasa_nlu.utils import LRUCache
+
+    class FakeFeatureExtractor(object):
+        num_dimensions = 3
+
+        def __init__(self):
+            self.lookups = 0
+
+        def get_feature_vector(self, word):
+            self.lookups += 1
+            return np.array([len(word), ord(word[0]), 1.0])
+
+    extractor = FakeFeatureExtractor()
+    cache = LRUCache(10)
+    ftr = MitieFeaturizer()
+    tokens = WhitespaceTokenizer().tokenize("hey hey how are you")
+
+    uncached = ftr.features_for_tokens(tokens, extractor)
+    cached = ftr.features_for_tokens(tokens, extractor, cache)
+    cached_again = ftr.features_for_tokens(tokens, extractor, cache)
+
+    assert np.allclose(uncached, cached)
+    assert np.allclose(cached, cached_again)
+    # 5 uncached lookups + 4 distinct words
+    assert extractor.lookups == 9
+    assert cache.hits == 6
+    assert np.allclose(ftr.features_for_tokens([], extractor), np.zeros(3))
+
+
+def test_mitie_word_vector_cache_is_reported():
+    from rasa_nlu.utils import LRUCache
+    from rasa_nlu.utils.mitie_utils import MitieNLP
+
+    class FakeFeatureExtractor(object):
+        num_dimensions = 3
+
+    nlp = MitieNLP({"word_vector_cache_size": 10}, FakeFeatureExtractor())
+    cache = nlp.provide_context()["mitie_word_vector_cache"]
+    for word in ["hey", "hey", "you"]:
+        cache.get_or_compute(word, lambda w: np.zeros(3))
+
+    assert nlp.resource_usage() == {
+        "memory": 2 * 3 * 8,
+        "word_vector_cache": {"hits": 1, "misses": 2, "hit_rate": 1 / 3.0,
+                              "size": 2, "max_size": 10}}
+
+    # a disabled cache is bypassed
+    nlp = MitieNLP({"word_vector_cache_size": 0}, FakeFeatureExtractor())
+    assert nlp.provide_context()["mitie_word_vector_cache"] is None
+    assert nlp.resource_usage() is None
+
+    disabled = LRUCache(0)
+    assert disabled.get_or_compute("hey", len) == 3
+    assert disabled.stats()["misses"] == 0
+
+
 def test_ngram_featurizer(spacy_nlp):
     from rasa_nlu.featurizers.ngram_featurizer import NGramFeaturizer
     ftr = NGramFeaturizer({"max_number_of_ngrams": 10})
@@ -126,7 +185,8 @@ def test_spacy_featurizer_casing(spacy_nlp):
     ("hello hello hello hello hello ", [5]),
     ("hello goodbye hello", [1, 2]),
     ("a b c d e f", [1, 1, 1, 1, 1, 1]),
-    ("a 1 2", [2, 1])
+    ("a 1 2", [2, 1]),
+    ("Hello hello", [1, 1])
 ])
 def test_count_vector_featurizer(sentence, expected):
     from rasa_nlu.featurizers.count_vectors_featurizer import \
@@ -56,3 +56,264 @@ def test_model_not_compatible(metadata):
 def test_model_is_compatible(metadata):
     # should not raise an exception
     assert Interpreter.ensure_model_compatibility(metadata) is None
+
+
+def test_interpreter_resource_usage():
+    from rasa_nlu.components import Component
+
+    class LargeComponent(Component):
+        name = "large"
+
+        def resource_usage(self):
+            return {"memory": 1024}
+
+    class SmallComponent(Component):
+        name = "small"
+
+    interpreter = Interpreter([LargeComponent(), SmallComponent()], {})
+
+    assert interpreter.resource_usage() == {
+        "memory": 1024,
+        "components": {"large": {"memory": 1024}}}
+
+
+def test_scheduler_component_dependencies():
+    from rasa_nlu.scheduler import component_dependencies
+
+    pipeline = [registry.get_component_class(name)
+                for name in registry.registered_pipeline_templates[
+                    "spacy_sklearn"]]
+    names = [c.name for c in pipeline]
+    dependencies = component_dependencies(pipeline)
+
+    def depends_on(component, other):
+        return names.index(other) in dependencies[names.index(component)]
+
+    assert depends_on("tokenizer_spacy", "nlp_spacy")
+    assert depends_on("ner_crf", "intent_entity_featurizer_regex")
+    assert depends_on("ner_synonyms", "ner_crf")
+    assert not depends_on("intent_classifier_sklearn", "ner_crf")
+    assert not depends_on("intent_classifier_sklearn", "ner_synonyms")
+
+
+def test_scheduler_readers_of_normalized_texts_are_independent():
+    from rasa_nlu.scheduler import component_dependencies
+
+    names = ["text_normalizer", "tokenizer_whitespace",
+             "intent_featurizer_count_vectors", "intent_classifier_keyword"]
+    pipeline = [registry.get_component_class(name) for name in names]
+    dependencies = component_dependencies(pipeline)
+
+    assert dependencies[names.index("tokenizer_whitespace")] == {0}
+    assert dependencies[names.index(
+            "intent_featurizer_count_vectors")] == {0}
+    # reads the tokens
+    assert dependencies[names.index("intent_classifier_keyword")] == {0, 1}
+
+
+def test_scheduler_merges_entities_in_pipeline_order():
+    import time
+    from rasa_nlu.components import Component
+    from rasa_nlu.scheduler import ParallelScheduler
+
+    class SlowExtractor(Component):
+        provides = ["entities"]
+        concurrent = True
+
+        def process(self, message, **kwargs):
+            time.sleep(self.component_config["delay"])
+            message.set("entities",
+                        message.get("entities", []) +
+                        [{"entity": self.name}], add_to_output=True)
+
+    class FirstExtractor(SlowExtractor):
+        name = "first"
+
+    class SecondExtractor(SlowExtractor):
+        name = "second"
+
+    class Upper(Component):
+        name = "upper"
+        provides = ["upper"]
+        concurrent = True
+
+        def process(self, message, **kwargs):
+            message.set("upper", message.text.upper())
+
+    pipeline = [FirstExtractor({"delay": 0.05}),
+                SecondExtractor({"delay": 0.0}),
+                Upper()]
+    scheduler = ParallelScheduler(pipeline)
+    assert scheduler.dependencies == [set(), set(), set()]
+
+    interpreter = Interpreter(pipeline, {}, scheduler=scheduler)
+    result = interpreter.parse("hello")
+    assert [e["entity"] for e in result["entities"]] == ["first", "second"]
+
+
+def test_parallel_scheduler_parses_like_sequential(component_builder, tmpdir):
+    from rasa_nlu.config import RasaNLUModelConfig
+    from rasa_nlu.scheduler import ParallelScheduler
+
+    pipeline = [{"name": "tokenizer_whitespace"},
+                {"name": "intent_entity_featurizer_regex"},
+                {"name": "intent_featurizer_count_vectors"},
+                {"name": "ner_crf"},
+                {"name": "ner_synonyms"},
+                {"name": "intent_classifier_sklearn"}]
+    _conf = RasaNLUModelConfig({"pipeline": pipeline,
+                                "scheduler": "parallel"})
+    interpreter = utilities.interpreter_for(
+            component_builder, "data/examples/rasa/demo-rasa.json",
+            tmpdir.strpath, _conf)
+    assert isinstance(interpreter.scheduler, ParallelScheduler)
+
+    sequential = Interpreter(interpreter.pipeline, interpreter.context)
+    texts = ["good bye", "i am looking for an indian spot",
+             "show me chinese restaurants in the north",
+             "anywhere in the west"]
+    for text in texts:
+        assert interpreter.parse(text) == sequential.parse(text)
+
+
+def test_cascade_skips_components_of_later_stages():
+    from rasa_nlu.scheduler import skipped_after
+
+    names = ["tokenizer_whitespace",
+             "intent_classifier_keyword",
+             "nlp_spacy",
+             "intent_entity_featurizer_regex",
+             "intent_featurizer_spacy",
+             "intent_featurizer_count_vectors",
+             "ner_crf",
+             "ner_synonyms",
+             "intent_classifier_sklearn"]
+    pipeline = [registry.get_component_class(name) for name in names]
+
+    skipped = [names[j] for j in sorted(skipped_after(pipeline, 1))]
+    # the spacy doc and the token patterns are used by `ner_crf`
+    assert skipped == ["intent_featurizer_spacy",
+                       "intent_featurizer_count_vectors",
+                       "intent_classifier_sklearn"]
+
+    without_crf = [c for c in pipeline if c.name != "ner_crf"]
+    skipped = [without_crf[j].name
+               for j in sorted(skipped_after(without_crf, 1))]
+    assert skipped == ["nlp_spacy",
+                       "intent_entity_featurizer_regex",
+                       "intent_featurizer_spacy",
+                       "intent_featurizer_count_vectors",
+                       "intent_classifier_sklearn"]
+
+
+@pytest.mark.parametrize("scheduler", ["sequential", "parallel"])
+def test_cascade_ends_intent_classification_early(scheduler,
+                                                  component_builder,
+                                                  tmpdir):
+    from rasa_nlu.config import RasaNLUModelConfig
+
+    pipeline = [{"name": "tokenizer_whitespace"},
+                {"name": "intent_classifier_keyword"},
+                {"name": "intent_featurizer_count_vectors"},
+                {"name": "intent_classifier_sklearn"}]
+    _conf = RasaNLUModelConfig({"pipeline": pipeline,
+                                "scheduler": scheduler,
+                                "cascade_threshold": 0.9})
+    interpreter = utilities.interpreter_for(
+            component_builder, "data/examples/rasa/demo-rasa.json",
+            tmpdir.strpath, _conf)
+
+    result = interpreter.parse("hello there")
+    assert result["intent"] == {"name": "greet", "confidence": 1.0}
+    assert result["intent_ranking"] == [result["intent"]]
+    keys = set(result)
+
+    result = interpreter.parse("i am looking for an indian spot")
+    assert result["intent"]["name"] == "restaurant_search"
+    # the same keys whichever stage classified the intent
+    assert set(result) == keys
+
+    stages = interpreter.cascade.as_dict()["stages"]
+    assert [s["name"] for s in stages] == ["intent_classifier_keyword",
+                                           "intent_classifier_sklearn"]
+    assert stages[0]["evaluated"] == 2
+    assert stages[0]["exits"] == 1
+    assert stages[0]["hit_rate"] == 0.5
+    assert stages[0]["skips"] == ["intent_featurizer_count_vectors",
+                                  "intent_classifier_sklearn"]
+    assert stages[1]["evaluated"] == 1
+
+
+def test_cascade_ranks_the_intent_of_stages_without_ranking():
+    from rasa_nlu.components import Component
+    from rasa_nlu.scheduler import IntentCascade
+    from rasa_nlu.training_data import Message
+
+    class RuleClassifier(Component):
+        name = "rule_classifier"
+        provides = ["intent"]
+
+    pipeline = [RuleClassifier(),
+                registry.get_component_class("intent_classifier_sklearn")]
+    cascade = IntentCascade(pipeline, 0.9)
+
+    message = Message("hello")
+    message.set("intent", {"name": "greet", "confidence": 0.5},
+                add_to_output=True)
+    assert cascade.exit(0, message) == set()
+    assert message.get("intent_ranking") is None
+
+    message.set("intent", {"name": "greet", "confidence": 1.0},
+                add_to_output=True)
+    assert cascade.exit(0, message) == {1}
+    assert message.as_dict(only_output_properties=True)[
+        "intent_ranking"] == [{"name": "greet", "confidence": 1.0}]
+
+
+@pytest.mark.parametrize("scheduler", ["sequential", "parallel"])
+def test_deadline_skips_optional_components(scheduler):
+    import time
+    from rasa_nlu.components import Component
+    from rasa_nlu.scheduler import ParallelScheduler, SequentialScheduler
+
+    class Classifier(Component):
+        name = "classifier"
+        provides = ["intent"]
+        concurrent = True
+
+        def process(self, message, **kwargs):
+            message.set("intent", {"name": "greet", "confidence": 1.0},
+                        add_to_output=True)
+
+    class SlowExtractor(Component):
+        name = "slow_extractor"
+        provides = ["entities"]
+        concurrent = True
+
+        def process(self, message, **kwargs):
+            time.sleep(0.05)
+            message.set("entities", [{"entity": "slow"}],
+                        add_to_output=True)
+
+    pipeline = [Classifier(), SlowExtractor()]
+    if scheduler == "parallel":
+        interpreter = Interpreter(pipeline, {}, scheduler=ParallelScheduler(
+                pipeline))
+    else:
+        interpreter = Interpreter(pipeline, {}, scheduler=SequentialScheduler(
+                pipeline))
+
+    # the first parse measures how long the extractor takes
+    result = interpreter.parse("hello", deadline=time.time() + 0.01)
+    assert "partial" not in result
+    assert result["entities"] == [{"entity": "slow"}]
+
+    result = interpreter.parse("hello", deadline=time.time() + 0.01)
+    assert result["partial"] is True
+    assert result["skipped_components"] == ["slow_extractor"]
+    assert result["intent"]["name"] == "greet"
+    assert result["entities"] == []
+
+    result = interpreter.parse("hello", deadline=time.time() + 10)
+    assert "partial" not in result
+    assert result["entities"] == [{"entity": "slow"}]
@@ -59,6 +59,8 @@ def test_status(app):
     rjs = yield response.json()
     assert response.code == 200 and "available_projects" in rjs
     assert "default" in rjs["available_projects"]
+    assert rjs["num_threads"] > 0
+    assert "resource_usage" in rjs["available_projects"]["default"]
 
 
 @pytest.inlineCallbacks
@@ -136,6 +138,86 @@ def test_post_parse(app, response_test):
                ['entities', 'intent', '_text', 'confidence'])
 
 
+@pytest.inlineCallbacks
+def test_parse_deadline_is_counted_in_metrics(app):
+    response = yield app.get("http://dummy-uri/metrics")
+    before = (yield response.json())["parse"]
+
+    response = yield app.get("http://dummy-uri/parse?q=hello&deadline=500")
+    assert response.code == 200
+    response = yield app.get("http://dummy-uri/parse?q=hello&deadline=soon")
+    assert response.code == 400
+
+    response = yield app.get("http://dummy-uri/metrics")
+    after = (yield response.json())["parse"]
+    assert response.code == 200
+    assert after["requests"] == before["requests"] + 1
+    assert (after["requests_with_deadline"] ==
+            before["requests_with_deadline"] + 1)
+    assert after["partial_results"] == before["partial_results"]
+
+
+@pytest.inlineCallbacks
+def test_parse_null_deadline_uses_the_server_deadline(tmpdir):
+    router = DataRouter(tmpdir.strpath)
+    rasa = RasaNLU(router, testing=True, default_deadline=500)
+    app = StubTreq(rasa.app.resource())
+
+    response = yield app.post("http://dummy-uri/parse",
+                              json={"q": "hello", "deadline": None})
+    assert response.code == 200
+
+    response = yield app.get("http://dummy-uri/metrics")
+    metrics = (yield response.json())["parse"]
+    assert metrics["requests"] == 1
+    assert metrics["requests_with_deadline"] == 1
+
+
+@pytest.inlineCallbacks
+def test_parse_requests_over_the_queue_depth_are_shed(tmpdir):
+    router = DataRouter(tmpdir.strpath)
+    rasa = RasaNLU(router, testing=True, max_queue_depth=0,
+                   max_queue_wait=1500)
+    app = StubTreq(rasa.app.resource())
+
+    response = yield app.get("http://dummy-uri/parse?q=hello")
+    assert response.code == 503
+    assert response.headers.getRawHeaders("Retry-After") == ["2"]
+
+    response = yield app.get("http://dummy-uri/metrics")
+    metrics = (yield response.json())["parse_queue"]
+    assert metrics["depth"] == 0
+    assert metrics["shed"] == metrics["shed_queue_full"] == 1
+    assert metrics["accepted"] == 0
+    assert metrics["max_depth"] == 0
+    assert metrics["max_wait"] == 1.5
+
+
+def test_parse_queue_sheds_requests_waiting_too_long(monkeypatch):
+    from rasa_nlu.server import OverloadedError, ParseQueue
+
+    # every reading of the clock advances it by a second
+    clock = {"now": 0.0}
+
+    def fake_time():
+        clock["now"] += 1.0
+        return clock["now"]
+
+    queue = ParseQueue(max_wait=5.0, run_in_thread=False)
+    assert queue.submit(lambda x: x * 2, 21).result == 42
+
+    monkeypatch.setattr("rasa_nlu.server.time.time", fake_time)
+    queue.max_wait = 0.5
+    failure = queue.submit(lambda x: x * 2, 21).result
+    assert failure.check(OverloadedError)
+    failure.trap(OverloadedError)
+
+    metrics = queue.get_metrics()
+    assert metrics["accepted"] == 2
+    assert metrics["shed_wait_exceeded"] == metrics["shed"] == 1
+    assert metrics["depth"] == metrics["running"] == 0
+
+
 @utilities.slowtest
 @pytest.inlineCallbacks
 def test_post_train(app, rasa_default_train_data):
@@ -1,3 +1,4 @@
+# -*- coding: utf-8 -*-
 from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
@@ -29,3 +30,45 @@ def test_entity_synonyms():
     assert entities[0]["value"] == "chinese"
     assert entities[1]["value"] == "chinese"
     assert entities[2]["value"] == "china"
+
+
+def test_compact_synonym_store(tmpdir):
+    from rasa_nlu.extractors.synonym_store import CompactSynonymStore
+
+    synonyms = {"chines": "chinese", "nyc": "New York City",
+                "new york": "New York City", "köln": "Cologne",
+                "北京": "Beijing"}
+    file_name = tmpdir.join("synonyms.bin").strpath
+    CompactSynonymStore.write(file_name, synonyms)
+    store = CompactSynonymStore.load(file_name)
+
+    assert len(store) == len(synonyms)
+    assert dict(store.items()) == synonyms
+    for key, value in synonyms.items():
+        assert key in store
+        assert store[key] == value
+    assert store.get("NYC") is None
+    assert store.get("ny") is None
+    assert store.get("zzz", "default") == "default"
+    store.close()
+
+
+def test_entity_synonyms_compact_store(tmpdir):
+    from rasa_nlu.model import Metadata
+
+    mapper = EntitySynonymMapper({"compact_store": True},
+                                 synonyms={"chines": "chinese",
+                                           "nyc": "New York City"})
+    meta = mapper.persist(tmpdir.strpath)
+    assert "synonyms_file" not in meta
+    meta.update(mapper.component_config)
+    meta["name"] = mapper.name
+
+    loaded = EntitySynonymMapper.load(tmpdir.strpath,
+                                      Metadata({"pipeline": [meta]}, None))
+    entities = [{"entity": "city", "value": "NYC"},
+                {"entity": "food", "value": "Chines"},
+                {"entity": "food", "value": "china"}]
+    loaded.replace_synonyms(entities)
+    assert [e["value"] for e in entities] == ["New York City", "chinese",
+                                              "china"]
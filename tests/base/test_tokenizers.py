@@ -70,4 +70,135 @@ def test_jieba():
            ['Micheal', '你好', '吗', '？']
 
     assert [t.offset for t in tk.tokenize("Micheal你好吗？")] == \
-[0, 7, 9, 10]
\ No newline at end of file
+[0, 7, 9, 10]
+
+
+def test_jieba_user_dicts_are_isolated(tmpdir):
+    from rasa_nlu.tokenizers.jieba_tokenizer import JiebaTokenizer
+
+    user_dict = tmpdir.join("user_dict.txt")
+    user_dict.write_text("兰州拉面 1000 n\n", encoding="utf-8")
+
+    with_dict = JiebaTokenizer({"user_dicts": user_dict.strpath})
+    without_dict = JiebaTokenizer()
+
+    assert [t.text for t in with_dict.tokenize("我想去吃兰州拉面")] == \
+           ['我', '想', '去', '吃', '兰州拉面']
+    assert [t.text for t in without_dict.tokenize("我想去吃兰州拉面")] == \
+           ['我', '想', '去', '吃', '兰州', '拉面']
+
+
+def test_jieba_cache_key_uses_dictionary_content(tmpdir):
+    from rasa_nlu.model import Metadata
+    from rasa_nlu.tokenizers.jieba_tokenizer import JiebaTokenizer
+
+    def metadata_for(path):
+        return Metadata({"pipeline": [{"name": "tokenizer_jieba",
+                                       "user_dicts": path}]}, None)
+
+    first = tmpdir.join("first.txt")
+    first.write_text("兰州拉面 1000 n\n", encoding="utf-8")
+    copied = tmpdir.join("copied.txt")
+    copied.write_text("兰州拉面 1000 n\n", encoding="utf-8")
+    other = tmpdir.join("other.txt")
+    other.write_text("拉面 1000 n\n", encoding="utf-8")
+
+    key = JiebaTokenizer.cache_key(metadata_for(first.strpath))
+    assert key == JiebaTokenizer.cache_key(metadata_for(copied.strpath))
+    assert key != JiebaTokenizer.cache_key(metadata_for(other.strpath))
+    assert key != JiebaTokenizer.cache_key(Metadata({"pipeline": []}, None))
+
+
+def test_jieba_load_from_persisted_dict_cache(tmpdir):
+    from rasa_nlu.model import Metadata
+    from rasa_nlu.tokenizers.jieba_tokenizer import JiebaTokenizer
+
+    user_dict = tmpdir.join("user_dict.txt")
+    user_dict.write_text("兰州拉面 1000 n\n", encoding="utf-8")
+    model_dir = tmpdir.mkdir("model")
+
+    tk = JiebaTokenizer({"user_dicts": user_dict.strpath,
+                         "persist_dict_cache": True})
+    meta = tk.persist(model_dir.strpath)
+    assert meta["dict_cache"] == "jieba_dict_cache.dat"
+
+    metadata = Metadata({"pipeline": [dict(name="tokenizer_jieba", **meta)]},
+                        model_dir.strpath)
+    cached = JiebaTokenizer.load_dict_cache(
+            JiebaTokenizer._meta_with_model_paths(
+                    metadata.for_component("tokenizer_jieba"),
+                    model_dir.strpath))
+    assert cached is not None and cached.initialized
+
+    loaded = JiebaTokenizer.load(model_dir.strpath, metadata)
+    assert [t.text for t in loaded.tokenize("我想去吃兰州拉面")] == \
+           ['我', '想', '去', '吃', '兰州拉面']
+
+    # a modified dictionary invalidates the cache
+    model_dir.join("jieba_user_dicts", "user_dict.txt").write_text(
+            "拉面 1000 n\n", encoding="utf-8")
+    assert JiebaTokenizer.load_dict_cache(
+            JiebaTokenizer._meta_with_model_paths(
+                    metadata.for_component("tokenizer_jieba"),
+                    model_dir.strpath)) is None
+
+
+def test_jieba_dict_cache_is_only_persisted_for_custom_dicts(tmpdir):
+    from rasa_nlu.tokenizers.jieba_tokenizer import JiebaTokenizer
+
+    user_dict = tmpdir.join("user_dict.txt")
+    user_dict.write_text("兰州拉面 1000 n\n", encoding="utf-8")
+
+    configs = [({"user_dicts": user_dict.strpath}, True),
+               ({}, False),
+               ({"user_dicts": user_dict.strpath,
+                 "persist_dict_cache": False}, False)]
+    for i, (config, persisted) in enumerate(configs):
+        model_dir = tmpdir.mkdir("model_{}".format(i))
+        meta = JiebaTokenizer(config).persist(model_dir.strpath)
+        assert ("dict_cache" in meta) == persisted
+        assert model_dir.join("jieba_dict_cache.dat").check() == persisted
+
+
+def test_parallel_training_tokenization(tmpdir):
+    from rasa_nlu.tokenizers.jieba_tokenizer import JiebaTokenizer
+    from rasa_nlu.tokenizers.whitespace_tokenizer import WhitespaceTokenizer
+    from rasa_nlu.training_data import Message, TrainingData
+
+    user_dict = tmpdir.join("user_dict.txt")
+    user_dict.write_text("兰州拉面 1000 n\n", encoding="utf-8")
+    texts = ["我想去吃兰州拉面", "Micheal你好吗？", "hey how are you"] * 5
+
+    for tk in [WhitespaceTokenizer({"parallel_training": True}),
+               JiebaTokenizer({"parallel_training": True,
+                               "user_dicts": user_dict.strpath})]:
+        data = TrainingData([Message(t) for t in texts])
+        tk.train(data, None, num_threads=2)
+
+        for example in data.training_examples:
+            expected = tk.tokenize(example.text)
+            tokens = example.get("tokens")
+            assert [t.text for t in tokens] == [t.text for t in expected]
+            assert [t.offset for t in tokens] == [t.offset for t in expected]
+            assert [t.end for t in tokens] == [t.end for t in expected]
+
+
+def test_tokens_sequence_keeps_token_attributes():
+    import copy
+    from rasa_nlu.tokenizers import Token, Tokens
+
+    tokens = Tokens([Token("hey", 0), Token("you", 4, {"pattern": 1})])
+
+    assert len(tokens) == 2
+    assert [t.text for t in tokens] == ["hey", "you"]
+    assert [t.end for t in tokens] == [3, 7]
+    assert tokens[-1].get("pattern") == 1
+    assert tokens[0].get("pattern") is None
+
+    tokens[0].set("pattern", 0)
+    assert tokens[0].get("pattern") == 0
+    assert [t.text for t in tokens[:1]] == ["hey"]
+
+    copied = copy.deepcopy(tokens)
+    assert [(t.text, t.offset, t.get("pattern")) for t in copied] == \
+           [("hey", 0, 0), ("you", 4, 1)]
@@ -332,3 +332,18 @@ def test_training_data_conversion(tmpdir, data_file, gold_standard_file,
     # to dump to the file and diff using git
     # with io.open(gold_standard_file) as f:
     #     f.write(td.as_json(indent=2))
+
+
+def test_message_pickling_keeps_output_properties():
+    import pickle
+    from rasa_nlu.training_data import Message
+
+    message = Message("hello", {"intent": "greet"})
+    message.set("entities", [], add_to_output=True)
+
+    restored = pickle.loads(pickle.dumps(message))
+    assert restored == message
+    assert restored.as_dict(only_output_properties=True) == \
+           {"text": "hello", "entities": []}
+    assert Message("hi").as_dict(only_output_properties=True) == \
+           {"text": "hi"}
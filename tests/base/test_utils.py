@@ -11,6 +11,7 @@ import tempfile
 import pytest
 
 from rasa_nlu import utils
+from rasa_nlu.training_data import Message
 from rasa_nlu.utils import (
     relative_normpath, create_dir, is_url, ordered, is_model_dir, remove_model,
     write_json_to_file, write_to_file)
@@ -108,3 +109,167 @@ def test_remove_model_invalid(empty_model_dir):
 def test_is_url():
     assert not is_url('./some/file/path')
     assert is_url('https://rasa.com/')
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = utils.LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.hits == 1
+    assert cache.misses == 1
+    assert cache.hit_rate == 0.5
+
+
+def test_lru_cache_disabled():
+    cache = utils.LRUCache(0)
+    assert cache.get_or_compute("a", lambda k: k.upper()) == "A"
+    assert len(cache) == 0
+
+
+def test_read_write_lock_excludes_readers_while_writing():
+    import threading
+
+    lock = utils.ReadWriteLock()
+    events = []
+
+    def read():
+        with lock.reading():
+            events.append("read")
+
+    with lock.reading():
+        # readers share the lock
+        with lock.reading():
+            pass
+    with lock.writing():
+        reader = threading.Thread(target=read)
+        reader.start()
+        reader.join(0.1)
+        events.append("written")
+    reader.join()
+
+    assert events == ["written", "read"]
+
+
+class FakeSession(object):
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeModel(object):
+    pass
+
+
+def test_shared_session_is_closed_once_its_models_are_collected():
+    import gc
+    from rasa_nlu.utils.tensorflow_utils import SessionManager, SharedSession
+
+    manager = SessionManager()
+    shared = SharedSession("shared", None, FakeSession(), (0, 0))
+    shared.scopes = ["model_1", "model_2"]
+    manager._sessions[(0, 0)] = [shared]
+    models = [FakeModel(), FakeModel()]
+    for model, scope in zip(models, shared.scopes[:]):
+        manager.release_with(model, shared, scope)
+    del model
+
+    models.pop()
+    gc.collect()
+    assert manager.as_dict()[0]["num_models"] == 1
+    assert not shared.session.closed
+
+    models.pop()
+    gc.collect()
+    assert manager.as_dict() == []
+    assert shared.session.closed
+
+
+def test_process_thread_count():
+    import threading
+
+    assert utils.process_thread_count() >= threading.active_count()
+
+
+def test_prefetch_keeps_order():
+    assert list(utils.prefetch(iter(range(100)), 3)) == list(range(100))
+    assert list(utils.prefetch(iter(range(10)), 0)) == list(range(10))
+
+
+def test_prefetch_raises_producer_errors():
+    def failing():
+        yield 1
+        raise ValueError("failed")
+
+    items = utils.prefetch(failing())
+    assert next(items) == 1
+    with pytest.raises(ValueError):
+        next(items)
+
+
+def test_prefetch_stops_producer_when_closed():
+    produced = []
+
+    def endless():
+        i = 0
+        while True:
+            produced.append(i)
+            yield i
+            i += 1
+
+    items = utils.prefetch(endless(), 2)
+    assert next(items) == 0
+    items.close()
+
+    import time
+    time.sleep(0.3)
+    num_produced = len(produced)
+    time.sleep(0.3)
+    assert len(produced) == num_produced
+
+
+def test_text_normalizer_computes_configured_variants():
+    from rasa_nlu.utils.text_normalizer import TextNormalizer
+
+    normalizer = TextNormalizer({"halfwidth": True,
+                                 "variants": ["lowercase", "numbers"]})
+    # "Hi Bot 2018!" with full width characters and spaces
+    message = Message("\uff28\uff49\u3000\uff22\uff4f\uff54 "
+                      "\uff12\uff10\uff11\uff18\uff01")
+    normalizer.process(message)
+
+    assert message.get("normalized_text") == {
+        "text": "Hi Bot 2018!",
+        "lowercase": "hi bot 2018!",
+        "numbers": "Hi Bot NUMBER!"}
+    assert message.normalized_text("lowercase") == "hi bot 2018!"
+
+
+def test_message_adds_missing_variants_to_normalized_texts():
+    from rasa_nlu.utils.text_normalizer import TextNormalizer
+
+    message = Message("Call 911 NOW")
+    assert message.normalized_text("lowercase_numbers") == "call NUMBER now"
+    assert message.get("normalized_text") is None
+
+    TextNormalizer().process(message)
+    assert message.normalized_text("lowercase_numbers") == "call NUMBER now"
+    assert message.get("normalized_text")["lowercase_numbers"] == \
+        "call NUMBER now"
+
+    with pytest.raises(ValueError):
+        message.normalized_text("uppercase")
+
+
+def test_text_normalizer_rejects_unknown_variants():
+    from rasa_nlu.utils.text_normalizer import TextNormalizer
+
+    with pytest.raises(ValueError):
+        TextNormalizer({"variants": ["uppercase"]})
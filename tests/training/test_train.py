@@ -49,7 +49,8 @@ def pipelines_for_tests():
                                "intent_classifier_mitie",
                                "intent_classifier_tensorflow_embedding"
                                )),
-            ("zh", as_pipeline("nlp_mitie",
+            ("zh", as_pipeline("text_normalizer",
+                               "nlp_mitie",
                                "tokenizer_jieba",
                                "intent_featurizer_mitie",
                                "ner_mitie",